@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+"""
+Código para comparar os métodos de solução do espaço de estados da linha de
+transmissão com circuitos pi em cascata (ver resolucaoDaLinhaPiCascata.py).
+
+São varridos o número de circuitos pi, o número de ramos R-L em paralelo, o
+passo de tempo e o método de solução. Para cada caso são medidos o tempo de
+montagem das matrizes, o tempo de integração, o pico de memória (RSS) e o
+número de cálculos da derivada (RHS). Como a derivada avalia a tensão no
+emissor uma única vez por chamada, basta contar as chamadas de tensaoEmissor.
+
+Cada caso roda em um processo novo, para que o pico de memória de um não
+contamine o do outro (e para que o cache de matrizes comece vazio). Os
+resultados são gravados em arquivoResultados, em JSON, para comparar versões
+do código e escolher o método de solução.
+
+O erro é medido em relação à solução exata pela exponencial de matriz, nos
+casos em que ela é calculada (numeroCircuitoPi até limiteReferencia).
+
+@author: Pedro Henrique Nascimento Vieira
+"""
+import itertools
+import json
+import multiprocessing
+import platform
+import scipy
+import sys
+import numpy as np
+from classeLinhaDeTransmissaoPiCascata import LinhaDeTransmissaoPiCascata
+from time import perf_counter
+
+try:
+    import resource
+except ImportError: # Windows
+    resource = None
+
+arquivoResultados = 'benchmarkLinhaPiCascata.json'
+
+tFinal = 0.5e-3 # tempo final, segundos
+
+passosDeTempo = [5e-6, 1e-6] # passos de tempo, segundos
+
+circuitosPi = [10, 100, 1000, 10000, 100000] # números de circuitos pi
+
+numerosDeRamos = [1, 3, 5] # números de ramos R-L em paralelo
+
+metodos = ['odeint', 'BDF', 'Radau', 'LSODA', 'trapezio', 'expm']
+
+# maior número de circuitos pi para cada método (os demais são lentos demais)
+limiteCircuitos = {'odeint': 1000, 'BDF': 10000, 'Radau': 1000,
+                   'LSODA': 1000, 'trapezio': 100000, 'expm': 100000}
+
+limiteReferencia = 10000 # maior número de circuitos pi com cálculo do erro
+
+comprimentoLinha = 10 # comprimento da linha em km
+
+condutanciaDistribuida = 0.556e-6 # condutância distribuída (S/km)
+
+capacitanciaDistribuida = 11.11e-9 # capacitância distribuída (F/km)
+
+# Resistência distribuída (Ohm/km)
+resistenciaDistribuida = np.array([0.026, 1.470, 2.354, 20.149, 111.111])
+
+# Indutância distribuída (H/km)
+indutanciaDistribuida = np.array([2.209, 0.740, 0.120, 0.100, 0.050]) * 1e-3
+
+chamadas = 0
+
+def tensaoEmissor(t):
+    global chamadas
+    chamadas += 1
+    return 20e3 # corrente-contínua, em V
+
+
+def picoMemoria():
+    '''
+
+    Pico de memória residente do processo, em MB (None, se não disponível)
+    '''
+    if resource is None:
+        return None
+
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # em bytes no macOS, em kB no Linux
+    return pico / 2**20 if sys.platform == 'darwin' else pico / 2**10
+
+
+def executarCaso(caso):
+    '''
+
+    Executa um caso do benchmark (em um processo próprio)
+
+    Argumentos:
+    -------
+    caso: dicionário com numeroCircuitoPi, numeroRamos, dt e metodo
+
+    Retorna:
+    -------
+    o caso, acrescido das medidas
+    '''
+    global chamadas
+
+    t = np.arange(0, tFinal, caso['dt'])
+    ramos = caso['numeroRamos']
+
+    linhaTransmissao = LinhaDeTransmissaoPiCascata(caso['numeroCircuitoPi'],
+                            comprimentoLinha, condutanciaDistribuida,
+                            capacitanciaDistribuida,
+                            resistenciaDistribuida[:ramos],
+                            indutanciaDistribuida[:ramos])
+
+    memoriaInicial = picoMemoria()
+
+    inicio = perf_counter()
+    linhaTransmissao.espacoEstadosLinha()
+    tempoMontagem = perf_counter() - inicio
+
+    chamadas = 0
+
+    inicio = perf_counter()
+    y = linhaTransmissao.simularLinha(tensaoEmissor, t, metodo = caso['metodo'],
+                                      saidas = ['tensaoReceptor'])
+    tempoIntegracao = perf_counter() - inicio
+
+    resultado = dict(caso, tempoMontagem = tempoMontagem,
+                     tempoIntegracao = tempoIntegracao, chamadasRHS = chamadas,
+                     memoriaInicialMB = memoriaInicial,
+                     picoMemoriaMB = picoMemoria(), erroRelativo = None)
+
+    if caso['numeroCircuitoPi'] <= limiteReferencia:
+        referencia = linhaTransmissao.simularLinha(tensaoEmissor, t,
+                                                   metodo = 'expm',
+                                                   saidas = ['tensaoReceptor'])
+
+        resultado['erroRelativo'] = float(np.abs(y - referencia).max() /
+                                          np.abs(referencia).max())
+
+    return resultado
+
+
+def gerarCasos():
+    '''
+
+    Lista dos casos do benchmark, respeitando limiteCircuitos
+    '''
+    return [dict(numeroCircuitoPi = n, numeroRamos = r, dt = dt, metodo = m)
+            for n, r, dt, m in itertools.product(circuitosPi, numerosDeRamos,
+                                                 passosDeTempo, metodos)
+            if n <= limiteCircuitos[m]]
+
+
+if __name__ == '__main__':
+
+    casos = gerarCasos()
+    resultados = []
+
+    print("%-8s %7s %6s %8s %10s %10s %8s %9s %10s" %
+          ("método", "n", "ramos", "dt", "montagem", "integração", "RHS",
+           "RSS (MB)", "erro rel."))
+
+    # um processo novo para cada caso (maxtasksperchild = 1)
+    contexto = multiprocessing.get_context('spawn')
+
+    with contexto.Pool(1, maxtasksperchild = 1) as processos:
+        for resultado in processos.imap(executarCaso, casos):
+            resultados.append(resultado)
+
+            erro = resultado['erroRelativo']
+            rss = resultado['picoMemoriaMB']
+
+            print("%-8s %7d %6d %8.0e %10.4f %10.4f %8d %9s %10s" %
+                  (resultado['metodo'], resultado['numeroCircuitoPi'],
+                   resultado['numeroRamos'], resultado['dt'],
+                   resultado['tempoMontagem'], resultado['tempoIntegracao'],
+                   resultado['chamadasRHS'],
+                   '-' if rss is None else '%.1f' % rss,
+                   '-' if erro is None else '%.2e' % erro))
+
+    informacoes = {'python': platform.python_version(),
+                   'numpy': np.__version__, 'scipy': scipy.__version__,
+                   'plataforma': platform.platform(),
+                   'tFinal': tFinal, 'comprimentoLinha': comprimentoLinha}
+
+    with open(arquivoResultados, 'w') as arquivo:
+        json.dump({'informacoes': informacoes, 'resultados': resultados},
+                  arquivo, indent = 1)
@@ -1,296 +1,2243 @@
-# -*- coding: utf-8 -*-
-"""    
-Código para criar as matrizes da representação em espaço de estado para
-linhas de transmissão com efeito da frequência incluído como demonstrado em:
-    
-    KUROKAWA, S.; YAMANAKA, F. N. R.; PRADO, A. J.; BOVOLATO, L. F.; PISSOLATO, J. 
-    Representação de linhas de transmissão por meio de variáveis de estado levando 
-    em consideração o efeito da frequência sobre os parâmetros longitudinais. 
-    Sba Controle & Automação, Campinas v.18, n.3, 2007, p.337-346, 2007.
-    
-O espaço de estado tem forma: [X'] = [A] * [X] + [B] * TensaoNoEmissor
-    
-Os atributos da Linha de Transmissão são:
-    número de circuitos pi em cascata;
-    
-    condutância shunt de cada pi (S);
-        total, não dividir por 2
-        
-    capacitância shunt de cada pi (F);
-        total, não dividir por 2
-        
-    resistência série de cada pi (Ohm);
-        R0, R1, R2, ..., Rm
-
-    indutância série de cada pi (H);
-        L0, L1, L2, ..., Lm
-
-   
-@author: Pedro Henrique Nascimento Vieira
-"""
-import numpy as np
-import scipy as sp
-        
-class LinhaDeTransmissaoPiCascata(object):
-    '''
-    
-    Classe que define uma linha de transmissão com uma fonte conectada no
-    terminal emissor, e terminal receptor em vazio.
-    '''
-  
-    def __init__(self, numeroCircuitoPi, comprimentoDaLinha, 
-                 condutanciaDistribuida, capacitanciaDistribuida,
-                 resistenciaDistribuida, indutanciaDistribuida):
-    
-        '''
-        
-        Construtor principal da classe. Define os atributos concentrados da linha,
-        tendo como entrada os parâmetros distribuídos, o comprimento da linha e 
-        o número de circuitos pi em cascata desejado.
-        '''
-        
-        if not float(numeroCircuitoPi).is_integer():
-            raise TypeError('numeroCircuitoPi deve ser um valor inteiro.')
-        
-        if numeroCircuitoPi <= 0:
-            raise ValueError('numeroCircuitoPi deve ser maior que zero.')
-            
-        if resistenciaDistribuida.size != indutanciaDistribuida.size:
-            raise ValueError('resistenciaDistribuida e indutanciaDistribuida ' +
-                'devem ter o mesmo número de elementos.')
-                     
-        # ordem da linha, dimensão do espaço de estados gerado por ela
-        self.ordem = (resistenciaDistribuida.size + 1) * numeroCircuitoPi
-       
-        # quantidade de circuitos pi em cascata representando a linha
-        self.numeroCircuitoPi = int(numeroCircuitoPi)
-
-        # comprimento de cada circuito pi, em km
-        self.comprimentoSecaoPi = comprimentoDaLinha/numeroCircuitoPi
-
-        # condutância shunt concentrada, em S
-        self.condutanciaConcentrada = (condutanciaDistribuida * 
-                                       self.comprimentoSecaoPi)
-
-        # capacitância shunt concentrada, em F
-        self.capacitanciaConcentrada = (capacitanciaDistribuida * 
-                                        self.comprimentoSecaoPi)
-
-        # resistência série concentrada, em Ohm
-        self.resistenciaConcentrada = (np.array(resistenciaDistribuida) *
-                                       self.comprimentoSecaoPi)
-        
-        # indutância série concentrada, em L
-        self.indutanciaConcentrada = (np.array(indutanciaDistribuida) *
-                                      self.comprimentoSecaoPi)
-        
-
-    def matrizTridiagonal(Ad, As, Ai, ordem):        
-        if ordem == 1:
-            return Ad
-        
-        valores = Ad.data
-        linhas = Ad.row
-        colunas = Ad.col
-        
-        m1 = Ad.shape[0]
-                
-        # diagonal principal
-        for n in range(1, ordem):
-            valores = np.append(valores, Ad.data)
-            off = n * m1
-            linhas = np.append(linhas, Ad.row + off)
-            colunas = np.append(colunas, Ad.col + off)
-            
-        # diagonl superior
-        for n in range(1, ordem):
-            valores = np.append(valores, As.data)
-            
-            off1 = (n-1) * m1          
-            off2 = n * m1
-            
-            linhas = np.append(linhas, As.row + off1)        
-            colunas = np.append(colunas, As.col + off2)
-            
-        # diagonal inferior
-        for n in range(1, ordem):
-            valores = np.append(valores, Ai.data)
-            
-            off1 = n * m1
-            off2 = (n-1) * m1
-            
-            linhas = np.append(linhas, Ai.row + off1)
-            colunas = np.append(colunas, Ai.col + off2)
-            
-            
-        return sp.sparse.coo_matrix((valores, (linhas, colunas)), 
-                                shape = (ordem*m1, ordem*m1))
-    
-    
-    def resolverSistemaEDO(A, B, u, t, x0 = None):
-        '''        
-        Resolve um sistema da forma: X'(t) = A*X(t) + B*u(t)
-    
-        Argumentos:
-        -------
-        A: uma matriz quadrada esparsa de ordem n
-    
-        B: um vetor esparso de dimensão n
-    
-        u: a entrada, uma função com argumento 't'
-    
-        t: os pontos nos quais x é calculado
-    
-        x0: as condições iniciais, nulas por padrão; dimensão n
-    
-        Retorna:
-        --------
-        X = um array da forma (len(t), len(x)) com os valores das variáveis
-        calculados (resposta).
-        '''
-        if x0 == None:
-            x0 = np.zeros(A.shape[0])
-    
-        if sp.sparse.issparse(A): A = A.tocsr()
-            
-        if sp.sparse.issparse(B): B = B.tocsr()
-    
-        def Bu(t):
-            return B * u(t)
-    
-        def func(x, t): # dx/dt = f(x,t)
-            # calcula a derivada das variáveis
-            return (A * np.matrix(x).T + Bu(t)).A1
-    
-        return sp.integrate.odeint(func, x0, t)
-    
-        
-    def espacoEstadosUmPi(self):
-        '''
-        
-        Gera o espaço de estado de um circuito Pi.
-        
-        Parâmetros:
-        -----
-        Vin: tensão de entrada
-        
-        
-        Retorna:
-        ----
-        [A, B]: matrizes esparsas no formato COOrdinate.
-        dimensao da matriz A
-        '''        
-        # Matriz A
-        # Os elementos não nulos são: primeira linha, primeira coluna, e
-        # diagonal principal
-        
-        # elemento a_11 de A
-        a_11 = -self.resistenciaConcentrada.sum() / self.indutanciaConcentrada[0]
-        
-        resistencias = self.resistenciaConcentrada[1:].copy()
-        
-        m = resistencias.size
-        
-        resistenciasPrimeiraLinha = resistencias / self.indutanciaConcentrada[0]
-        
-        resistencias = resistencias / self.indutanciaConcentrada[1:]
-            
-        # determinar a primeira linha, sem o primeiro elemento
-        __lo = (-1) / self.indutanciaConcentrada[0]
-        primeiraLinha = np.append(resistenciasPrimeiraLinha, __lo)
-        
-        # determinar a diagonal principal
-        __gc = -self.capacitanciaConcentrada / self.condutanciaConcentrada
-        diagonalPrincipal = np.append(a_11, -resistencias)
-        diagonalPrincipal = np.append(diagonalPrincipal, __gc)
-
-        # determinar a primeira coluna, sem o primeiro elemento
-        __c2 = 2 / self.capacitanciaConcentrada
-        primeiraColuna = np.append(resistencias, __c2)
-        
-        
-        # A será criada como uma matriz esparsa. Os valores não nulos serão
-        # entrados na ordem: diagonalPrincipal, primeiraColuna, primeiraLinha
-        
-        valoresA = np.append(diagonalPrincipal, primeiraColuna)
-        valoresA = np.append(valoresA, primeiraLinha)
-        
-        indiceLinhas = [None] * valoresA.size
-        indiceColunas = [None] * valoresA.size
-        
-        __s = diagonalPrincipal.size
-        
-        for n in range(__s): 
-            indiceLinhas[n] = n
-            indiceColunas[n] = n
-        
-        
-        for n in range(primeiraColuna.size): 
-            indiceLinhas[n + __s] = n + 1
-            indiceColunas[n + __s] = 0
-            
-        
-        __s += primeiraColuna.size
-        
-        for n in range(primeiraLinha.size): 
-            indiceLinhas[n + __s] = 0
-            indiceColunas[n + __s] = n + 1
-            
-            
-        dimensao = m+2
-        
-        A = sp.sparse.coo_matrix((valoresA, (indiceLinhas, indiceColunas)),
-                              shape = (dimensao, dimensao))
-        
-        valorB = np.array([-primeiraLinha[-1]]) # pega o último elemento
-        
-        B = sp.sparse.coo_matrix((valorB , ([0], [0])), shape = (dimensao, 1))
-        
-        return A,B
-
-        
-    def espacoEstadosLinha(self):
-        '''
-        
-        Gera as matrizes do espaço de estados da linha
-        '''
-        M = self.espacoEstadosUmPi()
-        
-        # submatriz diagonal superior
-        As = sp.sparse.coo_matrix( ([-1/self.capacitanciaConcentrada],
-                                ([M[0].shape[0] - 1], [0])), shape = M[0].shape)
-        
-        # submatriz diagonal inferior
-        Ai = sp.sparse.coo_matrix( ([1/self.indutanciaConcentrada[0]],
-                                 ([0], [M[0].shape[0] - 1])), shape = M[0].shape)
-        
-        ordem = self.numeroCircuitoPi
-        
-        A = self.matrizTridiagonal(Ad=M[0], As=As, Ai=Ai, ordem=ordem)
-        
-        B = sp.sparse.coo_matrix((M[1].data, (M[1].row, M[1].col)), 
-                                 shape = (A.shape[0], 1))
-                
-        return A, B
-        
-        
-    def simularLinha(self, tensaoEmissor, t, x0 = None):
-        '''
-        
-        Simula a linha considerando o terminal receptor em vazio.
-        
-        Argumentos:
-        -------
-        tensaoEmissor: a tensão no terminal emissor, uma função com argumento 't'
-        
-        t: os pontos nos quais X é calculado
-        
-        x0: as condições iniciais, nulas por padrão
-        
-        Retorna:
-        --------
-        um array da forma (len(t), len(x)) com os valores das variáveis calculados
-        '''
-        M = self.espacoEstadosLinha()
-        
-        return self.resolverSistemaEDO(M[0], M[1], tensaoEmissor, t, x0)
\ No newline at end of file
+# -*- coding: utf-8 -*-
+"""    
+Código para criar as matrizes da representação em espaço de estado para
+linhas de transmissão com efeito da frequência incluído como demonstrado em:
+    
+    KUROKAWA, S.; YAMANAKA, F. N. R.; PRADO, A. J.; BOVOLATO, L. F.; PISSOLATO, J. 
+    Representação de linhas de transmissão por meio de variáveis de estado levando 
+    em consideração o efeito da frequência sobre os parâmetros longitudinais. 
+    Sba Controle & Automação, Campinas v.18, n.3, 2007, p.337-346, 2007.
+    
+O espaço de estado tem forma: [X'] = [A] * [X] + [B] * TensaoNoEmissor
+    
+Os atributos da Linha de Transmissão são:
+    número de circuitos pi em cascata;
+    
+    condutância shunt de cada pi (S);
+        total, não dividir por 2
+        
+    capacitância shunt de cada pi (F);
+        total, não dividir por 2
+        
+    resistência série de cada pi (Ohm);
+        R0, R1, R2, ..., Rm
+
+    indutância série de cada pi (H);
+        L0, L1, L2, ..., Lm
+
+   
+@author: Pedro Henrique Nascimento Vieira
+"""
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+import hashlib
+import os
+
+import numpy as np
+import scipy as sp
+        
+class LinhaDeTransmissaoPiCascata(object):
+    '''
+    
+    Classe que define uma linha de transmissão com uma fonte conectada no
+    terminal emissor, e terminal receptor em vazio.
+    '''
+  
+    def __init__(self, numeroCircuitoPi, comprimentoDaLinha, 
+                 condutanciaDistribuida, capacitanciaDistribuida,
+                 resistenciaDistribuida, indutanciaDistribuida):
+    
+        '''
+        
+        Construtor principal da classe. Define os atributos concentrados da linha,
+        tendo como entrada os parâmetros distribuídos, o comprimento da linha e 
+        o número de circuitos pi em cascata desejado.
+        '''
+        
+        if not float(numeroCircuitoPi).is_integer():
+            raise TypeError('numeroCircuitoPi deve ser um valor inteiro.')
+        
+        if numeroCircuitoPi <= 0:
+            raise ValueError('numeroCircuitoPi deve ser maior que zero.')
+            
+        if resistenciaDistribuida.size != indutanciaDistribuida.size:
+            raise ValueError('resistenciaDistribuida e indutanciaDistribuida ' +
+                'devem ter o mesmo número de elementos.')
+                     
+        # ordem da linha, dimensão do espaço de estados gerado por ela
+        self.ordem = (resistenciaDistribuida.size + 1) * numeroCircuitoPi
+       
+        # quantidade de circuitos pi em cascata representando a linha
+        self.numeroCircuitoPi = int(numeroCircuitoPi)
+
+        # comprimento de cada circuito pi, em km
+        self.comprimentoSecaoPi = comprimentoDaLinha/numeroCircuitoPi
+
+        # condutância shunt concentrada, em S
+        self.condutanciaConcentrada = (condutanciaDistribuida * 
+                                       self.comprimentoSecaoPi)
+
+        # capacitância shunt concentrada, em F
+        self.capacitanciaConcentrada = (capacitanciaDistribuida * 
+                                        self.comprimentoSecaoPi)
+
+        # resistência série concentrada, em Ohm
+        self.resistenciaConcentrada = (np.array(resistenciaDistribuida) *
+                                       self.comprimentoSecaoPi)
+        
+        # indutância série concentrada, em L
+        self.indutanciaConcentrada = (np.array(indutanciaDistribuida) *
+                                      self.comprimentoSecaoPi)
+        
+        # decomposições modais já calculadas, ver decomposicaoModal
+        self._modos = {}
+        
+        # parâmetros que definem a linha, chave do cacheMatrizes
+        self.chave = (self.numeroCircuitoPi, float(comprimentoDaLinha),
+                      float(condutanciaDistribuida), 
+                      float(capacitanciaDistribuida),
+                      tuple(np.array(resistenciaDistribuida, dtype = float)),
+                      tuple(np.array(indutanciaDistribuida, dtype = float)))
+        
+        # comprimento de cada circuito pi, em km; diferentes apenas nas linhas
+        # criadas por comSecoes
+        self.comprimentosSecoes = np.full(self.numeroCircuitoPi, 
+                                          self.comprimentoSecaoPi)
+        
+    
+    @classmethod
+    def comSecoes(cls, comprimentosSecoes, condutanciaDistribuida, 
+                  capacitanciaDistribuida, resistenciaDistribuida, 
+                  indutanciaDistribuida):
+        '''
+        
+        Cria uma linha com circuitos pi de comprimentos diferentes, por
+        exemplo menores em torno de um ponto de interesse (ver 
+        secoesRefinadas), em vez de refinar a linha inteira.
+        
+        Os parâmetros concentrados (resistenciaConcentrada...) passam a ser
+        os de um circuito pi de comprimento médio; os elementos de A 
+        inversamente proporcionais ao comprimento, que ligam correntes e 
+        tensões, são corrigidos na montagem: 1/L0 pelo comprimento de cada
+        circuito pi, e 1/C pela média dos dois circuitos pi vizinhos ao nó
+        (como em LinhaTrifasicaPiCascata). Os demais (R/L, G/C) não dependem
+        do comprimento.
+        
+        Argumentos:
+        -------
+        comprimentosSecoes: o comprimento de cada circuito pi, em km, a 
+        partir do emissor
+        
+        demais: os parâmetros distribuídos, como no construtor principal
+        '''
+        comprimentosSecoes = np.asarray(comprimentosSecoes, dtype = float)
+        
+        if comprimentosSecoes.ndim != 1 or np.any(comprimentosSecoes <= 0):
+            raise ValueError('comprimentosSecoes deve ser uma lista de ' +
+                             'comprimentos positivos.')
+        
+        linha = cls(comprimentosSecoes.size, comprimentosSecoes.sum(), 
+                    condutanciaDistribuida, capacitanciaDistribuida, 
+                    resistenciaDistribuida, indutanciaDistribuida)
+        
+        linha.comprimentosSecoes = comprimentosSecoes
+        
+        if not np.allclose(comprimentosSecoes, linha.comprimentoSecaoPi):
+            linha.chave += (tuple(comprimentosSecoes),)
+            
+        return linha
+    
+    
+    @staticmethod
+    def secoesRefinadas(comprimentoDaLinha, pontos, comprimentoMinimo, 
+                        comprimentoMaximo, razao = 1.2):
+        '''
+        
+        Regra de refinamento: comprimentos dos circuitos pi com comprimentoMinimo
+        nos pontos dados (que ficam exatamente sobre nós da linha), crescendo
+        em progressão geométrica de razão aproximada 'razao' com a distância
+        aos pontos, até comprimentoMaximo.
+        
+        Argumentos:
+        -------
+        comprimentoDaLinha: em km
+        
+        pontos: as posições (km, a partir do emissor) a refinar, por exemplo
+        o ponto da falta
+        
+        comprimentoMinimo, comprimentoMaximo: em km
+        
+        razao: a razão entre os comprimentos de circuitos pi vizinhos (> 1)
+        
+        Retorna:
+        --------
+        um array com os comprimentos, para comSecoes
+        '''
+        pontos = np.unique(np.clip(np.atleast_1d(pontos), 0, 
+                                   comprimentoDaLinha))
+        
+        # comprimento desejado em cada posição: cresce linearmente com a 
+        # distância ao ponto mais próximo, o que dá a progressão geométrica
+        def comprimento(x):
+            distancia = np.abs(x[:, None] - pontos).min(axis = 1)
+            return np.minimum(comprimentoMinimo + (razao - 1) * distancia, 
+                              comprimentoMaximo)
+        
+        limites = np.unique(np.concatenate(([0, comprimentoDaLinha], pontos)))
+        secoes = []
+        
+        # em cada trecho entre pontos, os nós são distribuídos de forma que
+        # a integral de 1/comprimento(x) entre nós vizinhos seja constante
+        for a, b in zip(limites[:-1], limites[1:]):
+            x = np.linspace(a, b, 2001)
+            densidade = 1 / comprimento(x)
+            
+            F = np.concatenate(([0], np.cumsum((densidade[1:] + 
+                                                densidade[:-1]) / 2 * 
+                                               np.diff(x))))
+            
+            n = max(1, int(np.ceil(F[-1] - 1e-9)))
+            nos = np.interp(np.linspace(0, F[-1], n + 1), F, x)
+            nos[[0, -1]] = a, b
+            
+            secoes.append(np.diff(nos))
+            
+        return np.concatenate(secoes)
+        
+
+    @staticmethod
+    def matrizTridiagonal(Ad, As, Ai, ordem):
+        '''
+        
+        Monta a matriz tridiagonal em blocos: 'ordem' blocos Ad na diagonal
+        principal, As na diagonal superior e Ai na diagonal inferior.
+        
+        Os índices de todos os blocos são gerados de uma só vez, por aritmética
+        de deslocamentos, de forma que o custo cresce linearmente com 'ordem'.
+        
+        Retorna:
+        --------
+        matriz esparsa no formato CSR, de dimensão (ordem*m1, ordem*m1)
+        '''
+        Ad = sp.sparse.coo_matrix(Ad)
+        As = sp.sparse.coo_matrix(As)
+        Ai = sp.sparse.coo_matrix(Ai)
+        
+        if ordem == 1:
+            return Ad.tocsr()
+        
+        m1 = Ad.shape[0]
+        
+        # deslocamento de cada bloco ao longo da diagonal
+        off = np.arange(ordem)[:, None] * m1
+        
+        # diagonal principal
+        valores = [np.tile(Ad.data, ordem)]
+        linhas = [(Ad.row + off).ravel()]
+        colunas = [(Ad.col + off).ravel()]
+        
+        # diagonal superior
+        valores.append(np.tile(As.data, ordem - 1))
+        linhas.append((As.row + off[:-1]).ravel())
+        colunas.append((As.col + off[1:]).ravel())
+        
+        # diagonal inferior
+        valores.append(np.tile(Ai.data, ordem - 1))
+        linhas.append((Ai.row + off[1:]).ravel())
+        colunas.append((Ai.col + off[:-1]).ravel())
+        
+        return sp.sparse.csr_matrix((np.concatenate(valores),
+                                    (np.concatenate(linhas),
+                                     np.concatenate(colunas))),
+                                    shape = (ordem*m1, ordem*m1))
+    
+    
+    @staticmethod
+    def resolverSistemaEDO(A, B, u, t, x0 = None, **opcoes):
+        '''        
+        Resolve um sistema da forma: X'(t) = A*X(t) + B*u(t)
+    
+        Argumentos:
+        -------
+        A: uma matriz quadrada esparsa de ordem n
+    
+        B: um vetor esparso de dimensão n
+    
+        u: a entrada, uma função com argumento 't'
+    
+        t: os pontos nos quais x é calculado
+    
+        x0: as condições iniciais, nulas por padrão; dimensão n. Para resolver
+        K sistemas (lote) de uma vez, x0 tem forma (n, K) e u(t) retorna K
+        valores; o estado é então uma matriz e A*X um produto esparso-denso.
+        
+        opcoes: argumentos adicionais repassados a odeint (rtol, atol, hmax...)
+    
+        Retorna:
+        --------
+        X = um array da forma (len(t), len(x)) com os valores das variáveis
+        calculados (resposta); (len(t), n, K) para um lote.
+        '''
+        if x0 is None:
+            x0 = np.zeros(A.shape[0])
+            
+        x0 = np.asarray(x0, dtype = float)
+        forma = x0.shape
+    
+        A = sp.sparse.csr_matrix(A)
+        b = sp.sparse.csr_matrix(B).toarray().ravel()
+    
+        def func(x, t): # dx/dt = f(x,t)
+            # calcula a derivada das variáveis
+            X = x.reshape(forma)
+            return (A @ X + np.multiply.outer(b, u(t))).ravel()
+    
+        X = sp.integrate.odeint(func, x0.ravel(), t, **opcoes)
+        
+        return X.reshape((-1,) + forma)
+    
+    
+    @staticmethod
+    def resolverSistemaExponencial(A, B, u, t, x0 = None, 
+                                   instantesComutacao = ()):
+        '''
+        
+        Resolve um sistema da forma: X'(t) = A*X(t) + B*u(t) de forma exata,
+        por meio da exponencial de matriz, para entradas constantes por partes.
+        
+        A entrada é mantida constante entre dois instantes de comutação, com o
+        valor u(t) do início de cada trecho. O estado é aumentado com a própria
+        entrada:
+            
+            [X']   [A  B] [X]
+            [u'] = [0  0] [u]
+        
+        de forma que a resposta em todos os pontos de um trecho é obtida com
+        uma única chamada de expm_multiply, sem erro de passo de integração.
+    
+        Argumentos:
+        -------
+        A: uma matriz quadrada esparsa de ordem n
+    
+        B: um vetor esparso de dimensão n
+    
+        u: a entrada, uma função com argumento 't', constante por partes
+    
+        t: os pontos nos quais x é calculado, em ordem crescente
+    
+        x0: as condições iniciais, nulas por padrão; dimensão n, ou (n, K)
+        para um lote (ver resolverSistemaEDO)
+        
+        instantesComutacao: os instantes nos quais u muda de valor; vazio
+        (padrão) para uma entrada constante
+    
+        Retorna:
+        --------
+        X = um array da forma (len(t), len(x)) com os valores das variáveis
+        calculados (resposta); (len(t), n, K) para um lote.
+        '''
+        n = A.shape[0]
+        t = np.asarray(t, dtype = float)
+        
+        if x0 is None:
+            x0 = np.zeros(n)
+            
+        x0 = np.asarray(x0, dtype = float)
+        
+        zero = sp.sparse.csr_matrix((1, 1))
+        Aaum = sp.sparse.bmat([[A, B], [None, zero]], format = 'csr')
+        
+        def avancar(z, tau):
+            # avalia exp(Aaum*tau)*z para os instantes tau (crescentes, >= 0)
+            passos = np.diff(tau)
+            
+            if tau.size > 1 and np.allclose(passos, passos[0]):
+                return sp.sparse.linalg.expm_multiply(Aaum, z, start = tau[0],
+                                    stop = tau[-1], num = tau.size,
+                                    endpoint = True)
+            
+            Z = np.empty((tau.size,) + z.shape)
+            anterior = 0.0
+            for k in range(tau.size):
+                if tau[k] > anterior:
+                    z = sp.sparse.linalg.expm_multiply(Aaum * (tau[k] - anterior),
+                                                       z)
+                Z[k] = z
+                anterior = tau[k]
+                
+            return Z
+        
+        # trechos nos quais a entrada é constante
+        limites = [c for c in sorted(instantesComutacao) if t[0] < c <= t[-1]]
+        limites = [t[0]] + limites + [np.inf]
+        
+        X = np.empty((t.size,) + x0.shape)
+        
+        # a última linha do estado aumentado guarda a entrada
+        z = np.concatenate((x0, np.zeros((1,) + x0.shape[1:])))
+        tz = t[0] # instante ao qual o estado z se refere
+        
+        for inicio, fim in zip(limites[:-1], limites[1:]):
+            # leva o estado até o início do trecho, ainda com a entrada antiga
+            if inicio > tz:
+                z = avancar(z, np.array([inicio - tz]))[-1]
+                
+            z[-1] = u(inicio)
+            
+            i0, i1 = np.searchsorted(t, [inicio, fim], side = 'left')
+            
+            if i1 > i0:
+                Z = avancar(z, t[i0:i1] - inicio)
+                X[i0:i1] = Z[:, :n]
+                z = Z[-1]
+                tz = t[i1 - 1]
+            else:
+                tz = inicio
+            
+        return X
+    
+    
+    @staticmethod
+    def resolverSistemaRigido(A, B, u, t, x0 = None, integrador = 'BDF', 
+                              **opcoes):
+        '''
+        
+        Resolve um sistema rígido da forma: X'(t) = A*X(t) + B*u(t) com um
+        integrador implícito de solve_ivp.
+        
+        O jacobiano do sistema é a própria matriz A, constante e esparsa; ele é
+        entregue pronto aos integradores BDF e Radau, que fatoram apenas
+        matrizes esparsas. O LSODA não aceita jacobiano esparso; para ele são
+        informadas as larguras de banda de A, de forma que o jacobiano numérico
+        custa apenas alguns cálculos da derivada.
+        
+        A derivada é calculada com um único produto esparso por chamada, sem
+        conversões para np.matrix nem produtos com B esparso. Em um lote, o
+        jacobiano do estado achatado é kron(A, I), montado uma só vez.
+    
+        Argumentos:
+        -------
+        integrador: 'BDF' (padrão), 'Radau' ou 'LSODA'
+        
+        opcoes: argumentos adicionais repassados a solve_ivp (rtol, atol...)
+        
+        Os demais argumentos e o retorno são os mesmos de resolverSistemaEDO.
+        '''
+        if x0 is None:
+            x0 = np.zeros(A.shape[0])
+            
+        x0 = np.asarray(x0, dtype = float)
+        forma = x0.shape
+            
+        A = sp.sparse.csr_matrix(A)
+        B = sp.sparse.coo_matrix(B)
+        
+        # B tem poucos elementos não nulos; só eles recebem a entrada
+        indicesB = B.row
+        valoresB = B.data
+        
+        def func(t, x): # dx/dt = f(t,x)
+            dx = A @ x.reshape(forma)
+            dx[indicesB] += np.multiply.outer(valoresB, u(t))
+            return dx.ravel()
+        
+        if x0.ndim > 1:
+            J = sp.sparse.kron(A, sp.sparse.identity(forma[1]), format = 'csr')
+        else:
+            J = A
+        
+        if integrador == 'LSODA':
+            J = J.tocoo()
+            opcoes.setdefault('lband', int(max(0, (J.row - J.col).max())))
+            opcoes.setdefault('uband', int(max(0, (J.col - J.row).max())))
+        else:
+            opcoes.setdefault('jac', J)
+            
+        resultado = sp.integrate.solve_ivp(func, (t[0], t[-1]), x0.ravel(), 
+                                           method = integrador, t_eval = t,
+                                           **opcoes)
+        
+        if not resultado.success:
+            raise RuntimeError(resultado.message)
+            
+        return resultado.y.T.reshape((-1,) + forma)
+    
+    
+    @staticmethod
+    def resolverSistemaTrapezio(A, B, u, t, x0 = None, fatoracao = None,
+                                C = None, dtype = float):
+        '''
+        
+        Resolve um sistema da forma: X'(t) = A*X(t) + B*u(t) pela regra
+        trapezoidal com passo fixo, como no EMTP-ATP:
+            
+            (I - dt/2*A) X[k+1] = (I + dt/2*A) X[k] + dt/2*B*(u[k] + u[k+1])
+        
+        A matriz (I - dt/2*A) é fatorada uma única vez (LU esparsa); cada passo
+        custa apenas um produto esparso e uma retrossubstituição, o que torna o
+        custo por passo previsível e independente da rigidez do sistema.
+        
+        Argumentos:
+        -------
+        t: os pontos nos quais x é calculado, igualmente espaçados; o passo
+        de integração é dt = t[1] - t[0]
+        
+        fatoracao: uma fatoração pronta de (I - dt/2*A), com o método solve(b);
+        por exemplo, linha.fatorarBlocoTridiagonal(1, dt/2), que dispensa a LU
+        esparsa geral em linhas muito longas. Se None (padrão), usa splu. Em
+        um lote, a mesma fatoração resolve todos os K sistemas a cada passo.
+        
+        C, dtype: ver resolverSistema; apenas o estado do passo atual é mantido.
+        
+        Os demais argumentos e o retorno são os mesmos de resolverSistemaEDO.
+        '''
+        n = A.shape[0]
+        t = np.asarray(t, dtype = float)
+        
+        if x0 is None:
+            x0 = np.zeros(n)
+        
+        x0 = np.asarray(x0, dtype = float)
+        
+        if C is None:
+            saida = lambda x: x
+        else:
+            saida = lambda x: C @ x
+        
+        X = np.empty((t.size,) + saida(x0).shape, dtype = dtype)
+        X[0] = saida(x0)
+        
+        if t.size == 1:
+            return X
+        
+        dt = t[1] - t[0]
+        
+        if not np.allclose(np.diff(t), dt):
+            raise ValueError('t deve ser igualmente espaçado para a ' + 
+                             'integração trapezoidal.')
+        
+        I = sp.sparse.identity(n, format = 'csr')
+        A = sp.sparse.csr_matrix(A)
+        
+        Mmais = (I + dt/2 * A).tocsr()
+        
+        if fatoracao is None:
+            fatoracao = sp.sparse.linalg.splu((I - dt/2 * A).tocsc())
+        
+        b = dt/2 * sp.sparse.csr_matrix(B).toarray().ravel()
+        
+        x = x0
+        uAnterior = u(t[0])
+        for k in range(1, t.size):
+            uAtual = u(t[k])
+            x = fatoracao.solve(Mmais @ x + 
+                                np.multiply.outer(b, uAnterior + uAtual))
+            X[k] = saida(x)
+            uAnterior = uAtual
+            
+        return X
+    
+    
+    @classmethod
+    def resolverSistema(cls, A, B, u, t, x0 = None, metodo = 'odeint', 
+                        C = None, dtype = float, pontosPorBloco = 1000,
+                        eventos = (), completar = False, **opcoes):
+        '''
+        
+        Resolve um sistema da forma: X'(t) = A*X(t) + B*u(t) com o método
+        escolhido.
+        
+        Argumentos:
+        -------
+        metodo: 'odeint' (padrão), integração adaptativa com odeint;
+                'expm', solução exata para entradas constantes por partes
+                (ver resolverSistemaExponencial);
+                'BDF', 'Radau' ou 'LSODA', integradores implícitos para
+                sistemas rígidos (ver resolverSistemaRigido);
+                'trapezio', regra trapezoidal com passo fixo, como no
+                EMTP-ATP (ver resolverSistemaTrapezio)
+        
+        C: matriz de observação, de forma (p, n). Se informada, apenas as
+        saídas Y = C*X são guardadas: a integração é feita em blocos de
+        pontosPorBloco instantes (a trapezoidal, passo a passo), de forma que
+        a memória cresce com o número de saídas e não com a ordem do sistema.
+        
+        dtype: o tipo do array retornado (por exemplo, np.float32)
+        
+        eventos: critérios de parada, verificados ao final de cada bloco de
+        pontosPorBloco instantes; a integração termina no primeiro instante 
+        em que um deles é atendido (ver CriterioAssentamento, EventoInstante).
+        Cada evento é uma função (t, Y, inicio), que recebe os instantes e os
+        valores calculados até o momento e retorna o índice do instante de
+        parada, procurado a partir de 'inicio', ou None.
+        
+        completar: ver encerrarNoEvento; por padrão, o resultado termina no 
+        instante de parada
+        
+        opcoes: argumentos adicionais repassados ao método escolhido
+        
+        Retorna:
+        --------
+        X, como em resolverSistemaEDO; ou, se C for informada, um array da
+        forma (len(t), p) com as saídas ((len(t), p, K) para um lote).
+        '''
+        resolver = cls.metodoSolucao(metodo)
+        
+        if C is None and not eventos:
+            return resolver(A, B, u, t, x0, **opcoes).astype(dtype, copy = False)
+        
+        if C is not None:
+            C = sp.sparse.csr_matrix(C)
+        
+        if metodo == 'trapezio' and not eventos:
+            return resolver(A, B, u, t, x0, C = C, dtype = dtype, **opcoes)
+        
+        Y = None
+        parada = None
+        
+        for i0, i1, Yb in cls.resolverSistemaEmBlocos(A, B, u, t, x0, metodo,
+                                        C, dtype, pontosPorBloco, **opcoes):
+            if Y is None:
+                Y = np.empty((len(t),) + Yb.shape[1:], dtype = dtype)
+            Y[i0:i1] = Yb
+            
+            parada = cls.verificarEventos(eventos, t[:i1], Y[:i1], i0)
+            
+            if parada is not None:
+                break
+            
+        if parada is not None:
+            Y = cls.encerrarNoEvento(Y, t, parada[0], parada[1], completar)
+            
+        return Y
+    
+    
+    @staticmethod
+    def verificarEventos(eventos, t, Y, inicio):
+        '''
+        
+        Verifica os eventos (ver resolverSistema) nos instantes a partir de
+        'inicio'.
+        
+        Retorna:
+        --------
+        (indice, evento) do primeiro evento atendido, ou None
+        '''
+        parada = None
+        
+        for evento in eventos:
+            k = evento(t, Y, inicio)
+            
+            if k is not None and (parada is None or k < parada[0]):
+                parada = (int(k), evento)
+                
+        return parada
+    
+    
+    @staticmethod
+    def encerrarNoEvento(Y, t, indice, evento, completar = False):
+        '''
+        
+        Encerra o resultado Y no instante de parada t[indice].
+        
+        Com completar = True e um evento de regime permanente (com o atributo
+        periodo, como CriterioAssentamento), os instantes seguintes são
+        preenchidos com a repetição do último período, de forma que o
+        resultado mantém a forma (len(t), ...), como se a simulação tivesse
+        ido até o fim. Nos demais casos, retorna Y[:indice+1].
+        '''
+        periodo = getattr(evento, 'periodo', None)
+        
+        if not completar or periodo is None or len(t) < 2:
+            return Y[:indice + 1]
+        
+        dt = t[1] - t[0]
+        n = max(1, int(round(periodo / dt)))
+        
+        if n > indice + 1 or not np.allclose(np.diff(t), dt):
+            return Y[:indice + 1]
+        
+        restantes = len(t) - indice - 1
+        Y[indice + 1:] = Y[indice + 1 - n + np.arange(restantes) % n]
+        
+        return Y
+    
+    
+    @classmethod
+    def metodoSolucao(cls, metodo):
+        '''
+        
+        Retorna a função que resolve o sistema pelo método pedido (ver
+        resolverSistema).
+        '''
+        metodos = {'odeint': cls.resolverSistemaEDO,
+                   'expm': cls.resolverSistemaExponencial,
+                   'BDF': partial(cls.resolverSistemaRigido, integrador = 'BDF'),
+                   'Radau': partial(cls.resolverSistemaRigido, 
+                                    integrador = 'Radau'),
+                   'LSODA': partial(cls.resolverSistemaRigido, 
+                                    integrador = 'LSODA'),
+                   'trapezio': cls.resolverSistemaTrapezio}
+        
+        if metodo not in metodos:
+            raise ValueError('metodo deve ser um de: ' + 
+                             ', '.join(sorted(metodos)) + '.')
+        
+        return metodos[metodo]
+    
+    
+    @classmethod
+    def resolverSistemaEmBlocos(cls, A, B, u, t, x0 = None, metodo = 'odeint',
+                                C = None, dtype = float, pontosPorBloco = 1000,
+                                **opcoes):
+        '''
+        
+        Resolve o sistema como resolverSistema, mas em blocos de até
+        pontosPorBloco instantes, entregues um a um (gerador) assim que são
+        calculados. Cada bloco é integrado a partir do último estado do bloco
+        anterior; apenas um bloco de estados fica em memória por vez.
+        
+        Na integração trapezoidal, a fatoração é feita uma única vez e
+        reaproveitada por todos os blocos.
+        
+        Retorna (gerador):
+        --------
+        (i0, i1, Y): Y contém os estados (ou as saídas C*X) nos instantes
+        t[i0:i1]
+        '''
+        resolver = cls.metodoSolucao(metodo)
+        
+        if x0 is None:
+            x0 = np.zeros(A.shape[0])
+            
+        x = np.asarray(x0, dtype = float)
+        
+        if C is None:
+            projetar = lambda X: X
+        else:
+            C = sp.sparse.csr_matrix(C)
+            projetar = lambda X: _projetarSaida(C, X)
+        
+        if (metodo == 'trapezio' and opcoes.get('fatoracao') is None and 
+            len(t) > 1):
+            dt = t[1] - t[0]
+            I = sp.sparse.identity(A.shape[0], format = 'csc')
+            opcoes['fatoracao'] = sp.sparse.linalg.splu((I - dt/2 * A).tocsc())
+        
+        i0 = 0
+        while i0 < len(t):
+            i1 = min(i0 + pontosPorBloco, len(t))
+            
+            # o bloco começa no último instante do anterior
+            inicio = max(i0 - 1, 0)
+            
+            if i1 - inicio > 1:
+                X = resolver(A, B, u, t[inicio:i1], x, **opcoes)
+            else:
+                X = x[None]
+                
+            x = X[-1]
+            
+            yield i0, i1, projetar(X[i0 - inicio:]).astype(dtype, copy = False)
+            
+            i0 = i1
+    
+        
+    def espacoEstadosUmPi(self):
+        '''
+        
+        Gera o espaço de estado de um circuito Pi.
+        
+        Parâmetros:
+        -----
+        Vin: tensão de entrada
+        
+        
+        Retorna:
+        ----
+        [A, B]: matrizes esparsas no formato COOrdinate.
+        dimensao da matriz A
+        '''        
+        # Matriz A
+        # Os elementos não nulos são: primeira linha, primeira coluna, e
+        # diagonal principal
+        
+        # elemento a_11 de A
+        a_11 = -self.resistenciaConcentrada.sum() / self.indutanciaConcentrada[0]
+        
+        resistencias = self.resistenciaConcentrada[1:].copy()
+        
+        m = resistencias.size
+        
+        resistenciasPrimeiraLinha = resistencias / self.indutanciaConcentrada[0]
+        
+        resistencias = resistencias / self.indutanciaConcentrada[1:]
+            
+        # determinar a primeira linha, sem o primeiro elemento
+        __lo = (-1) / self.indutanciaConcentrada[0]
+        primeiraLinha = np.append(resistenciasPrimeiraLinha, __lo)
+        
+        # determinar a diagonal principal
+        __gc = -self.capacitanciaConcentrada / self.condutanciaConcentrada
+        diagonalPrincipal = np.append(a_11, -resistencias)
+        diagonalPrincipal = np.append(diagonalPrincipal, __gc)
+
+        # determinar a primeira coluna, sem o primeiro elemento
+        __c2 = 2 / self.capacitanciaConcentrada
+        primeiraColuna = np.append(resistencias, __c2)
+        
+        
+        # A será criada como uma matriz esparsa. Os valores não nulos serão
+        # entrados na ordem: diagonalPrincipal, primeiraColuna, primeiraLinha
+        
+        valoresA = np.append(diagonalPrincipal, primeiraColuna)
+        valoresA = np.append(valoresA, primeiraLinha)
+        
+        indiceLinhas = [None] * valoresA.size
+        indiceColunas = [None] * valoresA.size
+        
+        __s = diagonalPrincipal.size
+        
+        for n in range(__s): 
+            indiceLinhas[n] = n
+            indiceColunas[n] = n
+        
+        
+        for n in range(primeiraColuna.size): 
+            indiceLinhas[n + __s] = n + 1
+            indiceColunas[n + __s] = 0
+            
+        
+        __s += primeiraColuna.size
+        
+        for n in range(primeiraLinha.size): 
+            indiceLinhas[n + __s] = 0
+            indiceColunas[n + __s] = n + 1
+            
+            
+        dimensao = m+2
+        
+        A = sp.sparse.coo_matrix((valoresA, (indiceLinhas, indiceColunas)),
+                              shape = (dimensao, dimensao))
+        
+        valorB = np.array([-primeiraLinha[-1]]) # pega o último elemento
+        
+        B = sp.sparse.coo_matrix((valorB , ([0], [0])), shape = (dimensao, 1))
+        
+        return A,B
+
+        
+    def espacoEstadosLinha(self):
+        '''
+        
+        Gera as matrizes do espaço de estados da linha, no formato CSR.
+        
+        As matrizes são guardadas em cacheMatrizes, pelos parâmetros da linha
+        (e gravadas em disco, se cacheMatrizes.diretorio for definido); não
+        devem ser alteradas.
+        '''
+        return cacheMatrizes.obter(('espacoEstados',) + self.chave, 
+                                   self._montarEspacoEstadosLinha, 
+                                   persistir = True)
+    
+    
+    def _montarEspacoEstadosLinha(self):
+        '''
+        
+        Monta as matrizes do espaço de estados da linha (ver 
+        espacoEstadosLinha).
+        '''
+        M = self.espacoEstadosUmPi()
+        
+        # submatriz diagonal superior
+        As = sp.sparse.coo_matrix( ([-1/self.capacitanciaConcentrada],
+                                ([M[0].shape[0] - 1], [0])), shape = M[0].shape)
+        
+        # submatriz diagonal inferior
+        Ai = sp.sparse.coo_matrix( ([1/self.indutanciaConcentrada[0]],
+                                 ([0], [M[0].shape[0] - 1])), shape = M[0].shape)
+        
+        ordem = self.numeroCircuitoPi
+        
+        A = self.matrizTridiagonal(Ad=M[0], As=As, Ai=Ai, ordem=ordem)
+        
+        B = sp.sparse.csr_matrix((M[1].data, (M[1].row, M[1].col)), 
+                                 shape = (A.shape[0], 1))
+        
+        ligacoes = self.comprimentoSecaoPi / self.comprimentosSecoes
+        
+        if not np.allclose(ligacoes, 1):
+            # circuitos pi de comprimentos diferentes (ver comSecoes): os 
+            # elementos que ligam correntes e tensões são divididos pelo
+            # comprimento do circuito pi, nas correntes (1/L0), e nas tensões
+            # (1/C) pela média dos dois circuitos pi vizinhos ao nó, como em
+            # LinhaTrifasicaPiCascata; no receptor, pelo último circuito pi
+            nos = self.comprimentoSecaoPi / np.append(
+                    (self.comprimentosSecoes[1:] + 
+                     self.comprimentosSecoes[:-1]) / 2,
+                    self.comprimentosSecoes[-1])
+            
+            m1 = M[0].shape[0]
+            tensao = np.arange(A.shape[0]) % m1 == m1 - 1
+            
+            A = A.tocoo()
+            acoplamento = tensao[A.row] != tensao[A.col]
+            bloco = A.row[acoplamento] // m1
+            A.data[acoplamento] *= np.where(tensao[A.row[acoplamento]], 
+                                            nos[bloco], ligacoes[bloco])
+            A = A.tocsr()
+            
+            B = B * ligacoes[0]
+                
+        return A, B
+    
+    
+    def fatorarTrapezio(self, dt):
+        '''
+        
+        Fatoração LU esparsa de (I - dt/2*A), usada pela integração
+        trapezoidal com passo dt; guardada em cacheMatrizes.
+        '''
+        def fatorar():
+            A = self.espacoEstadosLinha()[0]
+            I = sp.sparse.identity(A.shape[0], format = 'csc')
+            return sp.sparse.linalg.splu((I - dt/2 * A).tocsc())
+        
+        return cacheMatrizes.obter(('trapezio', float(dt)) + self.chave, fatorar)
+    
+    
+    def _opcoesMetodo(self, metodo, t, opcoes):
+        '''
+        
+        Função auxiliar. Na integração trapezoidal, usa a fatoração guardada
+        em cacheMatrizes, se outra não for informada.
+        '''
+        if (metodo == 'trapezio' and opcoes.get('fatoracao') is None and 
+            len(t) > 1):
+            opcoes['fatoracao'] = self.fatorarTrapezio(t[1] - t[0])
+            
+        return opcoes
+        
+        
+    def simularLinha(self, tensaoEmissor, t, x0 = None, metodo = 'odeint',
+                     saidas = None, dtype = float, **opcoes):
+        '''
+        
+        Simula a linha considerando o terminal receptor em vazio.
+        
+        Argumentos:
+        -------
+        tensaoEmissor: a tensão no terminal emissor, uma função com argumento 't'
+        
+        t: os pontos nos quais X é calculado
+        
+        x0: as condições iniciais, nulas por padrão
+        
+        metodo: o método de solução, ver resolverSistema; 'odeint' por padrão.
+        Para fontes constantes (ou constantes por partes, informando
+        instantesComutacao) 'expm' dá a resposta exata.
+        
+        saidas: as saídas a calcular (ver matrizSaida); None (padrão) retorna
+        todas as variáveis de estado. Apenas as saídas são guardadas.
+        
+        dtype: o tipo do array retornado (por exemplo, np.float32)
+        
+        opcoes: argumentos adicionais repassados ao método de solução. Com
+        eventos (ver resolverSistema), a simulação termina assim que um deles
+        é atendido, por exemplo no regime permanente:
+            
+            eventos = [CriterioAssentamento(1/60, instanteMinimo = tFalta)]
+            
+        e o resultado é truncado no instante de parada, ou completado com o
+        último período (completar = True).
+        
+        Retorna:
+        --------
+        um array da forma (len(t), len(x)) com os valores das variáveis 
+        calculados, ou (len(t), len(saidas)) com as saídas
+        '''
+        M = self.espacoEstadosLinha()
+        
+        C = None if saidas is None else self.matrizSaida(saidas)
+        
+        opcoes = self._opcoesMetodo(metodo, t, opcoes)
+        
+        return self.resolverSistema(M[0], M[1], tensaoEmissor, t, x0, 
+                                    metodo = metodo, C = C, dtype = dtype,
+                                    **opcoes)
+    
+    
+    def simularLinhaEmBlocos(self, tensaoEmissor, t, x0 = None, 
+                             metodo = 'odeint', saidas = None, dtype = float,
+                             pontosPorBloco = 1000, **opcoes):
+        '''
+        
+        Simula a linha como simularLinha, entregando os resultados em blocos
+        de até pontosPorBloco instantes, à medida que são calculados. Assim o
+        processamento seguinte (amostragem, FFT, gravação em disco...) pode
+        começar sem esperar o fim da simulação, e a trajetória completa nunca
+        fica inteira em memória.
+        
+        Retorna (gerador):
+        --------
+        (tBloco, Y): os instantes do bloco e os valores correspondentes, como
+        em simularLinha
+        '''
+        M = self.espacoEstadosLinha()
+        
+        C = None if saidas is None else self.matrizSaida(saidas)
+        
+        t = np.asarray(t, dtype = float)
+        
+        opcoes = self._opcoesMetodo(metodo, t, opcoes)
+        
+        for i0, i1, Y in self.resolverSistemaEmBlocos(M[0], M[1], tensaoEmissor,
+                                        t, x0, metodo, C, dtype, pontosPorBloco,
+                                        **opcoes):
+            yield t[i0:i1], Y
+            
+    
+    def simularLinhaArquivo(self, arquivo, tensaoEmissor, t, x0 = None, 
+                            metodo = 'odeint', saidas = None, dtype = float,
+                            pontosPorBloco = 1000, **opcoes):
+        '''
+        
+        Simula a linha em blocos (ver simularLinhaEmBlocos), gravando cada
+        bloco em disco assim que é calculado.
+        
+        Argumentos:
+        -------
+        arquivo: o caminho do arquivo de saída. Com extensão .h5 ou .hdf5, é
+        gravado em HDF5 (requer h5py), nos conjuntos 't' e 'Y'; caso
+        contrário, em um .npy mapeado em memória (numpy.memmap), que pode ser
+        lido com np.load(arquivo, mmap_mode = 'r').
+        
+        Os demais argumentos são os mesmos de simularLinhaEmBlocos.
+        
+        Retorna:
+        --------
+        o caminho do arquivo gravado
+        '''
+        hdf5 = arquivo.lower().endswith(('.h5', '.hdf5'))
+        
+        if hdf5:
+            import h5py
+            
+            f = h5py.File(arquivo, 'w')
+            f.create_dataset('t', data = np.asarray(t, dtype = float))
+            
+        Y = None
+        
+        try:
+            for tBloco, Yb in self.simularLinhaEmBlocos(tensaoEmissor, t, x0,
+                                            metodo, saidas, dtype, 
+                                            pontosPorBloco, **opcoes):
+                if Y is None:
+                    forma = (len(t),) + Yb.shape[1:]
+                    
+                    if hdf5:
+                        Y = f.create_dataset('Y', shape = forma, dtype = dtype,
+                                chunks = (min(pontosPorBloco, len(t)),) + 
+                                         Yb.shape[1:])
+                    else:
+                        Y = np.lib.format.open_memmap(arquivo, mode = 'w+', 
+                                                dtype = dtype, shape = forma)
+                    i0 = 0
+                
+                Y[i0:i0 + len(tBloco)] = Yb
+                i0 += len(tBloco)
+                
+        finally:
+            if hdf5:
+                f.close()
+            elif Y is not None:
+                Y.flush()
+                del Y
+            
+        return arquivo
+    
+    
+    def matrizSaida(self, saidas):
+        '''
+        
+        Monta a matriz de observação C (esparsa) para as saídas pedidas.
+        
+        Argumentos:
+        -------
+        saidas: uma lista com os nomes das saídas:
+            'correnteEmissor', a corrente série do primeiro circuito pi;
+            'tensaoReceptor', a tensão no terminal receptor;
+            ('corrente', k), a corrente série do k-ésimo circuito pi;
+            ('tensao', k), a tensão no fim do k-ésimo circuito pi;
+        com k de 1 a numeroCircuitoPi. Também pode ser a própria matriz C.
+        
+        Retorna:
+        --------
+        a matriz C no formato CSR, de forma (len(saidas), ordem)
+        '''
+        if sp.sparse.issparse(saidas) or isinstance(saidas, np.ndarray):
+            return sp.sparse.csr_matrix(saidas)
+        
+        m1 = self.resistenciaConcentrada.size + 1
+        
+        def indice(saida):
+            if saida == 'correnteEmissor':
+                return 0
+            
+            elif saida == 'tensaoReceptor':
+                return self.ordem - 1
+            
+            nome, k = saida
+            
+            if not 1 <= k <= self.numeroCircuitoPi:
+                raise ValueError('O circuito pi deve estar entre 1 e ' + 
+                                 'numeroCircuitoPi.')
+                
+            if nome == 'corrente':
+                return (k - 1) * m1
+            
+            elif nome == 'tensao':
+                return k * m1 - 1
+            
+            raise ValueError('Saída desconhecida: ' + str(saida))
+        
+        colunas = [indice(s) for s in saidas]
+        
+        return sp.sparse.csr_matrix((np.ones(len(colunas)), 
+                                     (np.arange(len(colunas)), colunas)),
+                                    shape = (len(colunas), self.ordem))
+
+
+    def simularLinhaLote(self, tensoesEmissor, t, x0 = None, 
+                         metodo = 'odeint', saidas = None, dtype = float, 
+                         **opcoes):
+        '''
+        
+        Simula a linha para K fontes e/ou K condições iniciais de uma só vez.
+        
+        Os K casos são integrados juntos, com o estado na forma de uma matriz
+        (n, K): os produtos esparsos passam a ser esparso-denso, e a mesma
+        fatoração (ou jacobiano) atende todo o lote.
+        
+        Argumentos:
+        -------
+        tensoesEmissor: uma lista com K funções de 't', ou uma única função
+        que retorna K valores para cada 't'. Uma função que retorna um único
+        valor é aplicada a todos os casos.
+        
+        t: os pontos nos quais X é calculado
+        
+        x0: as condições iniciais, nulas por padrão; dimensão n (as mesmas para
+        todos os casos) ou (K, n)
+        
+        metodo: o método de solução, ver resolverSistema
+        
+        saidas, dtype: ver simularLinha
+        
+        opcoes: argumentos adicionais repassados ao método de solução. Os 
+        eventos (ver simularLinha) são avaliados sobre todo o lote: o 
+        assentamento exige que todos os K casos tenham assentado.
+        
+        Retorna:
+        --------
+        um array da forma (K, len(t), len(x)) com os valores das variáveis
+        calculados, ou (K, len(t), len(saidas)) com as saídas
+        '''
+        if callable(tensoesEmissor):
+            fonte = tensoesEmissor
+        else:
+            fontes = list(tensoesEmissor)
+            fonte = lambda s: np.array([f(s) for f in fontes], dtype = float)
+            
+        K = valores = np.size(fonte(t[0]))
+        
+        if x0 is not None and np.ndim(x0) == 2:
+            if valores == 1:
+                K = np.shape(x0)[0]
+            elif np.shape(x0)[0] != valores:
+                raise ValueError('tensoesEmissor e x0 devem ter o mesmo ' + 
+                                 'número de casos.')
+        
+        if valores == 1:
+            unica = fonte
+            fonte = lambda s: np.full(K, unica(s), dtype = float)
+            
+        if x0 is None:
+            x0 = np.zeros((self.ordem, K))
+        elif np.ndim(x0) == 1:
+            x0 = np.repeat(np.asarray(x0, dtype = float)[:, None], K, axis = 1)
+        else:
+            x0 = np.asarray(x0, dtype = float).T
+            
+        M = self.espacoEstadosLinha()
+        
+        C = None if saidas is None else self.matrizSaida(saidas)
+        
+        opcoes = self._opcoesMetodo(metodo, t, opcoes)
+        
+        X = self.resolverSistema(M[0], M[1], fonte, t, x0, metodo = metodo,
+                                 C = C, dtype = dtype, **opcoes)
+        
+        return np.moveaxis(X, -1, 0)
+    
+    
+    def fatorarBlocoTridiagonal(self, alfa = 1.0, beta = 1.0):
+        '''
+        
+        Fatora (alfa*I - beta*A), sendo A a matriz do espaço de estados da
+        linha, explorando sua estrutura (ver FatoracaoBlocoTridiagonal).
+        
+        Retorna:
+        --------
+        um objeto FatoracaoBlocoTridiagonal, com o método solve(b); guardado
+        em cacheMatrizes
+        '''
+        def fatorar():
+            A = self.espacoEstadosLinha()[0]
+            return FatoracaoBlocoTridiagonal(A, 
+                                self.resistenciaConcentrada.size + 1, alfa, beta)
+        
+        return cacheMatrizes.obter(('blocos', alfa, beta) + self.chave, fatorar)
+
+    
+    
+    def decomposicaoModal(self, numeroModos = None):
+        '''
+        
+        Calcula a decomposição modal de A (A*V = V*diag(autovalores), W*V = I)
+        uma única vez; as chamadas seguintes usam o resultado guardado.
+        
+        Com numeroModos = None a decomposição é completa (densa), indicada
+        para ordens moderadas. Caso contrário são calculados apenas os
+        numeroModos modos mais lentos (menor |autovalor|, por eigs com
+        deslocamento em zero), e a contribuição quase estática dos modos
+        descartados é representada pela correção estática (a precisão deve
+        ser conferida, pois os modos mais rápidos são descartados):
+            
+            D = -inv(A)*B + V*diag(1/autovalores)*W*B
+        
+        Retorna:
+        --------
+        [autovalores, V, W, WB, D]: W*B é a entrada vista por cada modo; D é
+        None na decomposição completa.
+        '''
+        if numeroModos in self._modos:
+            return self._modos[numeroModos]
+        
+        A, B = self.espacoEstadosLinha()
+        b = B.toarray().ravel()
+        
+        if numeroModos is None:
+            autovalores, V = sp.linalg.eig(A.toarray())
+            W = sp.linalg.solve(V, np.identity(V.shape[0]))
+            D = None
+            
+        else:
+            A = A.tocsc()
+            V = sp.sparse.linalg.eigs(A, k = numeroModos, sigma = 0)[1]
+            U = sp.sparse.linalg.eigs(A.T.tocsc(), k = numeroModos, 
+                                      sigma = 0)[1]
+            
+            # projeção oblíqua nos subespaços à direita e à esquerda, sem
+            # parear autovetores um a um: cada ramo RL gera um grupo de
+            # autovalores quase repetidos (um por circuito pi)
+            W = sp.linalg.solve(U.T @ V, U.T)
+            autovalores, Y = sp.linalg.eig(W @ (A @ V))
+            V = V @ Y
+            W = sp.linalg.solve(Y, W)
+            
+            D = (-sp.sparse.linalg.spsolve(A, b) + 
+                 (V @ (W @ b / autovalores)).real)
+            
+        self._modos[numeroModos] = [autovalores, V, W, W @ b, D]
+        
+        return self._modos[numeroModos]
+    
+    
+    def _respostaModal(self, coordenadas, entrada, numeroModos):
+        '''
+        
+        Função auxiliar. Volta das coordenadas modais (modos x tempo) para as
+        variáveis de estado, somando a correção estática, se houver.
+        '''
+        V, D = self.decomposicaoModal(numeroModos)[1::3]
+        
+        X = (V @ coordenadas).real.T
+        
+        if D is not None and entrada is not None:
+            X += np.multiply.outer(entrada, D)
+            
+        return X
+    
+    
+    def respostaImpulso(self, t, numeroModos = None):
+        '''
+        
+        Resposta da linha a um impulso unitário de tensão no emissor, em forma
+        fechada a partir da decomposição modal (sem integração).
+        
+        Argumentos:
+        -------
+        t: os instantes (quaisquer, t >= 0) nos quais X é calculado
+        
+        numeroModos: ver decomposicaoModal
+        
+        Retorna:
+        --------
+        um array da forma (len(t), len(x))
+        '''
+        autovalores, V, W, WB, D = self.decomposicaoModal(numeroModos)
+        
+        t = np.asarray(t, dtype = float)
+        q = np.exp(np.outer(autovalores, t)) * WB[:, None]
+        
+        return self._respostaModal(q, None, numeroModos)
+    
+    
+    def respostaDegrau(self, t, amplitude = 1.0, x0 = None, numeroModos = None):
+        '''
+        
+        Resposta da linha a um degrau de tensão no emissor, aplicado em t = 0,
+        em forma fechada a partir da decomposição modal (sem integração).
+        
+        Argumentos:
+        -------
+        t: os instantes (quaisquer, t >= 0) nos quais X é calculado
+        
+        amplitude: a amplitude do degrau, em V
+        
+        x0: as condições iniciais, nulas por padrão
+        
+        numeroModos: ver decomposicaoModal
+        
+        Retorna:
+        --------
+        um array da forma (len(t), len(x))
+        '''
+        autovalores, V, W, WB, D = self.decomposicaoModal(numeroModos)
+        
+        t = np.asarray(t, dtype = float)
+        lt = np.outer(autovalores, t)
+        
+        # (exp(lt) - 1)/l, calculado sem cancelamento para l*t pequeno
+        q = np.expm1(lt) / autovalores[:, None] * (WB * amplitude)[:, None]
+        
+        if x0 is not None:
+            q += np.exp(lt) * (W @ x0)[:, None]
+            
+        return self._respostaModal(q, np.full(t.size, float(amplitude)), 
+                                   numeroModos)
+    
+    
+    def respostaSenoidal(self, t, amplitude, frequencia, fase = 0.0, x0 = None,
+                         numeroModos = None):
+        '''
+        
+        Resposta da linha à tensão amplitude*cos(2*pi*frequencia*t + fase) no
+        emissor, aplicada em t = 0, em forma fechada a partir da decomposição
+        modal (sem integração). Inclui o transitório de energização.
+        
+        Argumentos:
+        -------
+        t: os instantes (quaisquer, t >= 0) nos quais X é calculado
+        
+        amplitude: em V
+        
+        frequencia: em Hz
+        
+        fase: em radianos
+        
+        x0: as condições iniciais, nulas por padrão
+        
+        numeroModos: ver decomposicaoModal
+        
+        Retorna:
+        --------
+        um array da forma (len(t), len(x))
+        '''
+        autovalores, V, W, WB, D = self.decomposicaoModal(numeroModos)
+        
+        t = np.asarray(t, dtype = float)
+        w = 2 * np.pi * frequencia
+        l = autovalores[:, None]
+        
+        elt = np.exp(l * t)
+        
+        # cos(wt + fase) = (exp(j(wt + fase)) + exp(-j(wt + fase)))/2; cada
+        # exponencial é integrada contra exp(l(t - tau)) separadamente
+        q = 0
+        for sinal in (1, -1):
+            jw = sinal * 1j * w
+            q = q + (np.exp(sinal * 1j * fase) * (np.exp(jw * t) - elt) / 
+                     (jw - l))
+            
+        q = q * (WB * amplitude / 2)[:, None]
+        
+        if x0 is not None:
+            q += elt * (W @ x0)[:, None]
+            
+        return self._respostaModal(q, amplitude * np.cos(w * t + fase),
+                                   numeroModos)
+
+    
+    
+    def regimePermanente(self, harmonicos, t0 = 0.0):
+        '''
+        
+        Estado da linha no instante t0, em regime permanente, para a tensão no
+        emissor formada pela soma de componentes
+            amplitude*cos(2*pi*frequencia*t + fase)
+        
+        Cada componente é resolvida por fasores, (jw*I - A)*X = B*V, com a 
+        fatoração em blocos de (jw*I - A); o transitório de energização não é
+        simulado. O resultado é o x0 para simular a partir do regime 
+        permanente (por exemplo, antes de uma falta), com a tensão dada por
+        tensaoHarmonicos.
+        
+        Argumentos:
+        -------
+        harmonicos: lista de (frequencia, amplitude, fase), com a frequência 
+        em Hz (0 para a componente contínua), a amplitude em V e a fase em
+        radianos, como em respostaSenoidal; por exemplo 
+        [(60, 1.0, 0), (300, 0.05, 0)]
+        
+        t0: o instante, em segundos
+        
+        Retorna:
+        --------
+        x0, um array de dimensão n
+        '''
+        b = self.espacoEstadosLinha()[1].toarray().ravel()
+        x0 = np.zeros(self.ordem)
+        
+        for frequencia, amplitude, fase in harmonicos:
+            w = 2 * np.pi * frequencia
+            
+            X = self.fatorarBlocoTridiagonal(1j * w, 1.0).solve(
+                                        b * amplitude * np.exp(1j * fase))
+            
+            x0 += (X * np.exp(1j * w * t0)).real
+            
+        return x0
+    
+    
+    @staticmethod
+    def tensaoHarmonicos(harmonicos):
+        '''
+        
+        Tensão no emissor formada pela soma das componentes de harmonicos (ver
+        regimePermanente), como função de t; pode ser enviada a outros
+        processos (ao contrário de uma função lambda).
+        '''
+        return partial(_somaHarmonicos, tuple(map(tuple, harmonicos)))
+    
+    
+    def respostaEmFrequencia(self, frequencias, processos = None):
+        '''
+        
+        Calcula a função de transferência H(jw) = VR(jw)/VE(jw) entre a tensão
+        no terminal receptor (em vazio) e a tensão no emissor, resolvendo
+        (jw*I - A)*X = B para cada frequência.
+        
+        As soluções usam a eliminação em blocos de FatoracaoBlocoTridiagonal,
+        com o mesmo padrão (sem preenchimento) para todas as frequências, que
+        são processadas juntas, como vetores. Com processos > 1 a faixa de
+        frequências é dividida em partes, resolvidas em paralelo.
+        
+        Argumentos:
+        -------
+        frequencias: as frequências, em Hz
+        
+        processos: número de processos; None (padrão) resolve no processo atual
+        
+        Retorna:
+        --------
+        um array complexo com H(jw), da mesma forma de frequencias
+        '''
+        A, B = self.espacoEstadosLinha()
+        
+        coeficientes = FatoracaoBlocoTridiagonal.coeficientesBlocos(A, 
+                                        self.resistenciaConcentrada.size + 1)
+        b0 = B.toarray()[0, 0]
+        
+        frequencias = np.asarray(frequencias, dtype = float)
+        s = 2j * np.pi * frequencias.ravel()
+        
+        funcao = partial(_funcaoTransferenciaBlocos, coeficientes, b0)
+        
+        if processos is None or processos <= 1 or s.size < 2:
+            H = funcao(s)
+        else:
+            partes = [p for p in np.array_split(s, 4 * processos) if p.size]
+            
+            with ProcessPoolExecutor(processos) as executor:
+                H = np.concatenate(list(executor.map(funcao, partes)))
+                
+        return H.reshape(frequencias.shape)
+
+    
+    
+    def reduzirModelo(self, ordemReduzida, metodo = 'arnoldi', C = None,
+                      pontoExpansao = 0.0):
+        '''
+        
+        Gera um modelo de ordem reduzida (Ar, Br, Cr), denso, que reproduz as
+        saídas Y = C*X da linha.
+        
+        Argumentos:
+        -------
+        ordemReduzida: a ordem r do modelo reduzido
+        
+        metodo: 'arnoldi' (padrão), casamento dos r primeiros momentos de
+                H(s) em torno de pontoExpansao, por Arnoldi sobre
+                inv(A - pontoExpansao*I); viável para linhas longas, mas
+                sem garantia de estabilidade: um modelo instável não é
+                retornado (ValueError);
+                'balanceado', truncamento balanceado (denso, para ordens
+                moderadas), estável e com limite de erro de H(jw) igual a
+                2*sum(valores de Hankel descartados)
+        
+        C: a matriz de saída, de forma (numero de saídas, n); por padrão, a
+        tensão no terminal receptor (última variável de estado)
+        
+        pontoExpansao: o ponto (real) de expansão dos momentos para 'arnoldi'
+        
+        Retorna:
+        --------
+        um objeto ModeloReduzido
+        
+        Exceções:
+        --------
+        ValueError: se o modelo de Arnoldi tiver polos instáveis, cuja
+        resposta diverge da linha
+        '''
+        A, B = self.espacoEstadosLinha()
+        b = B.toarray().ravel()
+        n = A.shape[0]
+        
+        if C is None:
+            C = sp.sparse.csr_matrix(([1.0], ([0], [n - 1])), shape = (1, n))
+        C = sp.sparse.csr_matrix(C)
+        
+        if not 0 < ordemReduzida < n:
+            raise ValueError('ordemReduzida deve estar entre 1 e a ordem ' + 
+                             'da linha.')
+            
+        limiteErro = None
+        valoresHankel = None
+        
+        if metodo == 'arnoldi':
+            I = sp.sparse.identity(n, format = 'csc')
+            lu = sp.sparse.linalg.splu((A - pontoExpansao * I).tocsc())
+            
+            V = np.zeros((n, ordemReduzida))
+            w = lu.solve(b)
+            
+            for j in range(ordemReduzida):
+                # Gram-Schmidt com reortogonalização
+                for _ in range(2):
+                    w = w - V[:, :j] @ (V[:, :j].T @ w)
+                    
+                norma = np.linalg.norm(w)
+                if norma == 0:
+                    # subespaço invariante: os momentos seguintes já casam
+                    V = V[:, :j]
+                    break
+                
+                V[:, j] = w / norma
+                w = lu.solve(V[:, j])
+                
+            T, Ti = V, V.T
+            
+        elif metodo == 'balanceado':
+            Ad = A.toarray()
+            Cd = C.toarray()
+            
+            P = sp.linalg.solve_continuous_lyapunov(Ad, -np.outer(b, b))
+            Q = sp.linalg.solve_continuous_lyapunov(Ad.T, -Cd.T @ Cd)
+            
+            def fatorGramiano(G):
+                # G = F*F.T, tolerando autovalores negativos de arredondamento
+                autovalores, U = np.linalg.eigh((G + G.T) / 2)
+                return U * np.sqrt(np.maximum(autovalores, 0))
+            
+            Lp = fatorGramiano(P)
+            Lq = fatorGramiano(Q)
+            
+            Z, valoresHankel, Yt = np.linalg.svd(Lq.T @ Lp)
+            
+            r = ordemReduzida
+            escala = 1 / np.sqrt(valoresHankel[:r])
+            
+            T = (Lp @ Yt[:r].T) * escala
+            Ti = (Z[:, :r] * escala).T @ Lq.T
+            
+            limiteErro = 2 * valoresHankel[r:].sum()
+            
+        else:
+            raise ValueError('metodo deve ser \'arnoldi\' ou \'balanceado\'.')
+            
+        Ar = Ti @ (A @ T)
+        Br = (Ti @ b)[:, None]
+        Cr = C @ T
+        
+        # a projeção de Arnoldi (de um só lado) pode gerar polos instáveis
+        if metodo == 'arnoldi' and np.linalg.eigvals(Ar).real.max() >= 0:
+            raise ValueError('O modelo reduzido de ordem %d é instável; ' 
+                             % Ar.shape[0] + 'mude a ordem ou o ponto de ' +
+                             'expansão, ou use metodo = \'balanceado\'.')
+        
+        return ModeloReduzido(Ar, Br, Cr, self, C, limiteErro, valoresHankel)
+
+
+
+class ModeloReduzido(object):
+    '''
+    
+    Modelo de ordem reduzida da linha, gerado por 
+    LinhaDeTransmissaoPiCascata.reduzirModelo:
+        
+        Xr' = Ar*Xr + Br*TensaoNoEmissor
+        Y = Cr*Xr
+    
+    É simulado pelos mesmos métodos de solução da linha completa.
+    '''
+    
+    def __init__(self, Ar, Br, Cr, linha, C, limiteErro = None, 
+                 valoresHankel = None):
+        self.Ar = Ar
+        self.Br = Br
+        self.Cr = Cr
+        self.ordem = Ar.shape[0]
+        
+        # linha completa e sua matriz de saída, para medir o erro
+        self.linha = linha
+        self.C = C
+        
+        # limite teórico de max|H(jw) - Hr(jw)|, para o truncamento balanceado
+        self.limiteErro = limiteErro
+        self.valoresHankel = valoresHankel
+        
+        self.estavel = bool(np.linalg.eigvals(Ar).real.max() < 0)
+        
+        
+    def simularLinha(self, tensaoEmissor, t, x0 = None, metodo = 'odeint',
+                     dtype = float, **opcoes):
+        '''
+        
+        Simula o modelo reduzido, como LinhaDeTransmissaoPiCascata.simularLinha.
+        
+        x0: as condições iniciais do estado reduzido, nulas por padrão
+        
+        Retorna:
+        --------
+        um array da forma (len(t), numero de saídas) com as saídas Y
+        '''
+        return LinhaDeTransmissaoPiCascata.resolverSistema(self.Ar, self.Br,
+                                tensaoEmissor, t, x0, metodo = metodo, 
+                                C = self.Cr, dtype = dtype, **opcoes)
+    
+    
+    def erroMedido(self, tensaoEmissor, t, metodo = 'odeint', **opcoes):
+        '''
+        
+        Mede o erro do modelo reduzido em relação à linha completa, para a
+        tensão no emissor e os instantes dados.
+        
+        Retorna:
+        --------
+        [erroMaximo, erroRelativo]: o maior erro absoluto das saídas, e ele
+        dividido pelo maior valor absoluto das saídas da linha completa
+        '''
+        Y = self.linha.simularLinha(tensaoEmissor, t, metodo = metodo, 
+                                    saidas = self.C, **opcoes)
+        
+        Yr = self.simularLinha(tensaoEmissor, t, metodo = metodo, **opcoes)
+        
+        erroMaximo = np.abs(Y - Yr).max()
+        
+        return erroMaximo, erroMaximo / np.abs(Y).max()
+
+
+class CriterioAssentamento(object):
+    '''
+    
+    Critério de parada (ver LinhaDeTransmissaoPiCascata.resolverSistema) para
+    o regime permanente: durante um período inteiro, cada valor difere do
+    valor de um período antes em menos de tolerancia vezes o maior valor
+    absoluto calculado até então.
+    
+    Para fontes constantes, qualquer período (uma janela de tempo) serve;
+    para fontes periódicas, o período da fonte. instanteMinimo evita que o
+    regime pré-falta (por exemplo, partindo de regimePermanente) seja tomado
+    como o final: use o instante da falta; os dois períodos comparados
+    começam depois dele. O período deve ser um múltiplo do passo de tempo,
+    senão a diferença entre períodos não se anula (e o preenchimento de
+    encerrarNoEvento se defasa).
+    '''
+    
+    def __init__(self, periodo, tolerancia = 1e-3, instanteMinimo = 0.0):
+        self.periodo = periodo
+        self.tolerancia = tolerancia
+        self.instanteMinimo = instanteMinimo
+        
+        
+    def __call__(self, t, Y, inicio):
+        if len(t) < 2:
+            return None
+        
+        n = max(1, int(round(self.periodo / (t[1] - t[0]))))
+        
+        # o período que termina em k é comparado com o anterior
+        k0 = max(inicio, 2 * n)
+        if len(t) <= k0:
+            return None
+        
+        a = k0 - 2 * n
+        valores = np.abs(Y[a:]).reshape(len(t) - a, -1).max(axis = 1)
+        
+        escala = np.maximum.accumulate(valores)
+        if a > 0:
+            escala = np.maximum(escala, np.abs(Y[:a]).max())
+        
+        # diferença de cada instante j = a + n + i para o período anterior
+        diferenca = np.abs(Y[a + n:] - Y[a:len(t) - n]).reshape(
+                                            len(t) - a - n, -1).max(axis = 1)
+        ruins = np.append(0, np.cumsum(diferenca > self.tolerancia * 
+                                       escala[n:]))
+        
+        # número de instantes fora da tolerância em [k - n, k]
+        k = np.arange(k0, len(t))
+        foraDaTolerancia = ruins[k - a - n + 1] - ruins[k - a - 2 * n]
+        
+        atendido = np.nonzero((foraDaTolerancia == 0) & 
+                              (t[k - 2 * n] >= self.instanteMinimo))[0]
+        
+        return k[atendido[0]] if atendido.size else None
+    
+    
+class EventoInstante(object):
+    '''
+    
+    Evento de parada em um instante dado, por exemplo a abertura do
+    disjuntor, após a qual o caso não interessa mais.
+    '''
+    
+    def __init__(self, instante):
+        self.instante = instante
+        
+        
+    def __call__(self, t, Y, inicio):
+        k = int(np.searchsorted(t, self.instante))
+        
+        return max(k, inicio) if k < len(t) else None
+    
+
+def _somaHarmonicos(harmonicos, t):
+    '''
+    
+    Função auxiliar. Soma de amplitude*cos(2*pi*frequencia*t + fase), para
+    LinhaDeTransmissaoPiCascata.tensaoHarmonicos.
+    '''
+    return sum(amplitude * np.cos(2 * np.pi * frequencia * t + fase)
+               for frequencia, amplitude, fase in harmonicos)
+
+
+def _funcaoTransferenciaBlocos(coeficientes, b0, s):
+    '''
+    
+    Função auxiliar. Calcula o último elemento de X em (s*I - A)*X = b0*e0,
+    para um vetor de valores s, sendo A dada pelos coeficientes dos blocos
+    (ver FatoracaoBlocoTridiagonal.coeficientesBlocos).
+    
+    Com o lado direito não nulo apenas no primeiro elemento, a eliminação em
+    blocos se reduz a uma recorrência escalar (por valor de s) ao longo dos
+    blocos: o complemento de Schur e o primeiro elemento de cada bloco.
+    '''
+    diagonal, primeiraColuna, primeiraLinha, superior, inferior = coeficientes
+    N, m1 = diagonal.shape
+    e = m1 - 1
+    
+    # blocos iguais ao anterior reaproveitam os coeficientes
+    mudou = np.ones(N, dtype = bool)
+    mudou[1:] = ((diagonal[1:] != diagonal[:-1]).any(axis = 1) | 
+                 (primeiraColuna[1:] != primeiraColuna[:-1]).any(axis = 1) |
+                 (primeiraLinha[1:] != primeiraLinha[:-1]).any(axis = 1))
+    
+    s = np.asarray(s, dtype = complex)
+    v = np.full(s.shape, b0, dtype = complex)
+    
+    for k in range(N):
+        if mudou[k]:
+            d = s[None, :] - diagonal[k][:, None]
+            c = -primeiraColuna[k][:, None]
+            r = -primeiraLinha[k][:, None]
+            
+            base = d[0] - (r[1:] * c[1:] / d[1:]).sum(axis = 0)
+            
+        if k == 0:
+            schur = base
+        else:
+            li = -inferior[k-1]
+            su = -superior[k-1]
+            
+            # elimina o bloco anterior (seus coeficientes estão em dAnt...)
+            v = v * li * cAnt / (dAnt * schur)
+            sigma = (1 + cAnt * rAnt / (dAnt * schur)) / dAnt
+            schur = base - li * su * sigma
+            
+        dAnt, cAnt, rAnt = d[e], c[e], r[e]
+    
+    return -cAnt / dAnt * v / schur
+
+
+
+def _projetarSaida(C, X):
+    '''
+    
+    Função auxiliar. Calcula C*X[k] para cada instante k de X, de forma
+    (instantes, n) ou (instantes, n, K).
+    '''
+    n = X.shape[1]
+    
+    Y = C @ np.moveaxis(X, 1, 0).reshape(n, -1)
+    
+    return np.moveaxis(Y.reshape((C.shape[0], X.shape[0]) + X.shape[2:]), 0, 1)
+
+def _recorrenciaLinear(a, kappa):
+    '''
+    
+    Função auxiliar. Calcula y[0] = a[0]; y[k] = a[k] + kappa[k]*y[k-1].
+    
+    Os trechos em que kappa é constante são resolvidos por lfilter (em C);
+    os demais, elemento a elemento.
+    '''
+    N = a.shape[0]
+    y = np.empty(a.shape, dtype = np.result_type(a, kappa))
+    y[0] = a[0]
+    
+    if N == 1:
+        return y
+    
+    # início de cada trecho com kappa constante
+    mudancas = np.nonzero(kappa[2:] != kappa[1:-1])[0] + 2
+    inicios = np.append(1, mudancas)
+    fins = np.append(mudancas, N)
+    
+    for i0, i1 in zip(inicios, fins):
+        k = kappa[i0]
+        
+        if i1 - i0 < 16:
+            for n in range(i0, i1):
+                y[n] = a[n] + k * y[n-1]
+        else:
+            y[i0:i1] = sp.signal.lfilter([1.0], [1.0, -k], a[i0:i1], axis = 0,
+                                         zi = k * y[i0-1][None])[0]
+            
+    return y
+
+
+class FatoracaoBlocoTridiagonal(object):
+    '''
+    
+    Fatoração de M = (alfa*I - beta*A), sendo A a matriz gerada por
+    espacoEstadosLinha, para resolver M*x = b em tempo linear e sem
+    preenchimento (fill-in).
+    
+    A é tridiagonal em blocos de dimensão m1. Cada bloco da diagonal é uma
+    matriz "seta" (arrowhead: primeira linha, primeira coluna e diagonal), e
+    os blocos fora da diagonal têm um único elemento não nulo: superior em
+    (m1-1, 0), inferior em (0, m1-1). Assim, a eliminação em blocos (Thomas)
+    altera apenas o primeiro elemento da diagonal de cada bloco, e cada bloco
+    seta é invertido em forma fechada pelo seu complemento de Schur:
+        
+        s = d0 - sum(r[i]*c[i]/d[i]), i >= 1
+    
+    A fatoração guarda apenas vetores de dimensão n.
+    '''
+    
+    def __init__(self, A, tamanhoBloco, alfa = 1.0, beta = 1.0):
+        '''
+        
+        Argumentos:
+        -------
+        A: a matriz esparsa do espaço de estados da linha
+        
+        tamanhoBloco: a dimensão m1 de cada bloco (len(R) + 1)
+        
+        alfa, beta: os coeficientes de M = alfa*I - beta*A; podem ser complexos
+        '''
+        diagonal, primeiraColuna, primeiraLinha, superior, inferior = \
+            self.coeficientesBlocos(A, tamanhoBloco)
+        
+        N, m1 = diagonal.shape
+        e = m1 - 1
+        
+        # blocos de M = alfa*I - beta*A
+        d = alfa - beta * diagonal
+        c = -beta * primeiraColuna
+        r = -beta * primeiraLinha
+        su = -beta * superior
+        li = -beta * inferior
+        
+        s = self.complementoSchur(d, c, r, su, li)
+        
+        self.dimensao = N * m1
+        self.tamanhoBloco = m1
+        self.numeroBlocos = N
+        self.d = d
+        self.c = c
+        self.r = r
+        self.su = su
+        self.s = s
+        
+        # coeficientes das recorrências de ida e de volta
+        if N > 1:
+            self.kappaIda = np.append(0, li * c[:-1, e] / (d[:-1, e] * s[:-1]))
+            self.lIda = np.append(0, li / d[:-1, e])
+            self.kappaVolta = r[:-1, e] * su / (d[:-1, e] * s[:-1])
+        
+    
+    @staticmethod
+    def coeficientesBlocos(A, tamanhoBloco):
+        '''
+        
+        Extrai de A os coeficientes dos blocos, todos de uma vez.
+        
+        Retorna:
+        --------
+        [diagonal, primeiraColuna, primeiraLinha, superior, inferior]: os três
+        primeiros na forma (N, m1), um bloco por linha; superior e inferior,
+        de dimensão N-1, são os elementos únicos dos blocos fora da diagonal.
+        '''
+        A = sp.sparse.coo_matrix(A)
+        A.sum_duplicates()
+        
+        m1 = int(tamanhoBloco)
+        
+        if m1 < 2 or A.shape[0] % m1 != 0:
+            raise ValueError('A dimensão de A deve ser múltipla de ' + 
+                             'tamanhoBloco, com tamanhoBloco >= 2.')
+        
+        N = A.shape[0] // m1
+        e = m1 - 1
+        
+        blocoLinha, il = np.divmod(A.row, m1)
+        blocoColuna, ic = np.divmod(A.col, m1)
+        
+        mesmoBloco = blocoLinha == blocoColuna
+        
+        diagonal = np.zeros((N, m1))
+        primeiraColuna = np.zeros((N, m1))
+        primeiraLinha = np.zeros((N, m1))
+        superior = np.zeros(max(N - 1, 0))
+        inferior = np.zeros(max(N - 1, 0))
+        
+        selecoes = [(mesmoBloco & (il == ic), diagonal, blocoLinha, il),
+                    (mesmoBloco & (ic == 0) & (il > 0), primeiraColuna, 
+                     blocoLinha, il),
+                    (mesmoBloco & (il == 0) & (ic > 0), primeiraLinha, 
+                     blocoLinha, ic),
+                    ((blocoColuna == blocoLinha + 1) & (il == e) & (ic == 0),
+                     superior, blocoLinha, None),
+                    ((blocoLinha == blocoColuna + 1) & (il == 0) & (ic == e),
+                     inferior, blocoColuna, None)]
+        
+        classificados = np.zeros(A.nnz, dtype = bool)
+        
+        for sel, destino, bloco, local in selecoes:
+            if local is None:
+                destino[bloco[sel]] = A.data[sel]
+            else:
+                destino[bloco[sel], local[sel]] = A.data[sel]
+            classificados |= sel
+            
+        if not classificados.all():
+            raise ValueError('A não tem a estrutura tridiagonal em blocos ' + 
+                             'seta gerada por espacoEstadosLinha.')
+        
+        return diagonal, primeiraColuna, primeiraLinha, superior, inferior
+    
+    
+    @staticmethod
+    def complementoSchur(d, c, r, su, li):
+        '''
+        
+        Calcula o complemento de Schur s[k] do primeiro elemento de cada bloco
+        seta após a eliminação dos blocos anteriores:
+            
+            s[0] = d[0,0] - w[0]
+            s[k] = d[k,0] - w[k] - li[k-1]*su[k-1]*sigma[k-1]
+            
+        com w[k] = sum(r[k,i]*c[k,i]/d[k,i]), i >= 1, e sigma[k] o último
+        elemento da diagonal da inversa do bloco k.
+        
+        Quando os coeficientes não mudam de um bloco para o outro (linha
+        uniforme) s converge rapidamente, e o restante é preenchido sem laço.
+        '''
+        N, m1 = d.shape
+        e = m1 - 1
+        
+        w = (r[:, 1:] * c[:, 1:] / d[:, 1:]).sum(axis = 1)
+        a = d[:, 0] - w
+        
+        # s[k] = a[k] - g[k] - h[k]/s[k-1]
+        p = li * su
+        g = np.append(0, p / d[:-1, e])
+        h = np.append(0, p * c[:-1, e] * r[:-1, e] / d[:-1, e]**2)
+        
+        # índice do próximo bloco cujos coeficientes mudam
+        mudou = np.ones(N, dtype = bool)
+        mudou[1:] = (a[1:] != a[:-1]) | (g[1:] != g[:-1]) | (h[1:] != h[:-1])
+        indicesMudanca = np.append(np.nonzero(mudou)[0], N)
+        proximaMudanca = indicesMudanca[np.searchsorted(indicesMudanca, 
+                                               np.arange(N), side = 'right')]
+        
+        s = np.empty(N, dtype = np.result_type(a, g, h))
+        s[0] = a[0]
+        
+        a, g, h = a.tolist(), g.tolist(), h.tolist()
+        mudou = mudou.tolist()
+        eps = 4 * np.finfo(float).eps
+        
+        k = 1
+        anterior = s[0].item()
+        while k < N:
+            atual = a[k] - g[k] - h[k] / anterior
+            s[k] = atual
+            
+            if not mudou[k] and abs(atual - anterior) <= eps * abs(atual):
+                # convergiu; s fica constante até a próxima mudança
+                proximo = proximaMudanca[k]
+                s[k+1:proximo] = atual
+                k = proximo
+                continue
+                
+            anterior = atual
+            k += 1
+            
+        return s
+        
+    
+    def solve(self, b):
+        '''
+        
+        Resolve M*x = b.
+        
+        Argumentos:
+        -------
+        b: um array de dimensão n, ou (n, K) para K lados direitos
+        
+        Retorna:
+        --------
+        x, com a mesma forma de b
+        '''
+        b = np.asarray(b)
+        forma = b.shape
+        
+        N, m1 = self.numeroBlocos, self.tamanhoBloco
+        e = m1 - 1
+        
+        tipo = np.result_type(b, self.d)
+        b = b.reshape(N, m1, -1)
+        
+        d = self.d[:, :, None]
+        r = self.r[:, :, None]
+        c = self.c[:, :, None]
+        s = self.s[:, None]
+        
+        # contribuição das linhas i >= 1 de cada bloco para a linha 0
+        rho = (r[:, 1:] * b[:, 1:] / d[:, 1:]).sum(axis = 1)
+        
+        # ida: primeiro elemento de cada bloco após a eliminação
+        if N > 1:
+            kappa = self.kappaIda[:, None]
+            a = b[:, 0].astype(tipo)
+            a[1:] -= self.lIda[1:, None] * b[:-1, e] + kappa[1:] * rho[:-1]
+            v = _recorrenciaLinear(a, self.kappaIda)
+        else:
+            v = b[:, 0].astype(tipo)
+        
+        # volta: primeiro elemento de x em cada bloco, do último para o primeiro
+        a = (v - rho) / s
+        if N > 1:
+            kappa = np.append(0, self.kappaVolta[::-1])
+            x0 = _recorrenciaLinear(a[::-1], kappa)[::-1]
+        else:
+            x0 = a
+        
+        # demais elementos de cada bloco
+        y = b[:, 1:].astype(tipo)
+        if N > 1:
+            y[:-1, -1] -= self.su[:, None] * x0[1:]
+            
+        x = np.empty((N, m1, y.shape[-1]), dtype = tipo)
+        x[:, 0] = x0
+        x[:, 1:] = (y - c[:, 1:] * x0[:, None]) / d[:, 1:]
+        
+        return x.reshape(forma)
+
+
+
+class CacheEspacoEstados(object):
+    '''
+    
+    Cache LRU (menos recentemente usado) das matrizes montadas e das
+    fatorações de cada linha, indexado pelos parâmetros da linha
+    (numeroCircuitoPi, comprimento, G, C, R[], L[]) e pelo tipo do item.
+    
+    Quando a soma dos tamanhos passa de limiteBytes, os itens usados há mais
+    tempo são descartados. Se diretorio for definido, as matrizes do espaço
+    de estados também são gravadas em arquivos .npz, de forma que um novo
+    processo (em uma varredura de parâmetros, por exemplo) já as encontra
+    prontas. As fatorações ficam apenas em memória.
+    '''
+    
+    def __init__(self, limiteBytes = 512 * 2**20, diretorio = None):
+        self.limiteBytes = limiteBytes
+        self.diretorio = diretorio
+        self.bytesUsados = 0
+        self._itens = OrderedDict()
+        
+        
+    def obter(self, chave, gerar, persistir = False):
+        '''
+        
+        Retorna o item guardado com a chave; se não houver, procura no disco
+        (se persistir) ou o cria com gerar(), e o guarda.
+        
+        Argumentos:
+        -------
+        chave: uma tupla que identifica o item
+        
+        gerar: função, sem argumentos, que cria o item
+        
+        persistir: se o item (uma tupla de matrizes esparsas) pode ser
+        gravado e lido do diretorio
+        '''
+        if chave in self._itens:
+            self._itens.move_to_end(chave)
+            return self._itens[chave][0]
+        
+        valor = None
+        
+        if persistir and self.diretorio is not None:
+            valor = self._ler(chave)
+            
+        if valor is None:
+            valor = gerar()
+            
+            if persistir and self.diretorio is not None:
+                self._gravar(chave, valor)
+                
+        self.guardar(chave, valor)
+        
+        return valor
+    
+    
+    def guardar(self, chave, valor, tamanho = None):
+        '''
+        
+        Guarda o item em memória, descartando os usados há mais tempo se o
+        limite de bytes for ultrapassado. Itens maiores que o limite não são
+        guardados.
+        
+        O tamanho (em bytes) é estimado uma única vez e guardado com o item;
+        pode também ser informado, se já for conhecido.
+        '''
+        if chave in self._itens:
+            anterior, tamanhoAnterior = self._itens.pop(chave)
+            self.bytesUsados -= tamanhoAnterior
+            
+            if tamanho is None and anterior is valor:
+                tamanho = tamanhoAnterior
+            
+        if tamanho is None:
+            tamanho = _tamanhoBytes(valor)
+            
+        if tamanho > self.limiteBytes:
+            return
+        
+        self._itens[chave] = (valor, tamanho)
+        self.bytesUsados += tamanho
+        
+        while self.bytesUsados > self.limiteBytes:
+            self.bytesUsados -= self._itens.popitem(last = False)[1][1]
+            
+    
+    def limpar(self):
+        '''Descarta todos os itens em memória (os arquivos são mantidos).'''
+        self._itens.clear()
+        self.bytesUsados = 0
+        
+        
+    def _arquivo(self, chave):
+        nome = hashlib.sha1(repr(chave).encode()).hexdigest()
+        return os.path.join(self.diretorio, nome + '.npz')
+    
+    
+    def _gravar(self, chave, matrizes):
+        os.makedirs(self.diretorio, exist_ok = True)
+        
+        dados = {'chave': repr(chave), 'quantidade': len(matrizes)}
+        for n, M in enumerate(matrizes):
+            M = sp.sparse.csr_matrix(M)
+            dados.update({'data%d' % n: M.data, 'indices%d' % n: M.indices,
+                          'indptr%d' % n: M.indptr, 'shape%d' % n: M.shape})
+        
+        # grava em um temporário e renomeia, para que outro processo nunca
+        # leia um arquivo incompleto
+        temporario = self._arquivo(chave)[:-4] + '.%d.tmp.npz' % os.getpid()
+        np.savez(temporario, **dados)
+        os.replace(temporario, self._arquivo(chave))
+        
+        
+    def _ler(self, chave):
+        try:
+            with np.load(self._arquivo(chave)) as dados:
+                if str(dados['chave']) != repr(chave):
+                    return None
+                
+                return tuple(sp.sparse.csr_matrix((dados['data%d' % n], 
+                                                   dados['indices%d' % n],
+                                                   dados['indptr%d' % n]),
+                                                  shape = dados['shape%d' % n])
+                             for n in range(int(dados['quantidade'])))
+        except (OSError, KeyError, ValueError):
+            return None
+
+
+def _tamanhoBytes(valor):
+    '''
+    
+    Função auxiliar. Estima a memória ocupada por um item do cache: arrays,
+    matrizes esparsas, fatorações splu e objetos com arrays como atributos.
+    '''
+    if isinstance(valor, np.ndarray):
+        return valor.nbytes
+    
+    if sp.sparse.issparse(valor):
+        valor = valor.tocsr()
+        return valor.data.nbytes + valor.indices.nbytes + valor.indptr.nbytes
+    
+    if isinstance(valor, (tuple, list)):
+        return sum(_tamanhoBytes(v) for v in valor)
+    
+    if isinstance(valor, sp.sparse.linalg.SuperLU):
+        # pelo número de não nulos de L e U (ler valor.L e valor.U criaria
+        # uma cópia dos fatores); as fatorações guardadas (fatorarTrapezio)
+        # são reais: 8 bytes por valor, mais 4 do índice
+        numeroColunas = valor.shape[1]
+        return (valor.nnz * (np.dtype(float).itemsize + 4) + 
+                2 * (numeroColunas + 1) * 4 + 
+                valor.perm_r.nbytes + valor.perm_c.nbytes)
+    
+    if hasattr(valor, '__dict__'):
+        return sum(_tamanhoBytes(v) for v in vars(valor).values())
+    
+    return 0
+
+
+# cache usado por todas as linhas
+cacheMatrizes = CacheEspacoEstados()
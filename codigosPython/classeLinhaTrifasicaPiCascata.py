@@ -0,0 +1,716 @@
+# -*- coding: utf-8 -*-
+"""
+Código para simular faltas em uma linha de transmissão trifásica representada
+por circuitos pi em cascata, acoplados entre as fases, sem o EMTP-ATP.
+
+É a extensão trifásica de classeLinhaDeTransmissaoPiCascata.py: cada
+parâmetro concentrado passa a ser uma matriz 3x3 (resistências e indutâncias
+próprias e mútuas, capacitâncias na forma de Maxwell). O efeito da frequência
+é incluído da mesma forma, com os ramos R-L em paralelo:
+    R0, R1, R2, ..., Rm
+    L0, L1, L2, ..., Lm
+
+O circuito segue o caso base do TCC (cktBase.atp): fonte trifásica com
+impedância série (Thévenin) no emissor, linha, e fonte com impedância série
+no receptor (ou receptor em vazio). A falta é um resistor, de cada fase
+escolhida para a terra, ligado em um nó qualquer entre os circuitos pi por
+uma chave que fecha no instanteFalta e não abre mais.
+
+As fontes são senoidais (como as do tipo 14 do ATP, em cosseno) e a
+simulação parte do regime permanente pré-falta, calculado por fasores, como
+o ATP faz para fontes com TSTART < 0. A integração é trapezoidal, com passo
+fixo, como no ATP.
+
+As saídas têm as mesmas colunas dadas por funcoesATP.lerResultados:
+    Step, Time, VA, VB, VC, IA, IB, IC
+sendo V as tensões no terminal emissor da linha (barra XL001) e I as
+correntes na chave de medição XL001-X0001, ou seja, da linha para a fonte.
+
+@author: Pedro Henrique Nascimento Vieira
+"""
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+import os
+
+import numpy as np
+import scipy as sp
+
+from classeLinhaDeTransmissaoPiCascata import LinhaDeTransmissaoPiCascata
+
+class LinhaTrifasicaPiCascata(object):
+    '''
+
+    Classe que define uma linha de transmissão trifásica, com fontes (e suas
+    impedâncias) nos terminais emissor e receptor, e uma falta à terra em
+    qualquer nó entre os circuitos pi.
+
+    Variáveis de estado, na ordem:
+        corrente e tensão da fonte do emissor: iE (3), v0 (3), se houver
+        impedanciaEmissor; senão, v0 é a própria tensão da fonte
+
+        para cada circuito pi: i0 (3), i1 (3), ..., im (3), v (3), sendo v a
+        tensão no nó ao final do circuito pi
+
+        corrente da fonte do receptor: iR (3), se houver impedanciaReceptor
+    '''
+
+    def __init__(self, numeroCircuitoPi, comprimentoDaLinha,
+                 condutanciaDistribuida, capacitanciaDistribuida,
+                 resistenciaDistribuida, indutanciaDistribuida,
+                 impedanciaEmissor = None, impedanciaReceptor = None):
+        '''
+
+        Construtor principal da classe. Define os atributos concentrados da linha,
+        tendo como entrada os parâmetros distribuídos (matrizes 3x3 por km), o
+        comprimento da linha e o número de circuitos pi em cascata desejado.
+
+        Argumentos:
+        -------
+        condutanciaDistribuida, capacitanciaDistribuida: matrizes 3x3, em S/km
+        e F/km
+
+        resistenciaDistribuida, indutanciaDistribuida: arrays de forma
+        (m+1, 3, 3), em Ohm/km e H/km; uma matriz 3x3 se não houver ramos em
+        paralelo
+
+        impedanciaEmissor, impedanciaReceptor: (R, L), em Ohm e H; vetores com
+        os valores de cada fase ou matrizes 3x3. None (padrão) para fonte
+        ideal no emissor e receptor em vazio
+        '''
+        if not float(numeroCircuitoPi).is_integer():
+            raise TypeError('numeroCircuitoPi deve ser um valor inteiro.')
+
+        if numeroCircuitoPi <= 0:
+            raise ValueError('numeroCircuitoPi deve ser maior que zero.')
+
+        resistenciaDistribuida = np.reshape(resistenciaDistribuida, (-1, 3, 3))
+        indutanciaDistribuida = np.reshape(indutanciaDistribuida, (-1, 3, 3))
+
+        if resistenciaDistribuida.shape != indutanciaDistribuida.shape:
+            raise ValueError('resistenciaDistribuida e indutanciaDistribuida ' +
+                'devem ter o mesmo número de elementos.')
+
+        # quantidade de circuitos pi em cascata representando a linha
+        self.numeroCircuitoPi = int(numeroCircuitoPi)
+
+        self.comprimentoDaLinha = comprimentoDaLinha
+
+        # comprimento de cada circuito pi, em km
+        self.comprimentoSecaoPi = comprimentoDaLinha/numeroCircuitoPi
+
+        # parâmetros concentrados, matrizes 3x3 (séries: m+1 matrizes)
+        self.condutanciaConcentrada = (np.reshape(condutanciaDistribuida,
+                                        (3, 3)) * self.comprimentoSecaoPi)
+
+        self.capacitanciaConcentrada = (np.reshape(capacitanciaDistribuida,
+                                         (3, 3)) * self.comprimentoSecaoPi)
+
+        self.resistenciaConcentrada = (resistenciaDistribuida *
+                                       self.comprimentoSecaoPi)
+
+        self.indutanciaConcentrada = (indutanciaDistribuida *
+                                      self.comprimentoSecaoPi)
+
+        self.impedanciaEmissor = self._impedancia(impedanciaEmissor)
+        self.impedanciaReceptor = self._impedancia(impedanciaReceptor)
+
+        # posição da primeira variável de estado dos circuitos pi
+        self.inicioLinha = 0 if self.impedanciaEmissor is None else 6
+
+        # número de variáveis de estado de cada circuito pi
+        self.tamanhoBloco = 3 * (self.resistenciaConcentrada.shape[0] + 1)
+
+        # ordem da linha, dimensão do espaço de estados
+        self.ordem = (self.inicioLinha +
+                      self.tamanhoBloco * self.numeroCircuitoPi +
+                      (0 if self.impedanciaReceptor is None else 3))
+
+        # comprimento de cada circuito pi, em km; diferentes apenas nas linhas
+        # criadas por comSecoes
+        self.comprimentosSecoes = np.full(self.numeroCircuitoPi,
+                                          self.comprimentoSecaoPi)
+
+        # fatorações (I - dt/2*A) já calculadas, ver _fatorar
+        self._fatoracoes = {}
+
+
+    @classmethod
+    def comSecoes(cls, comprimentosSecoes, condutanciaDistribuida,
+                  capacitanciaDistribuida, resistenciaDistribuida,
+                  indutanciaDistribuida, **opcoes):
+        '''
+
+        Cria uma linha com circuitos pi de comprimentos diferentes, finos
+        apenas em torno do ponto da falta, por exemplo:
+
+            secoes = LinhaDeTransmissaoPiCascata.secoesRefinadas(100, 37.4,
+                                                                 0.1, 5)
+            linha = LinhaTrifasicaPiCascata.comSecoes(secoes,
+                        *LinhaTrifasicaPiCascata.matrizesTranspostas(
+                            sequenciaPositiva, sequenciaZero))
+
+        Os parâmetros concentrados passam a ser os de um circuito pi de
+        comprimento médio, corrigidos na montagem de A.
+
+        Argumentos:
+        -------
+        comprimentosSecoes: o comprimento de cada circuito pi, em km, a
+        partir do emissor
+
+        demais: como no construtor principal
+        '''
+        comprimentosSecoes = np.asarray(comprimentosSecoes, dtype = float)
+
+        if comprimentosSecoes.ndim != 1 or np.any(comprimentosSecoes <= 0):
+            raise ValueError('comprimentosSecoes deve ser uma lista de ' +
+                             'comprimentos positivos.')
+
+        linha = cls(comprimentosSecoes.size, comprimentosSecoes.sum(),
+                    condutanciaDistribuida, capacitanciaDistribuida,
+                    resistenciaDistribuida, indutanciaDistribuida, **opcoes)
+
+        linha.comprimentosSecoes = comprimentosSecoes
+
+        return linha
+
+
+    @classmethod
+    def linhaTransposta(cls, numeroCircuitoPi, comprimentoDaLinha,
+                        sequenciaPositiva, sequenciaZero, **opcoes):
+        '''
+
+        Cria uma linha idealmente transposta, com circuitos pi iguais, a
+        partir dos parâmetros de sequência (ver matrizesTranspostas).
+
+        opcoes: impedanciaEmissor, impedanciaReceptor (ver __init__)
+        '''
+        return cls(numeroCircuitoPi, comprimentoDaLinha,
+                   *cls.matrizesTranspostas(sequenciaPositiva, sequenciaZero),
+                   **opcoes)
+
+
+    @staticmethod
+    def matrizesTranspostas(sequenciaPositiva, sequenciaZero):
+        '''
+
+        Matrizes de fase de uma linha idealmente transposta, a partir dos
+        parâmetros de sequência positiva e zero por km:
+            própria = (Z0 + 2*Z1)/3, mútua = (Z0 - Z1)/3
+
+        Como a mesma transformação desacopla todas as matrizes, os ramos R-L
+        em paralelo (efeito da frequência) ajustados em cada sequência são
+        representados sem aproximação.
+
+        Argumentos:
+        -------
+        sequenciaPositiva, sequenciaZero: (G, C, R, L) por km, sendo R e L
+        escalares ou arrays com os ramos R0..Rm e L0..Lm
+
+        Retorna:
+        --------
+        [G, C, R, L]: as matrizes 3x3 por km (R e L de forma (m+1, 3, 3))
+        '''
+        def transposta(zero, positiva):
+            zero = np.asarray(zero, dtype = float)[..., None, None]
+            positiva = np.asarray(positiva, dtype = float)[..., None, None]
+
+            return ((zero - positiva)/3 * np.ones((3, 3)) +
+                    positiva * np.identity(3))
+
+        return [transposta(z, p) for z, p in zip(sequenciaZero,
+                                                 sequenciaPositiva)]
+
+
+    @staticmethod
+    def _impedancia(impedancia):
+        '''
+
+        Função auxiliar. Converte (R, L) por fase, ou em matrizes, para
+        matrizes 3x3.
+        '''
+        if impedancia is None:
+            return None
+
+        return tuple(np.diag(np.broadcast_to(np.asarray(z, dtype = float), 3))
+                     if np.ndim(z) < 2 else np.asarray(z, dtype = float)
+                     for z in impedancia)
+
+
+    def posicoesNos(self):
+        '''
+
+        Posições dos nós da linha, em km a partir do emissor: 0 (emissor),
+        o final de cada circuito pi e comprimentoDaLinha (receptor).
+        '''
+        return np.concatenate(([0], np.cumsum(self.comprimentosSecoes)))
+
+
+    def indiceNo(self, km):
+        '''
+
+        Índice do nó da linha na posição km, a partir do emissor: 0 no
+        emissor, numeroCircuitoPi no receptor. km deve coincidir com o final
+        de um dos circuitos pi (ver posicoesNos).
+        '''
+        posicoes = self.posicoesNos()
+        no = int(np.abs(posicoes - km).argmin())
+
+        if not np.isclose(posicoes[no], km, rtol = 0,
+                          atol = 1e-9 * self.comprimentoDaLinha):
+            raise ValueError('km deve coincidir com um dos nós entre os ' +
+                             'circuitos pi; o mais próximo está em %g km.'
+                             % posicoes[no])
+
+        return no
+
+
+    def _indiceTensao(self, no):
+        '''Função auxiliar. Índice da primeira fase da tensão no nó.'''
+        if no == 0:
+            return 3
+
+        return self.inicioLinha + no * self.tamanhoBloco - 3
+
+
+    def espacoEstados(self, falta = None):
+        '''
+
+        Gera as matrizes do espaço de estados da linha, com ou sem falta:
+            X' = A*X + B*u, u = [fonte do emissor (3), fonte do receptor (3)]
+
+        Argumentos:
+        -------
+        falta: None (padrão), sem falta; ou (no, fases, resistencia), com o
+        índice do nó (ver indiceNo), as fases em falta ('A', 'BC', 'ABC'...)
+        e a resistência de cada fase para a terra, em Ohm
+
+        Retorna:
+        --------
+        [A, B]: matrizes esparsas no formato CSR
+        '''
+        N = self.numeroCircuitoPi
+        R = self.resistenciaConcentrada
+        L = self.indutanciaConcentrada
+        m1 = R.shape[0]
+        tamanho = self.tamanhoBloco
+
+        iC = np.linalg.inv(self.capacitanciaConcentrada)
+        iCG = iC @ self.condutanciaConcentrada
+        iL = np.linalg.inv(L)
+
+        # correção dos elementos proporcionais a 1/L0 e 1/C em cada circuito
+        # pi e em cada nó, para circuitos pi de comprimentos diferentes; nos
+        # nós internos, a capacitância é a média dos dois circuitos pi
+        ligacoes = self.comprimentoSecaoPi / self.comprimentosSecoes
+        nos = self.comprimentoSecaoPi / np.concatenate((
+                self.comprimentosSecoes[:1],
+                (self.comprimentosSecoes[1:] + self.comprimentosSecoes[:-1])/2,
+                self.comprimentosSecoes[-1:]))
+
+        iL0 = iL[0] * ligacoes[:, None, None]
+        iCno = iC * nos[:, None, None]
+
+        linhas, colunas, valores = [], [], []
+
+        def bloco(linha, coluna, M):
+            # M (3x3) nas posições linha:linha+3, coluna:coluna+3, para
+            # vetores de posições iniciais linha e coluna
+            linha = np.atleast_1d(linha)[:, None, None] + np.arange(3)[:, None]
+            coluna = np.atleast_1d(coluna)[:, None, None] + np.arange(3)
+
+            linha, coluna, M = np.broadcast_arrays(linha, coluna, M)
+
+            linhas.append(linha.ravel())
+            colunas.append(coluna.ravel())
+            valores.append(M.ravel())
+
+        # posições iniciais de i0 e v em cada circuito pi
+        i0 = self.inicioLinha + tamanho * np.arange(N)
+        v = i0 + tamanho - 3
+
+        # tensão no início de cada circuito pi: v do anterior (ou v0)
+        vAnterior = np.append(3, v[:-1])
+
+        # ramo série: L0*i0' = vAnterior - v - (R0 + R1 + ... + Rm)*i0 +
+        #                      R1*i1 + ... + Rm*im
+        #             Lk*ik' = Rk*(i0 - ik)
+        bloco(i0, i0, -iL[0] @ R.sum(axis = 0))
+        bloco(i0, v, -iL0)
+
+        if self.impedanciaEmissor is None:
+            bloco(i0[1:], vAnterior[1:], iL0[1:])
+        else:
+            bloco(i0, vAnterior, iL0)
+
+        for k in range(1, m1):
+            bloco(i0, i0 + 3*k, iL[0] @ R[k])
+            bloco(i0 + 3*k, i0, iL[k] @ R[k])
+            bloco(i0 + 3*k, i0 + 3*k, -iL[k] @ R[k])
+
+        # nós internos: C*v' = i0 - i0 (próximo) - G*v
+        bloco(v[:-1], i0[:-1], iCno[1:-1])
+        bloco(v[:-1], i0[1:], -iCno[1:-1])
+        bloco(v[:-1], v[:-1], -iCG)
+
+        # nó receptor: (C/2)*v' = i0 - iR - (G/2)*v
+        bloco(v[-1], i0[-1], 2*iCno[-1])
+        bloco(v[-1], v[-1], -iCG)
+
+        linhasB, colunasB, valoresB = [], [], []
+
+        if self.impedanciaEmissor is None:
+            # a fonte é a tensão no início do primeiro circuito pi
+            linhasB.append(np.arange(3).repeat(3) + i0[0])
+            colunasB.append(np.tile(np.arange(3), 3))
+            valoresB.append(iL0[0].ravel())
+        else:
+            # LE*iE' = e - RE*iE - v0; (C/2)*v0' = iE - i0 - (G/2)*v0
+            RE, LE = self.impedanciaEmissor
+            iLE = np.linalg.inv(LE)
+
+            bloco(0, 0, -iLE @ RE)
+            bloco(0, 3, -iLE)
+            bloco(3, 0, 2*iCno[0])
+            bloco(3, i0[0], -2*iCno[0])
+            bloco(3, 3, -iCG)
+
+            linhasB.append(np.arange(3).repeat(3))
+            colunasB.append(np.tile(np.arange(3), 3))
+            valoresB.append(iLE.ravel())
+
+        if self.impedanciaReceptor is not None:
+            # LR*iR' = v - RR*iR - e
+            RR, LR = self.impedanciaReceptor
+            iLR = np.linalg.inv(LR)
+            iR = self.ordem - 3
+
+            bloco(v[-1], iR, -2*iCno[-1])
+            bloco(iR, v[-1], iLR)
+            bloco(iR, iR, -iLR @ RR)
+
+            linhasB.append(np.arange(3).repeat(3) + iR)
+            colunasB.append(np.tile(np.arange(3), 3) + 3)
+            valoresB.append(-iLR.ravel())
+
+        if falta is not None:
+            no, fases, resistencia = falta
+
+            if no == 0 and self.impedanciaEmissor is None:
+                raise ValueError('Falta no terminal de uma fonte ideal.')
+
+            if resistencia <= 0:
+                raise ValueError('A resistência de falta deve ser positiva.')
+
+            Gf = np.diag([1/resistencia if f in fases.upper() else 0
+                          for f in 'ABC'])
+
+            # capacitância do nó: C nos nós internos, C/2 nos terminais
+            fator = 2 if no in (0, N) else 1
+
+            vf = self._indiceTensao(no)
+            bloco(vf, vf, -fator * iCno[no] @ Gf)
+
+        A = sp.sparse.coo_matrix((np.concatenate(valores),
+                                  (np.concatenate(linhas),
+                                   np.concatenate(colunas))),
+                                 shape = (self.ordem, self.ordem)).tocsr()
+
+        B = sp.sparse.coo_matrix((np.concatenate(valoresB),
+                                  (np.concatenate(linhasB),
+                                   np.concatenate(colunasB))),
+                                 shape = (self.ordem, 6)).tocsr()
+
+        A.eliminate_zeros()
+        B.eliminate_zeros()
+
+        return A, B
+
+
+    def matrizesMedicao(self, frequencia = 60.0):
+        '''
+
+        Gera as matrizes da medição no terminal emissor, para fontes
+        senoidais u(t) = Re(U*exp(j*w*t)):
+            [VA, VB, VC, IA, IB, IC] = C*X + Re(D*U*exp(j*w*t))
+        com I a corrente da linha para a fonte (chave XL001-X0001 do ATP).
+
+        Com a fonte ideal no emissor, a tensão é a própria fonte e a corrente
+        inclui a do shunt (G/2 e C/2) do primeiro circuito pi, dada pelo
+        fasor da fonte; por isso D é complexa.
+
+        Retorna:
+        --------
+        [C, D]: arrays de forma (6, ordem) e (6, 6)
+        '''
+        C = np.zeros((6, self.ordem))
+        D = np.zeros((6, 6), dtype = complex)
+
+        fases = np.arange(3)
+
+        if self.impedanciaEmissor is None:
+            w = 2 * np.pi * frequencia
+
+            D[fases, fases] = 1
+            D[3:, :3] = -(self.condutanciaConcentrada +
+                          1j * w * self.capacitanciaConcentrada) / 2 * \
+                        self.comprimentosSecoes[0] / self.comprimentoSecaoPi
+            C[fases + 3, self.inicioLinha + fases] = -1
+        else:
+            C[fases, 3 + fases] = 1
+            C[fases + 3, fases] = -1
+
+        return C, D
+
+
+    @staticmethod
+    def fasores(fonte):
+        '''
+
+        Fasores das tensões de uma fonte trifásica (amplitudes, angulos), com
+        as amplitudes de pico em V e os ângulos em graus, como nas fontes do
+        tipo 14 do ATP: e(t) = amplitude*cos(w*t + angulo).
+        '''
+        if fonte is None:
+            return np.zeros(3, dtype = complex)
+
+        amplitudes, angulos = fonte
+
+        return (np.broadcast_to(np.asarray(amplitudes, dtype = float), 3) *
+                np.exp(1j * np.deg2rad(np.broadcast_to(angulos, 3))))
+
+
+    def regimePermanente(self, U, frequencia, t0 = 0.0, falta = None):
+        '''
+
+        Estado no instante t0 do regime permanente senoidal, para as entradas
+        u(t) = Re(U*exp(j*w*t)), resolvendo (j*w*I - A)*X = B*U.
+        '''
+        A, B = self.espacoEstados(falta)
+        w = 2 * np.pi * frequencia
+
+        I = sp.sparse.identity(self.ordem, format = 'csc')
+        X = sp.sparse.linalg.spsolve((1j*w*I - A).tocsc(), B @ U)
+
+        return (X * np.exp(1j * w * t0)).real
+
+
+    def _fatorar(self, dt, falta):
+        '''
+
+        Função auxiliar. Matrizes do passo trapezoidal com e sem falta,
+        guardadas para as próximas simulações:
+            (I - dt/2*A)*X[k+1] = (I + dt/2*A)*X[k] + dt/2*B*(u[k] + u[k+1])
+        '''
+        chave = (dt, falta)
+
+        if chave not in self._fatoracoes:
+            A, B = self.espacoEstados(falta)
+            I = sp.sparse.identity(self.ordem, format = 'csr')
+
+            self._fatoracoes[chave] = (FatoracaoBanda(I - dt/2 * A),
+                                       (I + dt/2 * A).tocsr(), dt/2 * B)
+
+        return self._fatoracoes[chave]
+
+
+    def simularFalta(self, t, fonteEmissor, fonteReceptor = None, fases = '',
+                     km = None, resistenciaFalta = 0.5, instanteFalta = 0.05,
+                     frequencia = 60.0, eventos = (), completar = False,
+                     pontosPorBloco = 1000):
+        '''
+
+        Simula a linha com uma falta à terra, integrando pela regra
+        trapezoidal a partir do regime permanente pré-falta.
+
+        Argumentos:
+        -------
+        t: os instantes, igualmente espaçados (passo de integração t[1]-t[0])
+
+        fonteEmissor, fonteReceptor: (amplitudes, angulos) das fontes, ver
+        fasores; sem fonte no receptor por padrão (fonte nula, se houver
+        impedanciaReceptor)
+
+        fases: as fases em falta, por exemplo 'A', 'BC' ou 'ABC'; '' (padrão)
+        simula sem falta
+
+        km: a posição da falta a partir do emissor, ver indiceNo
+
+        resistenciaFalta: em Ohm, de cada fase para a terra
+
+        instanteFalta: instante em que a chave de falta fecha, em segundos
+
+        frequencia: frequência das fontes, em Hz
+
+        eventos, completar: critérios de parada, verificados a cada 
+        pontosPorBloco passos sobre as medições (ver 
+        LinhaDeTransmissaoPiCascata.resolverSistema). Para parar no regime 
+        pós-falta, use CriterioAssentamento(1/frequencia, instanteMinimo = 
+        instanteFalta); sem instanteMinimo, o regime pré-falta já o atende.
+
+        Retorna:
+        --------
+        um DataFrame com as colunas Step, Time, VA, VB, VC, IA, IB, IC (até o
+        instante de parada, se um evento for atendido sem completar)
+        '''
+        import pandas as pd
+
+        t = np.asarray(t, dtype = float)
+        dt = t[1] - t[0]
+
+        if not np.allclose(np.diff(t), dt):
+            raise ValueError('t deve ser igualmente espaçado para a ' +
+                             'integração trapezoidal.')
+
+        falta = None
+        if fases:
+            falta = (self.indiceNo(km), ''.join(sorted(fases.upper())),
+                     float(resistenciaFalta))
+
+        U = np.append(self.fasores(fonteEmissor), self.fasores(fonteReceptor))
+        w = 2 * np.pi * frequencia
+        z = np.exp(1j * w * t)
+
+        C, D = self.matrizesMedicao(frequencia)
+        Y = np.empty((t.size, 6))
+
+        x = self.regimePermanente(U, frequencia, t[0])
+        Y[0] = C @ x + (D @ U * z[0]).real
+
+        # passos antes e depois do fechamento da chave de falta
+        comutacao = t.size if falta is None else max(1,
+                                        int(np.searchsorted(t, instanteFalta)))
+
+        parada = None
+        verificado = 0
+
+        for inicio, fim, f in ((1, comutacao, None),
+                               (comutacao, t.size, falta)):
+            if fim <= inicio or parada is not None:
+                continue
+
+            fatoracao, Mmais, Bdt = self._fatorar(dt, f)
+            BU = Bdt @ U
+
+            for k in range(inicio, fim):
+                x = fatoracao.solve(Mmais @ x + (BU * (z[k-1] + z[k])).real)
+                Y[k] = C @ x + (D @ U * z[k]).real
+
+                if eventos and (k + 1 - verificado >= pontosPorBloco or
+                                k + 1 == t.size):
+                    parada = LinhaDeTransmissaoPiCascata.verificarEventos(
+                                        eventos, t[:k+1], Y[:k+1], verificado)
+                    verificado = k + 1
+
+                    if parada is not None:
+                        break
+
+        if parada is not None:
+            Y = LinhaDeTransmissaoPiCascata.encerrarNoEvento(Y, t, *parada,
+                                                    completar = completar)
+
+        dados = pd.DataFrame(Y, columns = ['VA', 'VB', 'VC', 'IA', 'IB', 'IC'])
+        dados.insert(0, 'Time', t[:len(Y)])
+        dados.insert(0, 'Step', np.arange(len(Y)))
+
+        return dados
+
+
+    def simularFaltas(self, t, fonteEmissor, fonteReceptor = None,
+                      casos = None, processos = None, **opcoes):
+        '''
+
+        Simula vários casos de falta, em paralelo, como o conjunto de dados
+        do TCC gerado pelo ATP (codigoExecucaoATP.py).
+
+        Argumentos:
+        -------
+        casos: lista de (fases, km); por padrão, todas as combinações de
+        funcoesATP.combinacoesFases em todos os nós entre os terminais (ver
+        posicoesNos), o que, com circuitos pi de 1 km, dá os km inteiros
+
+        processos: número de processos; None (padrão) usa todos os núcleos
+
+        opcoes: resistenciaFalta, instanteFalta, frequencia, eventos,
+        completar (ver simularFalta)
+
+        Retorna:
+        --------
+        um dicionário com os DataFrames de cada caso, com as chaves como em
+        funcoesATP.lerTodosArquivos: "FFT" + fases + km (km como em
+        funcoesATP.GradeFaltas.nome, "%g")
+        '''
+        if casos is None:
+            from funcoesATP import combinacoesFases
+
+            casos = [(fases, float(km)) for fases in combinacoesFases
+                     for km in self.posicoesNos()[1:-1]]
+
+        casos = list(casos)
+
+        funcao = partial(_simularCaso, self, t, fonteEmissor, fonteReceptor,
+                         opcoes)
+
+        if processos is not None and processos <= 1:
+            resultados = list(map(funcao, casos))
+        else:
+            processos = processos or os.cpu_count()
+
+            with ProcessPoolExecutor(processos) as executor:
+                # em partes, para que cada processo reaproveite a fatoração
+                # pré-falta (guardada na cópia da linha de cada parte)
+                tamanhoParte = max(1, len(casos) // (4 * processos))
+                resultados = list(executor.map(funcao, casos,
+                                               chunksize = tamanhoParte))
+
+        return {"FFT" + fases + "%g" % km: dados
+                for (fases, km), dados in zip(casos, resultados)}
+
+
+def _simularCaso(linha, t, fonteEmissor, fonteReceptor, opcoes, caso):
+    '''
+
+    Função auxiliar, para os processos de simularFaltas. Simula o caso
+    (fases, km).
+    '''
+    fases, km = caso
+
+    return linha.simularFalta(t, fonteEmissor, fonteReceptor, fases = fases,
+                              km = km, **opcoes)
+
+
+class FatoracaoBanda(object):
+    '''
+
+    Fatoração LU de uma matriz de banda (LAPACK gbtrf), com o método solve(b).
+
+    As matrizes da linha trifásica têm banda da ordem de um circuito pi
+    (inclusive com as fontes e a falta), de forma que cada solução custa
+    O(n*banda), sem o custo fixo por chamada da LU esparsa (splu), que
+    domina em sistemas de algumas centenas de variáveis.
+    '''
+
+    def __init__(self, M):
+        # CSR soma os elementos repetidos
+        M = sp.sparse.csr_matrix(M).tocoo()
+        n = M.shape[0]
+
+        # larguras das bandas inferior e superior
+        self.kl = int(max(0, (M.row - M.col).max()))
+        self.ku = int(max(0, (M.col - M.row).max()))
+
+        # armazenamento em banda do LAPACK, com kl linhas extras para a LU
+        ab = np.zeros((2*self.kl + self.ku + 1, n))
+        ab[self.kl + self.ku + M.row - M.col, M.col] = M.data
+
+        self.lu, self.piv, info = sp.linalg.lapack.dgbtrf(ab, self.kl, self.ku)
+
+        if info > 0:
+            raise np.linalg.LinAlgError('Matriz singular.')
+
+
+    def solve(self, b):
+        '''Resolve M*x = b, para b de forma (n,) ou (n, K).'''
+        x, info = sp.linalg.lapack.dgbtrs(self.lu, self.kl, self.ku, b,
+                                          self.piv)
+
+        return x
@@ -1,63 +1,47 @@
-# -*- coding: utf-8 -*-
-"""
-Codigo procedual executado para fazer o TCC com o EMTP-ATP. Ele é
-encarregado de criar e executar as simulações.
-
-Ambiente: Windows 10, 64-bit
-
-@autor: Pedro Henrique Nascimento Vieira, 2016
-"""
-import funcoesATP as fatp
-
-# compilou-se (criou) o arquivo prototipo.atp, movidos para a pasta Base.
-# a partir dele, criado o novo arquivo base
-try:
-    fatp.criarBase(base = "C:\\ATPdraw\\ATP\\TCC\\Base\\prototipo.atp",
-             novo = "C:\\ATPdraw\\ATP\\TCC\\Base\\cktBase.atp")  
-
-    fatp.simular("C:\\ATPdraw\\ATP\\TCC\\Base\\cktBase.atp")
-    fatp.extrairResultados("C:\\ATPdraw\\ATP\\TCC\\Base\\cktBaseRes.lis")
-except FileExistsError:
-    pass
-
-base = "C:\\ATPdraw\\ATP\\TCC\\Base\\cktBase.atp"
-
-# gerar arquivos com falta fase terra.
-fatp.replicar99("FFTA", fases = 'A', base = base)
-# Simular cada um dos arquivos para cirar os arquivos .lis
-for km in range(1,100):
-    fatp.simular("C:\\ATPdraw\\ATP\\TCC\\FFTA" + str(km)+ ".atp")
-
-
-# A cada simulação os arquivos foram movidos manualmente para pastas separadas    
-fatp.replicar99("FFTB", fases = 'B', base = base)
-for km in range(1,100):
-    fatp.simular("C:\\ATPdraw\\ATP\\TCC\\FFTB" + str(km)+ ".atp")
-
-
-fatp.replicar99("FFTC", fases = 'C', base = base)
-for km in range(1,100):
-    fatp.simular("C:\\ATPdraw\\ATP\\TCC\\FFTC" + str(km)+ ".atp")
-
-
-fatp.replicar99("FFTAB", fases = 'AB', base = base)
-for km in range(1,100):
-    fatp.simular("C:\\ATPdraw\\ATP\\TCC\\FFTAB" + str(km)+ ".atp")
-    
-    
-fatp.replicar99("FFTAC", fases = 'AC', base = base)
-for km in range(1,100):
-    fatp.simular("C:\\ATPdraw\\ATP\\TCC\\FFTAC" + str(km)+ ".atp")
-    
-
-fatp.replicar99("FFTBC", fases = 'BC', base = base)
-for km in range(1,100):
-    fatp.simular("C:\\ATPdraw\\ATP\\TCC\\FFTBC" + str(km)+ ".atp")
-    
-    
-fatp.replicar99("FFTABC", fases = 'ABC', base = base)
-for km in range(1,100):
-    fatp.simular("C:\\ATPdraw\\ATP\\TCC\\FFTABC" + str(km)+ ".atp")
-    
-    
-    
\ No newline at end of file
+# -*- coding: utf-8 -*-
+"""
+Codigo procedual executado para fazer o TCC com o EMTP-ATP. Ele é
+encarregado de criar e executar as simulações.
+
+Ambiente: Windows 10, 64-bit
+
+@autor: Pedro Henrique Nascimento Vieira, 2016
+"""
+import funcoesATP as fatp
+
+# manifesto com o hash dos casos já simulados: ao rodar de novo, só os
+# arquivos que mudaram são simulados (ver fatp.simularLote)
+manifesto = "C:\\ATPdraw\\ATP\\TCC\\manifesto.json"
+
+# compilou-se (criou) o arquivo prototipo.atp, movidos para a pasta Base.
+# a partir dele, criado o novo arquivo base
+fatp.criarBase(base = "C:\\ATPdraw\\ATP\\TCC\\Base\\prototipo.atp",
+         novo = "C:\\ATPdraw\\ATP\\TCC\\Base\\cktBase.atp")  
+
+registro, = fatp.simularLote(["C:\\ATPdraw\\ATP\\TCC\\Base\\cktBase.atp"],
+                             manifesto = manifesto)
+if registro['status'] == 'ok':
+    fatp.extrairResultados("C:\\ATPdraw\\ATP\\TCC\\Base\\cktBaseRes.lis")
+
+base = "C:\\ATPdraw\\ATP\\TCC\\Base\\cktBase.atp"
+
+# gerar arquivos com falta fase terra, para todas as combinações de fases.
+arquivos = []
+destinos = []
+
+for fase in fatp.combinacoesFases:
+    fatp.replicar99("FFT" + fase, fases = fase, base = base)
+    
+    for km in range(1,100):
+        arquivos.append("C:\\ATPdraw\\ATP\\TCC\\FFT" + fase + str(km) + ".atp")
+        # o .lis vai direto para a pasta de cada combinação de fases, no 
+        # lugar de mover os arquivos manualmente
+        destinos.append(fatp.arquivo(fase, km))
+
+# simular os casos em paralelo, cada um em sua pasta de trabalho
+registros = fatp.simularLote(arquivos, destinos, tempoLimite = 600,
+                             tentativas = 2, manifesto = manifesto)
+
+for registro in registros:
+    if registro['status'] != 'ok':
+        print(registro['arquivo'], registro['status'], registro['codigo'])
@@ -1,483 +1,1697 @@
-# -*- coding: utf-8 -*-
-"""
-Funções auxilio TCC.
-
-Ambiente: Windows 10, 64-bit
-
-@autor: Pedro Henrique Nascimento Vieira, 2016
-"""
-import re
-import numpy as np
-import scipy as sp
-
-def criarBase(base, novo):
-    '''
-    Copiar o arquivo base e "setar" todas as seções da linha de transmissão
-    para seções de 10 km.
-    '''
-    f_n = open(novo, 'x')
-    
-    with open(base, 'r') as f:
-        for linha in f:
-            for n in range(1,11):
-                pt = re.compile("lttcc_L"+str(n)+".lib")
-                linha = re.sub(pt, "lttcc_L10.lib", linha)
-            
-            f_n.write(linha)
-            
-    f_n.flush()
-    f_n.close()
-    
-
-def simular(arquivo):
-    from subprocess import call
-    '''Arquivo refere-se ao caminho no computador que ele se encontra 
-    (junto com a extensão .atp).'''    
-
-    comando = ('C:\\ATPdraw\\tpbig1 '+ arquivo + ' > ' + arquivo[:-4] + 'Res.lis')
-    
-    # envia comandos para o command prompt
-    call("COPY C:\\ATPdraw\\STARTUP STARTUP", shell = True)
-    call(comando, shell = True)
-        
-    
-def extrairResultados(arq):
-    '''Lê um arquivo .lis e extrai o output colocando em outro arquivo.'''    
-    f_n = open(arq + "resultado.txt", 'x')
-    f_v = open(arq, 'r')
-    
-    procurandoInicio = True
-    n = 0
-    
-    # procurar inicio dos resultados no arquivo;
-    # ler resultados até encontrar linha com "Suspended simulation"
-    for linha in f_v:
-        if procurandoInicio and "EMTP output variables follow." in linha:
-            procurandoInicio = False
-            
-        elif not procurandoInicio:
-            if 'Step' in linha and 'Time' in linha:
-                # split depois join na string para sumir com os espaços extras
-                f_n.write(" ".join( linha.split() ) + "\n")
-                
-            elif n > 6:
-                if ("Suspended simulation" in linha) or ("Final time step" in linha):
-                    break
-                
-                elif "switch" in linha:
-                    pass
-                
-                else:
-                    res = linha.split()
-                    try:
-                        res.remove("SPY:")
-                    except ValueError:
-                        pass
-                    
-                    f_n.write(" ".join( res ) + "\n")
-        
-            else:
-                n += 1
-            
-    n = 0
-    # pular as linhas de suspensão até encontrar o final
-    for linha in f_v:
-        if n > 6:
-            if ("Suspended simulation" in linha):
-                n = 0
-                
-            elif ("Final time step" in linha):
-                break
-            
-            elif "switch" in linha:
-                    pass
-                
-            else:
-                res = linha.split()
-                try:
-                    res.remove("SPY:")
-                except ValueError:
-                    pass
-                
-                f_n.write(" ".join( res ) + "\n")
-                
-        else:
-            n += 1
-            
-    n = 0    
-    # pegar último resultado, uma linha única que vem depois do final
-    for linha in f_v:
-        if n > 0:
-            res = linha.split()
-            
-            try:
-                res.remove("SPY:")
-            except ValueError:
-                pass
-            
-            f_n.write(" ".join( res ) + "\n")
-            break
-        
-        else:
-            n += 1
-    
-    f_v.close()
-    f_n.flush()
-    f_n.close()
-    
-    
-def lerResultados(arq, extraido = False):
-    '''Lê um arquivo com os resultados extraídos e, com ele, cria um  data frame.'''    
-    import pandas as pd
-    
-    if extraido:        
-        df = pd.read_csv(arq, sep = " ")
-    else:
-        df =  pd.read_csv(arq + "resultado.txt", sep = " ")
-        
-    nomes = list(df)[:2]
-    
-    v = ['XL001', 'V']
-    # identificar as colunas a partir do nome das barras.
-    # não há garantia que o ATP colocará os valores na mesma ordem sempre.
-    for nome in list(df)[2:5]:
-        if nome == v[0] + 'A':
-            nome = v[1] + 'A'
-            
-        elif nome == v[0] + 'B':
-            nome = v[1] + 'B'
-            
-        elif nome == v[0] + 'C':
-            nome = v[1] + 'C'
-    
-        else:
-            raise ValueError("Identificação inesperada para a barra")
-            
-        nomes += [nome]
-        
-    i = ['XL001', 'I']          
-    for nome in list(df)[5:8]:
-        if nome == i[0] + 'A.1':
-            nome = i[1] + 'A'
-            
-        elif nome == i[0] + 'B.1':
-            nome = i[1] + 'B'
-            
-        elif nome == i[0] + 'C.1':
-            nome = i[1] + 'C'
-    
-        else:
-            raise ValueError("Identificação inesperada para a barra")
-            
-        nomes += [nome]
-        
-    df.columns = nomes
-    
-    return df
-          
-    
-def definirBarras(km):
-    '''Função auxiliar. Determina a barra à montante e à jusante do km
-    especificado.'''
-    ponto = km/100
-    x = 0.10
-    
-    # determinar a porcentagem do ponto
-    while ponto > x:
-        x += 0.10        
-    
-    # dar nome às barras a partir da porcentagem
-    if x < 0.80:
-        barra1 = "XL00" + str( round(x * 10) )
-        barra2 = "XL00" + str( round((x + 0.10) * 10) )
-        
-    elif x < 0.9:
-        barra1 = "XL009"
-        barra2 = "XL010"
-        
-    else:
-        barra1 = "XL010"
-        barra2 = "XL011"
-    
-    return barra1, barra2
-    
-    
-def definirSecoes(km):
-    '''Função auxiliar. Determina o comprimento da primeira e segunda seção no
-    qual dividir uma seção de 10 km.'''
-    secao1 = km
-    
-    # extrai a unidade de 'km' de forma a ter uma seção menor que 10 km
-    while secao1 > 10:
-        # se o 'km' for grande, este loop pode demorar muito
-        # considerar o uso de regex...
-        secao1 -= 10
-   
-    secao2 = int(10 - secao1)
-    secao1 = int(secao1)
-    
-    return secao1, secao2
-    
-
-def mudarResistenciaFalta(linhaTexto, fase, Rnovo, Rvelho = 0.5):
-    '''Função auxiliar, muda o valor do resistor de falta.'''
-    dicionario = {'A':'1', 'B':'2', 'C':'3'}   
-    
-    if ("XF000" + dicionario.get(fase)) in linhaTexto and ("XSWT0"  + 
-                                        dicionario.get(fase)) not in linhaTexto:
-        return re.sub(".5", str( float(Rnovo) ), linhaTexto)
-    else:
-        return linhaTexto
-        
-
-def replicarMudarResistencia(R, fase, titulo,
-                     base = "C:\\ATPdraw\\ATP\\TCC\\Base\\cktBase.atp"):   
-    '''
-    Cria um arquivo novo, mudando a resistência de falta das fases especificadas,
-    baseado em um arquivo pré-existente.
-    
-    Fases é uma string com o nome das fases (ABC) pra colocar a falta; a ordem
-    não importa.
-    '''
-    
-    nomeNovo = "C:\\ATPdraw\\ATP\\TCC\\" + titulo + ".atp"        
-    novo = open(nomeNovo, 'x')
-    velho = open(base, 'r')
-    
-    for linha in velho:
-        lin = mudarResistenciaFalta(linha, R, fase)        
-        novo.write(lin)
-        
-        
-    novo.flush()
-    novo.close()
-     
-     
-def inserirFaltaFaseTerra(linhasTexto, barra1, barra2, secao1, secao2,
-                          faseA, faseB, faseC):
-    '''Função auxiliar. Substitui o nome das barras de forma a fazer a falta 
-    fase terra.'''
-    lin1 = ''
-    lin2 = ''
-    
-    dicionario = {'A':'1', 'B':'2', 'C':'3'}
-    
-    # função auxiliar para trocar o nome das barras das linhas de texto
-    def foo(substituir, fase, linha1, linha2):        
-        z = dicionario.get(fase)
-        
-        if substituir:
-            linha1 = re.sub(barra2 + fase, "XSWT0" + z, linha1)
-            linha2 = re.sub(barra1 + fase, "XSWT0" + z, linha2)
-        else:
-            linha1 = re.sub(barra2 + fase, "XLINT" + fase, linha1)
-            linha2 = re.sub(barra1 + fase, "XLINT" + fase, linha2)
-        
-        return linha1, linha2
-        
-    
-    repl1 = "lttcc_L" + str(secao1) + ".lib"
-    repl2 = "lttcc_L" + str(secao2) + ".lib"
-    
-    for l in linhasTexto:
-        linha1 = re.sub("lttcc_L10.lib", repl1, l)
-        linha2 = re.sub("lttcc_L10.lib", repl2, l)
-                      
-        linha1, linha2 = foo(faseA, "A", linha1, linha2)
-        linha1, linha2 = foo(faseB, "B", linha1, linha2)        
-        linha1, linha2 = foo(faseC, "C", linha1, linha2)
-                    
-        lin1 += linha1
-        lin2 += linha2
-        
-    return lin1, lin2
-
-    
-def faltaFaseTerra10(km, titulo, fases = 'ABC',
-                     base = "C:\\ATPdraw\\ATP\\TCC\\Base\\cktBase.atp"):
-                         
-    barra = definirBarras(km)[1]
-    
-    nomeNovo = "C:\\ATPdraw\\ATP\\TCC\\" + titulo + str(km) + ".atp"        
-    novo = open(nomeNovo, 'x')
-    
-    with open(base) as arq:
-        for linha in arq:
-            if "XSWT0" in linha:                
-                if 'A' in fases:
-                    lin = re.sub("XSWT01", barra + 'A', linha)
-                    
-                elif 'B' in fases:
-                    lin = re.sub("XSWT02", barra + 'B', linha)
-                    
-                elif 'C' in fases:
-                    lin = re.sub("XSWT03", barra + 'C', linha)
-                    
-            else:
-                lin = linha
-                
-            novo.write(lin)
-            
-    
-    novo.flush()
-    novo.close()
-    
-    
-
-def replicarFaltaTerra(km, titulo, fases = 'ABC',
-                     base = "C:\\ATPdraw\\ATP\\TCC\\Base\\cktBase.atp"):   
-    '''
-    Cria um arquivo novo com uma falta fase-terra com as fases especificadas,
-    baseado em um arquivo pré-existente.
-    
-    Fases é uma string com o nome das fases (ABC) pra colocar a falta; a ordem
-    não importa.
-    '''
-    if km % 10 == 0:
-        return faltaFaseTerra10(km, titulo, fases = 'ABC',
-                     base = "C:\\ATPdraw\\ATP\\TCC\\Base\\cktBase.atp")
-        
-    barra1, barra2 = definirBarras(km)
-    
-    secao1, secao2 = definirSecoes(km)
-      
-    def faltaNaFase(f):
-        if f in fases:
-            return True
-        else:
-            return False
-
-    falta = [None, None, None]    
-    t = 0
-    
-    for f in 'ABC':
-        falta[t] = faltaNaFase(f)
-        t+=1
-    
-    with open(base, 'r') as arq:
-        # possível leak de memoria se o arquivo for grande
-        todasLinhas = arq.readlines()
-
-    nomeNovo = "C:\\ATPdraw\\ATP\\TCC\\" + titulo + str(km) + ".atp"        
-    novo = open(nomeNovo, 'x')
-    
-    pular = False
-    
-    for n in range( len(todasLinhas) ):
-        linha = todasLinhas[n]
-        
-        if pular:
-            # pula essa linha de texto
-            pular = False
-        
-        elif ("$INCLUDE" in linha) and (barra1 in linha) and (barra2 in linha):
-            
-            linhasTexto = todasLinhas[n : n+2]
-            
-            # cria duas linhas de texto para inserir no arquivo novo            
-            lin1, lin2 = inserirFaltaFaseTerra(linhasTexto, barra1, barra2,
-                                secao1, secao2, falta[0], falta[1], falta[2])
-                                            
-            pular = True
-            
-            novo.write(lin1)
-            novo.write(lin2)
-        
-        else:
-            novo.write(linha)
-        
-        
-    novo.flush()
-    novo.close()
-    
-    
-def replicar99(titulo, fases = 'ABC',
-                     base = "C:\\ATPdraw\\ATP\\TCC\\Base\\cktBase.atp"):
-                         
-    '''
-    Cria falta fase-terra em todos os pontos (1 a 99) da linha usando o arquivo
-    base especificado.
-    '''    
-    for km in range(1,100):
-        replicarFaltaTerra(km, titulo, fases, base)
-        
-
-def amostrarMedidor(dados, taxaAmostragem = 500, periodoDados = 1e-6):
-    '''
-    
-    Simula um medidor digital extraindo valores de dados de entrada.
-    
-    -------------
-    Parâmetros:
-        dados, dataframe de dados do qual extrair os valores, considerando
-    que tenha um período igualmente espaçado entre valores;
-        periodoDados = 1e-6, em segundos;
-        taxaAmostragem = 500, em Hz
-        
-    Se (1/periodoDados/taxaAmostragem) não resultar em um valor inteiro,
-    arredondamento é feito; pode levar a erros.
-        
-    -----------
-    Retorna: 
-        os valores capturados pelo medidor
-    '''
-    valoresAmostrados = dados.loc[dados['Step'] == 1]
-    intervalo = round(1/periodoDados/taxaAmostragem)
-    n = 0
-    
-    for valor in dados.Step:
-        if n == intervalo:
-            n = 1
-            valoresAmostrados = valoresAmostrados.append(
-                                            dados.loc[dados['Step'] == valor])
-                        
-        else:
-            n += 1
-            
-    return valoresAmostrados
-
-
-def pasta(f): return "C:\\ATPdraw\\ATP\\TCC\\FFT" + f + "0.5"
-
-def arquivo(f, km): return pasta(f) + "\\FFT" + f + str(km) + "Res.lis"
-
-def arquivoResultado(f, km): return arquivo(f, km) + "resultado.txt"
-
-combinacoesFases = ['ABC', 'AB', 'AC', 'BC', 'A', 'B', 'C']
-
-def extrairTodos():
-    for fase in combinacoesFases:
-            for km in range(1,100):
-                extrairResultados(arquivo(fase, km))
-
-def lerTodosArquivos(extraidos = True):
-    '''apos arquivos organizados manualmente;'''    
-    if not extraidos: #para não re-extrair
-        extrairTodos()
-    
-    dados = {}
-    for fase in combinacoesFases:
-        for km in range(1,100):
-            dados.update({"FFT" + fase + str(km) : lerResultados(
-                                                arquivoResultado(fase, km), True)})
-            
-    return dados
-    
-        
-def lerTodosArquivosFourier(extraidos=True):
-    if not extraidos: #para não re-extrair
-        extrairTodos()
-        
-    medidas = ['VA', 'VB', 'VC', 'IA', 'IB', 'IC']
-    dados = {}
-    for fase in combinacoesFases:
-        for km in range(1,100):
-            valores = lerResultados(arquivoResultado(fase, km), True)
-            valores = amostrarMedidor(valores)
-            valoresFourier = np.array([])
-            for v in medidas:
-                valoresFourier = np.hstack((valoresFourier, sp.fft(valores.get(v))))
-                
-            dados.update({"FFT" + fase + str(km) : valoresFourier})
-            
-    return dados #va,vb,vc,ia,ib,ic
\ No newline at end of file
+# -*- coding: utf-8 -*-
+"""
+Funções auxilio TCC.
+
+Ambiente: Windows 10, 64-bit
+
+@autor: Pedro Henrique Nascimento Vieira, 2016
+"""
+import functools
+import hashlib
+import itertools
+import os
+import re
+import numpy as np
+import scipy as sp
+
+# executável do ATP; pode ser trocado (ou definido pela variável de ambiente
+# ATP_EXECUTAVEL), por exemplo por um substituto local no Linux
+executavelATP = os.environ.get('ATP_EXECUTAVEL', 'C:\\ATPdraw\\tpbig1')
+
+# codificação dos arquivos do ATPdraw (comentários com acentos, no Windows);
+# com newline = '' os arquivos gerados mantêm as quebras de linha do base
+codificacaoATP = 'latin-1'
+
+# arquivo de uma seção da linha: lttcc_L<comprimento em km>.lib
+_padraoSecao = re.compile(r"(\w+_L)(\d+(?:\.\d+)?)(\.lib)")
+
+def criarBase(base, novo):
+    '''
+    Copiar o arquivo base e "setar" todas as seções da linha de transmissão
+    para seções de 10 km.
+    '''
+    with open(base, 'r', encoding = codificacaoATP, newline = '') as f:
+        texto = _padraoSecao.sub(r"\g<1>10\g<3>", f.read())
+        
+    with open(novo, 'w', encoding = codificacaoATP, newline = '') as f_n:
+        f_n.write(texto)
+    
+
+def simular(arquivo, executavel = None):
+    '''Arquivo refere-se ao caminho no computador que ele se encontra 
+    (junto com a extensão .atp). O resultado é gravado em ...Res.lis, ao lado
+    do arquivo; ver simularCaso.'''
+    return simularCaso(arquivo, executavel = executavel)
+
+
+def simularCaso(arquivo, destino = None, executavel = None, startup = None,
+                pastaTrabalho = None, tempoLimite = None, tentativas = 1,
+                outros = (), ler = False, guardarLis = None):
+    '''
+    
+    Simula um arquivo .atp em uma pasta de trabalho própria, temporária, de
+    forma que vários casos podem rodar ao mesmo tempo (ver simularLote).
+    
+    O arquivo e o STARTUP são copiados para a pasta, o ATP roda nela com a
+    saída redirecionada para o .lis, e só o .lis é movido para o destino;
+    a pasta é apagada em seguida. Os $INCLUDE do arquivo devem ter caminhos
+    absolutos, como os gerados pelo ATPdraw.
+    
+    Argumentos:
+    -------
+    arquivo: o caminho do arquivo .atp
+    
+    destino: o caminho do .lis; por padrão, ...Res.lis ao lado do arquivo
+    
+    executavel: o executável do ATP; executavelATP por padrão
+    
+    startup: o arquivo STARTUP; por padrão, o da pasta do executável (se
+    existir)
+    
+    pastaTrabalho: onde criar as pastas temporárias; a do sistema por padrão
+    
+    tempoLimite: tempo máximo de cada tentativa, em segundos (None, sem limite)
+    
+    tentativas: número máximo de execuções, se o ATP falhar ou estourar o
+    tempo limite
+    
+    outros: extensões de outros arquivos gerados pelo ATP a guardar, na 
+    pasta do destino (por exemplo, ('.pch',) para LINE CONSTANTS)
+    
+    ler: se True, a saída do ATP é lida enquanto ele roda, por um LeitorLis,
+    e os resultados são retornados no registro (dados e colunas, como em 
+    lerLis), sem ler o .lis do disco depois
+    
+    guardarLis: com ler = True, se o .lis também deve ser gravado no destino;
+    False por padrão (sem ler, o .lis é sempre gravado)
+    
+    Retorna:
+    -------
+    um dicionário com arquivo, destino, status ('ok', 'erro' ou 
+    'tempoEsgotado'), codigo (o código de saída do ATP), tentativas e tempo
+    (o tempo total, em segundos); e, com ler = True, dados e colunas
+    '''
+    import shutil
+    import tempfile
+    from time import perf_counter
+    
+    executavel = executavel or executavelATP
+    destino = destino or arquivo[:-4] + 'Res.lis'
+    
+    if startup is None:
+        startup = os.path.join(os.path.dirname(executavel), 'STARTUP')
+    
+    registro = {'arquivo': arquivo, 'destino': destino, 'status': 'erro',
+                'codigo': None, 'tentativas': 0, 'tempo': 0.0}
+    
+    inicio = perf_counter()
+    
+    for tentativa in range(1, max(1, tentativas) + 1):
+        registro['tentativas'] = tentativa
+        pasta = tempfile.mkdtemp(prefix = 'atp', dir = pastaTrabalho)
+        
+        try:
+            nome = os.path.basename(arquivo)
+            shutil.copy(arquivo, os.path.join(pasta, nome))
+            
+            if os.path.isfile(startup):
+                shutil.copy(startup, os.path.join(pasta, 'STARTUP'))
+            
+            lis = None
+            if not ler or guardarLis:
+                lis = os.path.join(pasta, nome[:-4] + 'Res.lis')
+            
+            leitor = LeitorLis() if ler else None
+            
+            try:
+                registro['status'], registro['codigo'] = _executarATP(
+                        [executavel, nome], pasta, lis, tempoLimite, leitor)
+                
+            except OSError:
+                # executável não encontrado; não adianta tentar de novo
+                registro['status'] = 'erro'
+                break
+
+            except ValueError:
+                # saída do ATP sem os resultados no formato esperado
+                registro['status'], registro['codigo'] = 'erro', None
+
+            if registro['status'] == 'ok' and ler:
+                try:
+                    registro['dados'], registro['colunas'] = leitor.resultado()
+                except ValueError:
+                    registro['status'] = 'erro'
+            
+            if registro['status'] == 'ok':
+                pastaDestino = os.path.dirname(os.path.abspath(destino))
+                os.makedirs(pastaDestino, exist_ok = True)
+                
+                if lis is not None:
+                    shutil.move(lis, destino)
+                
+                for nomeOutro in os.listdir(pasta):
+                    if nomeOutro.lower().endswith(tuple(outros)):
+                        shutil.move(os.path.join(pasta, nomeOutro),
+                                    os.path.join(pastaDestino, nomeOutro))
+                break
+                
+        finally:
+            shutil.rmtree(pasta, ignore_errors = True)
+    
+    registro['tempo'] = perf_counter() - inicio
+    
+    return registro
+
+
+def _executarATP(comando, pasta, lis, tempoLimite, leitor = None):
+    '''
+    
+    Função auxiliar de simularCaso. Executa o ATP na pasta, gravando a saída
+    no arquivo lis (se não for None) e passando-a, à medida que chega, ao
+    leitor (se houver).
+    
+    Retorna:
+    -------
+    (status, codigo), ver simularCaso
+    '''
+    import subprocess
+    import threading
+    
+    if leitor is None:
+        with open(lis, 'wb') as saida:
+            try:
+                processo = subprocess.run(comando, cwd = pasta, stdout = saida,
+                                          stderr = subprocess.STDOUT,
+                                          timeout = tempoLimite)
+            except subprocess.TimeoutExpired:
+                return 'tempoEsgotado', None
+            
+        return 'ok' if processo.returncode == 0 else 'erro', processo.returncode
+    
+    processo = subprocess.Popen(comando, cwd = pasta, stdout = subprocess.PIPE,
+                                stderr = subprocess.STDOUT)
+    estourou = threading.Event()
+    
+    def interromper():
+        estourou.set()
+        processo.kill()
+        
+    vigia = threading.Timer(tempoLimite, interromper) if tempoLimite else None
+    saida = open(lis, 'wb') if lis is not None else None
+    
+    try:
+        if vigia is not None:
+            vigia.start()
+            
+        # read1: o que já estiver disponível no pipe, sem esperar encher
+        for bloco in iter(lambda: processo.stdout.read1(2**20), b''):
+            leitor.alimentar(bloco)
+            
+            if saida is not None:
+                saida.write(bloco)
+                
+        codigo = processo.wait()
+        
+    finally:
+        if vigia is not None:
+            vigia.cancel()
+        if saida is not None:
+            saida.close()
+        if processo.poll() is None:
+            processo.kill()
+        processo.stdout.close()
+        processo.wait()
+            
+    if estourou.is_set():
+        return 'tempoEsgotado', None
+    
+    return 'ok' if codigo == 0 else 'erro', codigo
+
+
+def _hashArquivo(caminho):
+    '''Função auxiliar. O hash do conteúdo de um arquivo, guardado enquanto o
+    arquivo não muda.'''
+    estado = os.stat(caminho)
+    return _hashConteudo(caminho, estado.st_mtime_ns, estado.st_size)
+
+
+@functools.lru_cache(maxsize = 4096)
+def _hashConteudo(caminho, mtime, tamanho):
+    h = hashlib.sha256()
+    
+    with open(caminho, 'rb') as f:
+        for bloco in iter(lambda: f.read(2**20), b''):
+            h.update(bloco)
+            
+    return h.hexdigest()
+
+
+def hashCaso(arquivo, executavel = None):
+    '''
+    
+    Identifica o resultado de um arquivo .atp: o hash do arquivo, dos 
+    arquivos dos $INCLUDE e do executável do ATP (a versão do ATP). Arquivos
+    não encontrados entram pelo caminho.
+    
+    Retorna:
+    -------
+    o hash, uma string hexadecimal
+    '''
+    executavel = executavel or executavelATP
+    h = hashlib.sha256()
+    
+    with open(arquivo, 'rb') as f:
+        conteudo = f.read()
+        
+    h.update(conteudo)
+    
+    incluidos = [linha.split(b',')[1].strip() for linha in conteudo.splitlines()
+                 if linha.startswith(b'$INCLUDE,')]
+    
+    for caminho in incluidos + [os.fsencode(executavel)]:
+        if os.path.isfile(caminho):
+            h.update(_hashArquivo(caminho).encode())
+        else:
+            h.update(caminho)
+    
+    return h.hexdigest()
+
+
+def lerManifesto(caminho):
+    '''Lê o manifesto de resultados (ver simularLote): um dicionário 
+    {destino: {'hash': ..., 'arquivo': ...}}; vazio se não existir.'''
+    import json
+    
+    try:
+        with open(caminho, 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    
+
+def gravarManifesto(caminho, manifesto):
+    '''Grava o manifesto de resultados, substituindo o anterior de uma vez, 
+    de forma que uma interrupção não o deixa pela metade.'''
+    import json
+    
+    temporario = caminho + '.tmp'
+    
+    with open(temporario, 'w') as f:
+        json.dump(manifesto, f, indent = 0, sort_keys = True)
+        
+    os.replace(temporario, caminho)
+
+
+def simularLote(arquivos, destinos = None, processos = None, 
+                progresso = None, manifesto = None, **opcoes):
+    '''
+    
+    Simula vários arquivos .atp ao mesmo tempo, cada um em sua pasta de 
+    trabalho (ver simularCaso). O trabalho é do ATP, em processos próprios,
+    então basta um conjunto de threads para acompanhá-los.
+    
+    Argumentos:
+    -------
+    arquivos: lista de arquivos .atp
+    
+    destinos: lista com o .lis de cada arquivo; por padrão, ao lado deles
+    
+    processos: número de simulações simultâneas; por padrão, o número de
+    núcleos
+    
+    progresso: função (registro, concluidos, total), chamada ao fim de cada 
+    caso
+    
+    manifesto: o caminho de um manifesto (JSON) com o hash (ver hashCaso) de
+    cada resultado simulado. Os casos com o .lis no destino e o mesmo hash 
+    no manifesto não são simulados de novo (status 'cache'); assim, depois
+    de mudar o circuito base, só os arquivos que mudaram são simulados.
+    
+    opcoes: executavel, startup, pastaTrabalho, tempoLimite, tentativas,
+    outros, ler e guardarLis, ver simularCaso. Com ler = True, os casos 
+    encontrados pelo manifesto são lidos do .lis (ver lerLis); para isso, o
+    .lis deve ser guardado (guardarLis = True).
+    
+    Retorna:
+    -------
+    a lista com o registro de cada caso (ver simularCaso), na ordem dos 
+    arquivos
+    '''
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+    
+    arquivos = list(arquivos)
+    
+    if destinos is None:
+        destinos = [arquivo[:-4] + 'Res.lis' for arquivo in arquivos]
+    destinos = list(destinos)
+    
+    registros = [None] * len(arquivos)
+    pendentes = range(len(arquivos))
+    
+    if manifesto is not None:
+        resultados = lerManifesto(manifesto)
+        hashes = [hashCaso(arquivo, opcoes.get('executavel'))
+                  for arquivo in arquivos]
+        
+        pendentes = []
+        
+        for n, destino in enumerate(destinos):
+            if (os.path.isfile(destino) and 
+                resultados.get(destino, {}).get('hash') == hashes[n]):
+                registros[n] = {'arquivo': arquivos[n], 'destino': destino,
+                                'status': 'cache', 'codigo': 0,
+                                'tentativas': 0, 'tempo': 0.0}
+                
+                if opcoes.get('ler'):
+                    registros[n]['dados'], registros[n]['colunas'] = \
+                                                            lerLis(destino)
+            else:
+                pendentes.append(n)
+    
+    concluidos = len(arquivos) - len(pendentes)
+    
+    with ThreadPoolExecutor(processos or os.cpu_count()) as executor:
+        tarefas = {executor.submit(simularCaso, arquivos[n], destinos[n], 
+                                   **opcoes): n for n in pendentes}
+        
+        for tarefa in as_completed(tarefas):
+            n = tarefas[tarefa]
+            registro = tarefa.result()
+            registros[n] = registro
+            concluidos += 1
+            
+            if manifesto is not None:
+                if registro['status'] == 'ok':
+                    resultados[destinos[n]] = {'hash': hashes[n],
+                                               'arquivo': arquivos[n]}
+                else:
+                    resultados.pop(destinos[n], None)
+                    
+                # a cada caso, para não perder os anteriores se o lote for
+                # interrompido
+                gravarManifesto(manifesto, resultados)
+            
+            if progresso is not None:
+                progresso(registro, concluidos, len(arquivos))
+    
+    return registros
+    
+
+    
+def extrairResultados(arq):
+    '''Lê um arquivo .lis e extrai o output colocando em outro arquivo.'''    
+    f_n = open(arq + "resultado.txt", 'w')
+    f_v = open(arq, 'r')
+    
+    procurandoInicio = True
+    n = 0
+    
+    # procurar inicio dos resultados no arquivo;
+    # ler resultados até encontrar linha com "Suspended simulation"
+    for linha in f_v:
+        if procurandoInicio and "EMTP output variables follow." in linha:
+            procurandoInicio = False
+            
+        elif not procurandoInicio:
+            if 'Step' in linha and 'Time' in linha:
+                # split depois join na string para sumir com os espaços extras
+                f_n.write(" ".join( linha.split() ) + "\n")
+                
+            elif n > 6:
+                if ("Suspended simulation" in linha) or ("Final time step" in linha):
+                    break
+                
+                elif "switch" in linha:
+                    pass
+                
+                else:
+                    res = linha.split()
+                    try:
+                        res.remove("SPY:")
+                    except ValueError:
+                        pass
+                    
+                    f_n.write(" ".join( res ) + "\n")
+        
+            else:
+                n += 1
+            
+    n = 0
+    # pular as linhas de suspensão até encontrar o final
+    for linha in f_v:
+        if n > 6:
+            if ("Suspended simulation" in linha):
+                n = 0
+                
+            elif ("Final time step" in linha):
+                break
+            
+            elif "switch" in linha:
+                    pass
+                
+            else:
+                res = linha.split()
+                try:
+                    res.remove("SPY:")
+                except ValueError:
+                    pass
+                
+                f_n.write(" ".join( res ) + "\n")
+                
+        else:
+            n += 1
+            
+    n = 0    
+    # pegar último resultado, uma linha única que vem depois do final
+    for linha in f_v:
+        if n > 0:
+            res = linha.split()
+            
+            try:
+                res.remove("SPY:")
+            except ValueError:
+                pass
+            
+            f_n.write(" ".join( res ) + "\n")
+            break
+        
+        else:
+            n += 1
+    
+    f_v.close()
+    f_n.flush()
+    f_n.close()
+    
+    
+def lerResultados(arq, extraido = False):
+    '''Lê um arquivo com os resultados extraídos e, com ele, cria um  data frame.'''    
+    import pandas as pd
+    
+    if extraido:        
+        df = pd.read_csv(arq, sep = " ")
+    else:
+        df =  pd.read_csv(arq + "resultado.txt", sep = " ")
+        
+    df.columns = _nomesColunas(list(df))
+    
+    return df
+
+
+def _nomesColunas(colunas):
+    '''Função auxiliar. Os nomes das colunas (Step, Time, VA, ..., IC) a partir
+    do cabeçalho do ATP, com o sufixo .1 nas barras repetidas, como no pandas.'''
+    nomes = list(colunas)[:2]
+    
+    v = ['XL001', 'V']
+    # identificar as colunas a partir do nome das barras.
+    # não há garantia que o ATP colocará os valores na mesma ordem sempre.
+    for nome in list(colunas)[2:5]:
+        if nome == v[0] + 'A':
+            nome = v[1] + 'A'
+            
+        elif nome == v[0] + 'B':
+            nome = v[1] + 'B'
+            
+        elif nome == v[0] + 'C':
+            nome = v[1] + 'C'
+    
+        else:
+            raise ValueError("Identificação inesperada para a barra")
+            
+        nomes += [nome]
+        
+    i = ['XL001', 'I']          
+    for nome in list(colunas)[5:8]:
+        if nome == i[0] + 'A.1':
+            nome = i[1] + 'A'
+            
+        elif nome == i[0] + 'B.1':
+            nome = i[1] + 'B'
+            
+        elif nome == i[0] + 'C.1':
+            nome = i[1] + 'C'
+    
+        else:
+            raise ValueError("Identificação inesperada para a barra")
+            
+        nomes += [nome]
+        
+    return nomes
+          
+    
+def lerLis(arq):
+    '''
+    
+    Lê os resultados diretamente do arquivo .lis do ATP, em uma única 
+    passagem, sem o arquivo intermediário de extrairResultados: o arquivo é
+    mapeado em memória, os trechos com os resultados são localizados pelas
+    mesmas marcas (ver _trechosLis) e cada trecho é convertido de uma vez.
+    
+    Retorna:
+    -------
+    (dados, colunas): um array float64 da forma (passos, 8) e os nomes das
+    colunas (Step, Time, VA, VB, VC, IA, IB, IC, na ordem do arquivo)
+    '''
+    import mmap
+    
+    with open(arq, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access = mmap.ACCESS_READ) as texto:
+            cabecalho, trechos = _trechosLis(texto)
+            colunas = _nomesColunas(_colunasCabecalho(cabecalho))
+            
+            blocos = [texto[inicio:fim] for inicio, fim in trechos]
+    
+    # cada linha tem no máximo um passo: o número de linhas limita o tamanho
+    dados = np.empty((sum(bloco.count(b'\n') + 1 for bloco in blocos),
+                      len(colunas)))
+    n = 0
+    
+    for bloco in blocos:
+        valores = _valoresBloco(bloco, len(colunas))
+        dados[n:n + len(valores)] = valores
+        n += len(valores)
+        
+    return dados[:n], colunas
+
+
+def _trechosLis(texto):
+    '''
+    
+    Função auxiliar. Localiza os resultados no texto de um .lis (bytes ou 
+    mmap), como em extrairResultados: depois de "EMTP output variables 
+    follow.", o cabeçalho (Step Time ...) e 7 linhas; os resultados vão até 
+    "Suspended simulation", depois da qual são puladas 7 linhas, ou até
+    "Final time step", seguido por uma linha e pelo último resultado.
+    
+    Retorna:
+    -------
+    (a linha do cabeçalho, lista de (início, fim) dos trechos com resultados)
+    '''
+    def proximaLinha(i):
+        return _proximaLinha(texto, i)
+    
+    def pularLinhas(i, n):
+        for _ in range(n):
+            i = proximaLinha(i)
+        return i
+    
+    i = texto.find(b'EMTP output variables follow.')
+    if i < 0:
+        raise ValueError("Resultados não encontrados no arquivo .lis")
+        
+    i = proximaLinha(i)
+    cabecalho = None
+    pulados = 0
+    
+    while pulados < 7 and i < len(texto):
+        fim = proximaLinha(i)
+        linha = texto[i:fim]
+        
+        if b'Step' in linha and b'Time' in linha:
+            cabecalho = linha
+        else:
+            pulados += 1
+            
+        i = fim
+        
+    if cabecalho is None:
+        raise ValueError("Cabeçalho dos resultados não encontrado no .lis")
+        
+    trechos = []
+    
+    while True:
+        suspensao = texto.find(b'Suspended simulation', i)
+        final = texto.find(b'Final time step', i)
+        
+        marcas = [marca for marca in (suspensao, final) if marca >= 0]
+        if not marcas:
+            # arquivo interrompido: resultados até o fim
+            trechos.append((i, len(texto)))
+            break
+        
+        marca = min(marcas)
+        trechos.append((i, texto.rfind(b'\n', i, marca) + 1 or i))
+        
+        if marca == suspensao:
+            i = pularLinhas(proximaLinha(marca), 7)
+        else:
+            i = pularLinhas(proximaLinha(marca), 1)
+            trechos.append((i, proximaLinha(i)))
+            break
+        
+    return cabecalho, trechos
+
+
+def _proximaLinha(texto, i):
+    '''Função auxiliar. O início da linha seguinte à que contém a posição i.'''
+    fim = texto.find(b'\n', i)
+    return len(texto) if fim < 0 else fim + 1
+
+
+class LeitorLis(object):
+    '''
+    
+    Lê os resultados de um .lis aos poucos, à medida que o texto chega (por
+    exemplo, do pipe da saída do ATP, ver simularCaso com ler = True), com as 
+    mesmas marcas de _trechosLis. Os resultados vão para um array que cresce
+    conforme a necessidade.
+    
+    Uso:
+        leitor = LeitorLis()
+        for bloco in ...:
+            leitor.alimentar(bloco)
+        dados, colunas = leitor.resultado()
+    '''
+    
+    def __init__(self):
+        self.estado = 'procurando'
+        self.resto = b''
+        self.pular = 0
+        self.depoisDePular = None
+        self.cabecalho = None
+        self.colunas = None
+        self.dados = None
+        self.passos = 0
+        
+        
+    def alimentar(self, bloco):
+        '''Recebe mais um bloco do texto; só as linhas completas são lidas, o
+        restante espera o próximo bloco.'''
+        texto = self.resto + bloco
+        fim = texto.rfind(b'\n') + 1
+        self.resto = texto[fim:]
+        
+        if fim:
+            self._ler(texto[:fim])
+            
+    
+    def resultado(self):
+        '''
+        
+        Termina a leitura (com a última linha, se incompleta).
+        
+        Retorna:
+        -------
+        (dados, colunas), como em lerLis
+        '''
+        if self.resto:
+            resto, self.resto = self.resto, b''
+            self._ler(resto + b'\n')
+            
+        if self.colunas is None:
+            raise ValueError("Resultados não encontrados na saída do ATP")
+        
+        if self.dados is None:
+            return np.empty((0, len(self.colunas))), self.colunas
+        
+        return self.dados[:self.passos], self.colunas
+    
+    
+    def _ler(self, texto):
+        i = 0
+        
+        while i < len(texto) and self.estado != 'fim':
+            if self.estado == 'procurando':
+                k = texto.find(b'EMTP output variables follow.', i)
+                if k < 0:
+                    return
+                
+                i = _proximaLinha(texto, k)
+                self.estado = 'cabecalho'
+                self.pular = 7
+                
+            elif self.estado == 'cabecalho':
+                fim = _proximaLinha(texto, i)
+                linha = texto[i:fim]
+                i = fim
+                
+                if b'Step' in linha and b'Time' in linha:
+                    self.cabecalho = linha
+                else:
+                    self.pular -= 1
+                    
+                if self.pular == 0:
+                    if self.cabecalho is None:
+                        raise ValueError("Cabeçalho dos resultados não " + 
+                                         "encontrado no .lis")
+                    
+                    self.colunas = _nomesColunas(
+                                        _colunasCabecalho(self.cabecalho))
+                    self.estado = 'dados'
+                    
+            elif self.estado == 'pulando':
+                i = _proximaLinha(texto, i)
+                self.pular -= 1
+                
+                if self.pular == 0:
+                    self.estado = self.depoisDePular
+                    
+            elif self.estado == 'dados':
+                suspensao = texto.find(b'Suspended simulation', i)
+                final = texto.find(b'Final time step', i)
+                
+                marcas = [marca for marca in (suspensao, final) if marca >= 0]
+                if not marcas:
+                    self._acrescentar(texto[i:])
+                    return
+                
+                marca = min(marcas)
+                self._acrescentar(texto[i:texto.rfind(b'\n', i, marca) + 1])
+                
+                i = _proximaLinha(texto, marca)
+                self.estado = 'pulando'
+                
+                if marca == suspensao:
+                    self.pular, self.depoisDePular = 7, 'dados'
+                else:
+                    self.pular, self.depoisDePular = 1, 'ultimo'
+                    
+            elif self.estado == 'ultimo':
+                fim = _proximaLinha(texto, i)
+                self._acrescentar(texto[i:fim])
+                i = fim
+                self.estado = 'fim'
+                
+                
+    def _acrescentar(self, bloco):
+        valores = _valoresBloco(bloco, len(self.colunas))
+        
+        if not len(valores):
+            return
+        
+        if self.dados is None or self.passos + len(valores) > len(self.dados):
+            # capacidade dobrada, para que o total copiado seja proporcional
+            # ao número de passos
+            capacidade = max(1024, 2 * self.passos, self.passos + len(valores))
+            dados = np.empty((capacidade, len(self.colunas)))
+            
+            if self.dados is not None:
+                dados[:self.passos] = self.dados[:self.passos]
+            self.dados = dados
+            
+        self.dados[self.passos:self.passos + len(valores)] = valores
+        self.passos += len(valores)
+
+
+def _colunasCabecalho(cabecalho):
+    '''Função auxiliar. Os nomes do cabeçalho, com o sufixo .1 nos 
+    repetidos.'''
+    colunas = []
+    
+    for nome in cabecalho.decode(codificacaoATP).split():
+        colunas.append(nome + '.1' if nome in colunas else nome)
+        
+    return colunas
+
+
+def _valoresBloco(bloco, numeroColunas):
+    '''Função auxiliar. Converte um trecho de resultados do .lis em um array
+    (passos, numeroColunas), de uma só vez.'''
+    import warnings
+    
+    # as mensagens de abertura e fechamento das chaves, raras, são cortadas
+    partes = []
+    inicio = 0
+    k = bloco.find(b'switch')
+    
+    while k >= 0:
+        partes.append(bloco[inicio:bloco.rfind(b'\n', 0, k) + 1])
+        inicio = bloco.find(b'\n', k)
+        inicio = len(bloco) if inicio < 0 else inicio
+        k = bloco.find(b'switch', inicio)
+        
+    if partes:
+        bloco = b''.join(partes) + bloco[inicio:]
+
+    bloco = bloco.replace(b'SPY:', b'    ')
+
+    if not bloco.strip():
+        return np.empty((0, numeroColunas))
+    
+    with warnings.catch_warnings():
+        # texto inesperado no trecho: o numpy para e avisa (ou, nas versões
+        # mais novas, levanta ValueError)
+        warnings.simplefilter('error', DeprecationWarning)
+        
+        try:
+            valores = np.fromstring(bloco, sep = ' ')
+        except (DeprecationWarning, ValueError):
+            raise ValueError("Texto inesperado nos resultados do .lis")
+        
+    if valores.size % numeroColunas:
+        raise ValueError("Número de valores incompatível com as colunas")
+        
+    return valores.reshape(-1, numeroColunas)
+
+
+def definirBarras(km, comprimentoSecao = 10):
+    '''Função auxiliar. Determina a barra à montante e à jusante do km
+    especificado, com seções de comprimentoSecao km (a barra XL001 no km 0).'''
+    secao = max(1, int(np.ceil(km / comprimentoSecao)))
+    
+    return "XL%03d" % secao, "XL%03d" % (secao + 1)
+    
+    
+def definirSecoes(km, comprimentoSecao = 10):
+    '''Função auxiliar. Determina o comprimento da primeira e segunda seção no
+    qual dividir uma seção de comprimentoSecao km.'''
+    secao1 = km - comprimentoSecao * (max(1, np.ceil(km / comprimentoSecao)) - 1)
+    secao2 = comprimentoSecao - secao1
+    
+    return _numero(secao1), _numero(secao2)
+    
+
+def _numero(x):
+    '''Função auxiliar. x como inteiro, se for, ou arredondado a 1 m.'''
+    x = round(float(x), 3)
+    return int(x) if x == int(x) else x
+    
+
+def replicarMudarResistencia(R, fase, titulo,
+                     base = "C:\\ATPdraw\\ATP\\TCC\\Base\\cktBase.atp"):   
+    '''
+    Cria um arquivo novo, mudando a resistência de falta das fases especificadas,
+    baseado em um arquivo pré-existente.
+    
+    Fases é uma string com o nome das fases (ABC) pra colocar a falta; a ordem
+    não importa.
+    '''
+    nomeNovo = "C:\\ATPdraw\\ATP\\TCC\\" + titulo + ".atp"        
+    modeloFalta(base).gravar(nomeNovo, None, fase, R)
+     
+     
+def _campoATP(valor, largura):
+    '''Função auxiliar. Escreve um número em um campo de largura fixa do ATP,
+    com o maior número de algarismos que couber.'''
+    for algarismos in range(largura, 0, -1):
+        texto = '%.*G' % (algarismos, valor)
+        
+        if '.' not in texto and 'E' not in texto:
+            texto += '.'
+        if texto.startswith('0.'):
+            texto = texto[1:]
+            
+        if len(texto) <= largura:
+            return texto.rjust(largura)
+        
+    raise ValueError("Valor não cabe no campo: " + str(valor))
+
+
+class ModeloFalta(object):
+    '''
+    
+    O arquivo base (cktBase.atp) lido e analisado uma única vez, com as 
+    posições das linhas que mudam de um caso de falta para outro: os $INCLUDE
+    das seções da linha, as chaves de falta (XSWT0n) e os resistores de falta
+    (XF000n). Cada caso é montado trocando só essas linhas, sem ler o
+    arquivo de novo nem usar expressões regulares.
+    
+    Uso:
+        modelo = modeloFalta(base)
+        modelo.gravar("...FFTA15.atp", 15, 'A')
+    '''
+    
+    fases = {'A': '1', 'B': '2', 'C': '3'}
+    
+    def __init__(self, linhas):
+        '''linhas: as linhas do arquivo base, com as quebras de linha'''
+        self.linhas = list(linhas)
+            
+        # seções: (índice da primeira das duas linhas do $INCLUDE, barra
+        # inicial, barra final, texto do arquivo da seção, comprimento em km)
+        secoes = []
+        self.chaves = {}
+        self.resistores = {}
+        
+        for n, linha in enumerate(self.linhas):
+            if linha.startswith('$INCLUDE'):
+                texto = linha + self.linhas[n + 1]
+                barras = re.findall(r"XL\d{3}", texto)
+                secao = _padraoSecao.search(linha)
+                
+                secoes.append((n, barras[0], barras[-1], secao.group(0),
+                               float(secao.group(2))))
+                
+            for fase, z in self.fases.items():
+                if linha.startswith('  XSWT0' + z):
+                    self.chaves[fase] = n
+                    
+                elif linha[8:14] == 'XF000' + z:
+                    self.resistores[fase] = n
+        
+        # em ordem, do emissor ao receptor
+        secoes.sort(key = lambda secao: secao[1])
+        self.secoes = secoes
+        
+        self.barras = [secao[1] for secao in secoes] + [secoes[-1][2]]
+        self.posicoes = np.cumsum([0.0] + [secao[4] for secao in secoes])
+        
+        comprimentos = np.diff(self.posicoes)
+        self.comprimentoSecao = (comprimentos[0] if 
+                                 np.all(comprimentos == comprimentos[0]) 
+                                 else None)
+        
+        
+    @classmethod
+    def doArquivo(cls, base):
+        '''Lê o arquivo base (ver também modeloFalta).'''
+        with open(base, 'r', encoding = codificacaoATP, newline = '') as f:
+            return cls(f.read().splitlines(True))
+        
+        
+    def comSecoes(self, numeroSecoes, comprimentoSecao):
+        '''
+        
+        Um novo modelo, com a linha dividida em numeroSecoes seções de
+        comprimentoSecao km (comprimento total qualquer). As seções novas 
+        repetem, em ciclo, a ordem de ligação das fases das seções do arquivo
+        base (a transposição); a última barra é renomeada em todo o arquivo.
+        
+        Os arquivos das seções (lttcc_L<comprimento>.lib) devem existir, ver
+        decksSecoes.
+        '''
+        if not 1 <= numeroSecoes <= 998:
+            raise ValueError("Número de seções deve estar entre 1 e 998.")
+            
+        inicio = self.secoes[0][0]
+        fim = max(secao[0] for secao in self.secoes) + 2
+        
+        ultimaBarra = "XL%03d" % (numeroSecoes + 1)
+        
+        def renomear(linha):
+            return linha.replace(self.barras[-1], ultimaBarra)
+        
+        novas = []
+        
+        for k in range(numeroSecoes):
+            n, barra1, barra2, arquivoSecao, comprimento = \
+                                        self.secoes[k % len(self.secoes)]
+            
+            texto = (self.linhas[n] + self.linhas[n + 1]).replace(
+                        barra1, '\0').replace(barra2, '\1')
+            
+            texto = texto.replace('\0', "XL%03d" % (k + 1)).replace(
+                        '\1', "XL%03d" % (k + 2)).replace(arquivoSecao,
+                        _arquivoSecao(arquivoSecao, comprimentoSecao))
+            
+            novas += texto.splitlines(True)
+        
+        return ModeloFalta(list(map(renomear, self.linhas[:inicio])) + novas +
+                           list(map(renomear, self.linhas[fim:])))
+        
+        
+    def localizar(self, km):
+        '''
+        
+        A seção em que fica o ponto km.
+        
+        Retorna:
+        -------
+        (índice da seção, comprimento até o ponto, comprimento depois dele);
+        um dos comprimentos é 0 se km é uma barra da linha
+        '''
+        import bisect
+        
+        if not 0 <= km <= self.posicoes[-1]:
+            raise ValueError("km fora da linha: " + str(km))
+        
+        if self.comprimentoSecao is not None:
+            # seções iguais: a seção é calculada diretamente
+            j = min(int(km // self.comprimentoSecao), len(self.secoes) - 1)
+        else:
+            j = min(bisect.bisect_right(self.posicoes, km), 
+                    len(self.secoes)) - 1
+            
+        inicio, fim = self.posicoes[j], self.posicoes[j + 1]
+        
+        return j, _numero(km - inicio), _numero(fim - km)
+    
+    
+    def gerar(self, km, fases = 'ABC', resistencia = None, instante = None):
+        '''
+        
+        Monta o texto do arquivo .atp com a falta fase-terra.
+        
+        Argumentos:
+        -------
+        km: a posição da falta; None mantém a falta do arquivo base
+        
+        fases: string com as fases em falta (a ordem não importa)
+        
+        resistencia: a resistência de falta das fases em falta, em Ohm; None 
+        mantém a do arquivo base
+        
+        instante: o instante de fechamento das chaves de falta, em segundos;
+        None mantém o do arquivo base
+        
+        Retorna:
+        -------
+        o texto do arquivo
+        '''
+        fases = [f for f in 'ABC' if f in fases.upper()]
+        linhas = list(self.linhas)
+        
+        if resistencia is not None:
+            campo = _campoATP(resistencia, 6)
+            
+            for f in fases:
+                n = self.resistores[f]
+                linhas[n] = linhas[n][:26] + campo + linhas[n][32:]
+                
+        if instante is not None:
+            campo = _campoATP(instante, 9).rjust(10)
+            
+            for f in fases:
+                c = self.chaves[f]
+                linhas[c] = linhas[c][:14] + campo + linhas[c][24:]
+        
+        if km is None:
+            return ''.join(linhas)
+        
+        j, secao1, secao2 = self.localizar(km)
+        n, barra1, barra2, arquivoSecao, comprimento = self.secoes[j]
+        
+        if secao1 == 0 or secao2 == 0:
+            # falta em uma barra: a chave de falta vai para a barra
+            barra = barra1 if secao1 == 0 else barra2
+            
+            for f in fases:
+                c = self.chaves[f]
+                linhas[c] = linhas[c].replace('XSWT0' + self.fases[f], 
+                                              barra + f)
+            
+            return ''.join(linhas)
+        
+        # divide a seção em duas, com a chave de falta entre elas
+        texto = linhas[n] + linhas[n + 1]
+        texto1 = texto.replace(arquivoSecao, 
+                               _arquivoSecao(arquivoSecao, secao1))
+        texto2 = texto.replace(arquivoSecao, 
+                               _arquivoSecao(arquivoSecao, secao2))
+        
+        for f in 'ABC':
+            no = 'XSWT0' + self.fases[f] if f in fases else 'XLINT' + f
+            
+            texto1 = texto1.replace(barra2 + f, no)
+            texto2 = texto2.replace(barra1 + f, no)
+        
+        linhas[n] = texto1
+        linhas[n + 1] = texto2
+        
+        return ''.join(linhas)
+    
+    
+    def gravar(self, nome, km, fases = 'ABC', resistencia = None, 
+               instante = None):
+        '''Grava o arquivo .atp com a falta, ver gerar.'''
+        with open(nome, 'w', encoding = codificacaoATP, newline = '') as f:
+            f.write(self.gerar(km, fases, resistencia, instante))
+            
+            
+    def instanteFalta(self):
+        '''O instante de fechamento das chaves de falta no arquivo base.'''
+        linha = self.linhas[self.chaves['A']]
+        return float(linha[14:24])
+            
+
+def modeloFalta(base):
+    '''O ModeloFalta do arquivo base, analisado uma vez enquanto o arquivo 
+    não muda.'''
+    estado = os.stat(base)
+    return _modeloFalta(base, estado.st_mtime_ns, estado.st_size)
+
+
+@functools.lru_cache(maxsize = 8)
+def _modeloFalta(base, mtime, tamanho):
+    return ModeloFalta.doArquivo(base)
+
+
+def _arquivoSecao(arquivoSecao, comprimento):
+    '''Função auxiliar. O arquivo da seção de outro comprimento: 
+    lttcc_L10.lib -> lttcc_L2.5.lib'''
+    return _padraoSecao.sub(r"\g<1>%g\g<3>" % _numero(comprimento), 
+                            arquivoSecao)
+
+
+def decksSecoes(dat, comprimentos, pasta):
+    '''
+    
+    Cria os arquivos de LINE CONSTANTS (JMARTI SETUP) das seções de linha
+    com os comprimentos dados, a partir do arquivo da seção (lttcc.dat),
+    trocando o comprimento nos cartões de frequência. Simulados no ATP 
+    (simularLote(..., outros = ('.pch',))), geram os .pch, convertidos para
+    as bibliotecas das seções por bibliotecaSecao.
+    
+    Retorna:
+    -------
+    a lista dos arquivos criados, lttcc_L<comprimento>.dat
+    '''
+    with open(dat, 'r', encoding = codificacaoATP, newline = '') as f:
+        linhas = f.read().splitlines(True)
+        
+    nome = os.path.splitext(os.path.basename(dat))[0]
+    
+    inicio = next(n for n, linha in enumerate(linhas)
+                  if 'ENDING CONDUCTOR CARDS' in linha) + 1
+    fim = next(n for n, linha in enumerate(linhas)
+               if 'ENDING FREQUENCY CARDS' in linha)
+    
+    arquivos = []
+    
+    for comprimento in sorted(set(map(_numero, comprimentos))):
+        novas = list(linhas)
+        campo = _campoATP(comprimento, 8)
+        
+        # comprimento da linha nas colunas 45 a 52 dos cartões de frequência
+        for n in range(inicio, fim):
+            novas[n] = novas[n][:44] + campo + novas[n][52:]
+            
+        arquivo = os.path.join(pasta, nome + '_L%g.dat' % comprimento)
+        
+        with open(arquivo, 'w', encoding = codificacaoATP, newline = '') as f:
+            f.write(''.join(novas))
+            
+        arquivos.append(arquivo)
+        
+    return arquivos
+
+
+def bibliotecaSecao(pch, lib):
+    '''
+    
+    Converte os cartões gerados pelo LINE CONSTANTS (.pch) na biblioteca 
+    usada pelo $INCLUDE do arquivo base, como o ATPdraw: os nós da seção
+    (IN___A, ..., OUT__C) viram argumentos, indicados no cabeçalho (KARD, 
+    número do cartão; KARG, número do argumento; KBEG e KEND, colunas).
+    '''
+    argumentos = ['IN___A', 'IN___B', 'IN___C', 'OUT__A', 'OUT__B', 'OUT__C']
+    
+    # as larguras das linhas são as do ATPdraw
+    with open(pch, 'r', encoding = codificacaoATP) as f:
+        cartoes = ['/BRANCH'] + [linha.rstrip('\r\n').ljust(
+                                    79 if linha.startswith('-') else 81)
+                                 for linha in f if not linha.startswith('C ')]
+    
+    kard, karg, kbeg, kend = [], [], [], []
+    
+    for n, cartao in enumerate(cartoes, 1):
+        if cartao.startswith('-'):
+            for inicio in (2, 8):
+                kard.append(n)
+                karg.append(argumentos.index(cartao[inicio:inicio + 6]) + 1)
+                kbeg.append(inicio + 1)
+                kend.append(inicio + 6)
+    
+    def cabecalho(nome, valores):
+        return nome + ''.join('%3d' % v for v in valores)
+    
+    linhas = [cabecalho('KARD', kard), cabecalho('KARG', karg),
+              cabecalho('KBEG', kbeg), cabecalho('KEND', kend),
+              cabecalho('KTEX', [1] * len(kard))] + cartoes + ['$EOF',
+              'ARG, ' + ', '.join(argumentos)]
+    
+    with open(lib, 'w', encoding = codificacaoATP, newline = '') as f:
+        f.write('\r\n'.join(linhas) + '\r\n')
+
+
+def replicarFaltaTerra(km, titulo, fases = 'ABC',
+                     base = "C:\\ATPdraw\\ATP\\TCC\\Base\\cktBase.atp"):   
+    '''
+    Cria um arquivo novo com uma falta fase-terra com as fases especificadas,
+    baseado em um arquivo pré-existente (ver ModeloFalta).
+    
+    Fases é uma string com o nome das fases (ABC) pra colocar a falta; a ordem
+    não importa.
+    '''
+    nomeNovo = "C:\\ATPdraw\\ATP\\TCC\\" + titulo + str(km) + ".atp"
+    modeloFalta(base).gravar(nomeNovo, km, fases)
+    
+    
+def replicar99(titulo, fases = 'ABC',
+                     base = "C:\\ATPdraw\\ATP\\TCC\\Base\\cktBase.atp"):
+                         
+    '''
+    Cria falta fase-terra em todos os pontos (1 a 99) da linha usando o arquivo
+    base especificado, analisado uma única vez.
+    '''    
+    modelo = modeloFalta(base)
+    
+    for km in range(1,100):
+        modelo.gravar("C:\\ATPdraw\\ATP\\TCC\\" + titulo + str(km) + ".atp", 
+                      km, fases)
+        
+
+class GradeFaltas(object):
+    '''
+    
+    Grade de cenários de falta fase-terra: todas as combinações de posição 
+    (km, com qualquer resolução), fases em falta, resistência de falta e 
+    ângulo de incidência, sobre um ModeloFalta (com qualquer número e 
+    comprimento de seções, ver ModeloFalta.comSecoes).
+    
+    Uso, com faltas a cada 100 m:
+        modelo = modeloFalta(base).comSecoes(20, 10)
+        grade = GradeFaltas(modelo, np.arange(0.1, 200, 0.1), 
+                            resistencias = [0.5, 10, 100], angulos = [0, 90])
+        decksSecoes(dat, grade.comprimentosSecoes(), pastaSecoes)
+        arquivos = grade.gerar(pasta)
+    '''
+    
+    def __init__(self, modelo, posicoes, fases = None, resistencias = (None,),
+                 angulos = (None,), frequencia = 60.0):
+        '''
+        
+        Argumentos:
+        -------
+        modelo: o ModeloFalta
+        
+        posicoes: as posições da falta, em km
+        
+        fases: as combinações de fases; combinacoesFases por padrão
+        
+        resistencias: as resistências de falta, em Ohm; None mantém a do 
+        arquivo base
+        
+        angulos: os ângulos de incidência, em graus, em relação às fontes
+        (ângulo 0 em t = 0); None mantém o instante do arquivo base
+        
+        frequencia: a frequência das fontes, em Hz
+        '''
+        self.modelo = modelo
+        self.posicoes = [_numero(km) for km in posicoes]
+        self.fases = list(fases or combinacoesFases)
+        self.resistencias = list(resistencias)
+        self.angulos = list(angulos)
+        self.frequencia = frequencia
+        
+        # cada caso: (fases, km, resistência, ângulo)
+        self.casos = list(itertools.product(self.fases, self.posicoes,
+                                            self.resistencias, self.angulos))
+        
+        
+    def nome(self, caso):
+        '''O nome do arquivo do caso, como os do TCC (FFTA15), acrescido da 
+        resistência e do ângulo, se dados.'''
+        fases, km, resistencia, angulo = caso
+        nome = "FFT" + fases + "%g" % km
+        
+        if resistencia is not None:
+            nome += "R%g" % resistencia
+        if angulo is not None:
+            nome += "G%g" % angulo
+            
+        return nome
+    
+    
+    def instante(self, angulo):
+        '''O instante de fechamento das chaves com o ângulo de incidência 
+        dado: o primeiro a partir do instante do arquivo base.'''
+        if angulo is None:
+            return None
+        
+        periodo = 1 / self.frequencia
+        t0 = self.modelo.instanteFalta()
+        
+        return t0 + ((angulo / 360 - t0 / periodo) % 1) * periodo
+    
+    
+    def comprimentosSecoes(self):
+        '''Os comprimentos das seções (km) de todos os casos, para criar as
+        bibliotecas (ver decksSecoes).'''
+        comprimentos = {_numero(secao[4]) for secao in self.modelo.secoes}
+        
+        for km in self.posicoes:
+            j, secao1, secao2 = self.modelo.localizar(km)
+            if secao1 and secao2:
+                comprimentos.update((secao1, secao2))
+                
+        return sorted(comprimentos)
+    
+    
+    def tabela(self):
+        '''Um DataFrame com os parâmetros de cada caso e o nome do arquivo.'''
+        import pandas as pd
+        
+        tabela = pd.DataFrame(self.casos, columns = ['fases', 'km', 
+                                                     'resistencia', 'angulo'])
+        tabela.insert(0, 'caso', [self.nome(caso) for caso in self.casos])
+        
+        return tabela
+    
+    
+    def gerar(self, pasta, processos = None, tamanhoParte = 1000):
+        '''
+        
+        Grava os arquivos .atp de todos os casos na pasta, em vários 
+        processos, cada um com uma parte dos casos.
+        
+        Retorna:
+        -------
+        a lista dos arquivos, na ordem dos casos
+        '''
+        from concurrent.futures import ProcessPoolExecutor
+        
+        os.makedirs(pasta, exist_ok = True)
+        
+        casos = [(os.path.join(pasta, self.nome(caso) + ".atp"), caso[1],
+                  caso[0], caso[2], self.instante(caso[3]))
+                 for caso in self.casos]
+        
+        partes = [casos[n:n + tamanhoParte] 
+                  for n in range(0, len(casos), tamanhoParte)]
+        
+        if processos == 1 or len(partes) <= 1:
+            for parte in partes:
+                _gravarCasos(self.modelo, parte)
+        else:
+            with ProcessPoolExecutor(processos) as executor:
+                list(executor.map(functools.partial(_gravarCasos, self.modelo),
+                                  partes))
+                
+        return [caso[0] for caso in casos]
+    
+    
+def _gravarCasos(modelo, casos):
+    '''Função auxiliar de GradeFaltas.gerar, executada em cada processo.'''
+    for nome, km, fases, resistencia, instante in casos:
+        modelo.gravar(nome, km, fases, resistencia, instante)
+        
+
+def amostrarMedidor(dados, taxaAmostragem = 500, periodoDados = 1e-6):
+    '''
+    
+    Simula um medidor digital extraindo valores de dados de entrada.
+    
+    -------------
+    Parâmetros:
+        dados, dataframe de dados do qual extrair os valores, considerando
+    que tenha um período igualmente espaçado entre valores;
+        periodoDados = 1e-6, em segundos;
+        taxaAmostragem = 500, em Hz
+        
+    Se (1/periodoDados/taxaAmostragem) não resultar em um valor inteiro,
+    arredondamento é feito; pode levar a erros.
+        
+    -----------
+    Retorna: 
+        os valores capturados pelo medidor
+    '''
+    valoresAmostrados = dados.loc[dados['Step'] == 1]
+    intervalo = round(1/periodoDados/taxaAmostragem)
+    n = 0
+    
+    for valor in dados.Step:
+        if n == intervalo:
+            n = 1
+            valoresAmostrados = valoresAmostrados.append(
+                                            dados.loc[dados['Step'] == valor])
+                        
+        else:
+            n += 1
+            
+    return valoresAmostrados
+
+
+# pasta dos arquivos do TCC
+pastaCampanha = "C:\\ATPdraw\\ATP\\TCC"
+
+def pasta(f): return pastaCampanha + "\\FFT" + f + "0.5"
+
+def arquivo(f, km): return pasta(f) + "\\FFT" + f + str(km) + "Res.lis"
+
+def arquivoResultado(f, km): return arquivo(f, km) + "resultado.txt"
+
+combinacoesFases = ['ABC', 'AB', 'AC', 'BC', 'A', 'B', 'C']
+
+# leitura serial, via os resultado.txt; para carregar a campanha toda em 
+# paralelo, direto dos .lis, ver carregarCampanha
+def extrairTodos():
+    for fase in combinacoesFases:
+            for km in range(1,100):
+                extrairResultados(arquivo(fase, km))
+
+def lerTodosArquivos(extraidos = True):
+    '''apos arquivos organizados manualmente;'''    
+    if not extraidos: #para não re-extrair
+        extrairTodos()
+    
+    dados = {}
+    for fase in combinacoesFases:
+        for km in range(1,100):
+            dados.update({"FFT" + fase + str(km) : lerResultados(
+                                                arquivoResultado(fase, km), True)})
+            
+    return dados
+    
+        
+def lerTodosArquivosFourier(extraidos=True):
+    if not extraidos: #para não re-extrair
+        extrairTodos()
+        
+    medidas = ['VA', 'VB', 'VC', 'IA', 'IB', 'IC']
+    dados = {}
+    for fase in combinacoesFases:
+        for km in range(1,100):
+            valores = lerResultados(arquivoResultado(fase, km), True)
+            valores = amostrarMedidor(valores)
+            valoresFourier = np.array([])
+            for v in medidas:
+                valoresFourier = np.hstack((valoresFourier, sp.fft(valores.get(v))))
+                
+            dados.update({"FFT" + fase + str(km) : valoresFourier})
+            
+    return dados #va,vb,vc,ia,ib,ic
+
+
+# nome do .lis de um caso: FFT<fases><km>[R<resistência>][G<ângulo>]Res.lis,
+# com os números escritos com "%g", ver GradeFaltas.nome
+_numeroCaso = r"\d+(?:\.\d*)?(?:e[+-]?\d+)?"
+_padraoCaso = re.compile(r"FFT([ABC]+)(%s)(?:R(%s))?(?:G(-?%s))?Res\.lis" 
+                         % ((_numeroCaso,) * 3))
+
+_campanha = {}
+
+def casosCampanha(raiz, padrao = '*Res.lis'):
+    '''
+    
+    Encontra os .lis de uma campanha, em raiz e em todas as subpastas (como
+    as pastas FFT<fases>0.5 do TCC), e identifica cada caso pelo nome. Os
+    arquivos cujo nome não segue o dos casos (GradeFaltas.nome), como o
+    cktBaseRes.lis, são ignorados, com um aviso.
+    
+    Retorna:
+    -------
+    um DataFrame com caso (o nome, como as chaves de lerTodosArquivos), 
+    arquivo, fases, km, resistencia e angulo (NaN se não estiverem no nome),
+    ordenado por fases (na ordem de combinacoesFases), km, resistência e 
+    ângulo
+    '''
+    import glob
+    import warnings
+    import pandas as pd
+    
+    linhas = []
+    ignorados = []
+    
+    for arquivo in glob.glob(os.path.join(raiz, '**', padrao), 
+                             recursive = True):
+        nome = os.path.basename(arquivo)
+        partes = _padraoCaso.fullmatch(nome)
+        
+        if partes is None:
+            ignorados.append(nome)
+            continue
+        
+        fases, km, resistencia, angulo = partes.groups()
+        linhas.append((nome[:-7], arquivo, fases, float(km), 
+                       float(resistencia) if resistencia else np.nan,
+                       float(angulo) if angulo else np.nan))
+    
+    if ignorados:
+        warnings.warn('%d arquivos fora do padrão dos casos foram ignorados: '
+                      % len(ignorados) + ', '.join(sorted(ignorados)))
+    
+    casos = pd.DataFrame(linhas, columns = ['caso', 'arquivo', 'fases', 'km',
+                                            'resistencia', 'angulo'])
+    
+    ordem = {fases: n for n, fases in enumerate(combinacoesFases)}
+    casos['ordem'] = casos['fases'].map(ordem).fillna(len(ordem))
+    
+    casos = casos.sort_values(['ordem', 'fases', 'km', 'resistencia', 
+                               'angulo', 'arquivo'])
+    
+    return casos.drop(columns = 'ordem').reset_index(drop = True)
+
+
+def carregarCampanha(raiz, padrao = '*Res.lis', processos = None,
+                     canais = ('VA', 'VB', 'VC', 'IA', 'IB', 'IC'),
+                     dtype = float, tamanhoParte = None, progresso = None):
+    '''
+    
+    Carrega todos os casos de uma campanha (ver casosCampanha) em vários 
+    processos, lendo os .lis diretamente (ver lerLis), em um único array.
+    
+    O primeiro caso, lido no processo atual, dá o número de passos e o 
+    tempo; os processos escrevem os demais diretamente no array, alocado
+    antes em memória compartilhada. Casos com menos passos ficam com NaN no
+    final; com mais, são cortados (o número de passos de cada caso fica na
+    tabela dos casos). Um caso que não pode ser lido (arquivo incompleto, 
+    sem algum dos canais...) não interrompe a carga: fica com NaN e 0 
+    passos, com um aviso.
+    
+    Argumentos:
+    -------
+    raiz: a pasta da campanha
+    
+    padrao: o padrão dos nomes dos .lis
+    
+    processos: número de processos; None (padrão) usa todos os núcleos, 1
+    lê no processo atual
+    
+    canais: as colunas a carregar, na ordem do array
+    
+    dtype: o tipo do array (np.float32 usa metade da memória)
+    
+    tamanhoParte: número de casos enviados de cada vez a um processo; por
+    padrão, cerca de 4 partes por processo
+    
+    progresso: função (concluidos, total), chamada a cada parte concluída
+    
+    Retorna:
+    -------
+    (dados, tempo, casos): o array da forma (caso, passo, canal), o tempo 
+    de cada passo e a tabela dos casos (ver casosCampanha), com a coluna 
+    passos
+    '''
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+    from multiprocessing import shared_memory
+    
+    casos = casosCampanha(raiz, padrao)
+    arquivos = list(casos['arquivo'])
+    total = len(arquivos)
+    
+    tempo = None
+    
+    for arquivo in arquivos:
+        try:
+            dados0, colunas = lerLis(arquivo)
+        except (OSError, ValueError):
+            continue
+        
+        tempo = dados0[:, colunas.index('Time')].copy()
+        break
+    
+    if tempo is None:
+        raise ValueError("Nenhum caso pôde ser lido em " + raiz)
+    
+    forma = (total, len(tempo), len(canais))
+    
+    if processos is None:
+        processos = os.cpu_count()
+        
+    passos = [None] * total
+    
+    if processos <= 1 or total == 1:
+        dados = np.full(forma, np.nan, dtype = dtype)
+        _campanha['dados'] = dados
+        
+        try:
+            for i in range(total):
+                passos[i] = _carregarParte(arquivos[i:i + 1], i, canais)[0]
+                
+                if progresso is not None:
+                    progresso(i + 1, total)
+        finally:
+            del _campanha['dados']
+            
+        return _concluirCampanha(dados, tempo, casos, passos)
+    
+    if tamanhoParte is None:
+        tamanhoParte = max(1, int(np.ceil(total / (4 * processos))))
+    
+    memoria = shared_memory.SharedMemory(create = True, size = max(1, 
+                    int(np.prod(forma)) * np.dtype(dtype).itemsize))
+    
+    try:
+        dados = np.ndarray(forma, dtype = dtype, buffer = memoria.buf)
+        dados.fill(np.nan)
+        
+        concluidos = 0
+        
+        with ProcessPoolExecutor(processos, initializer = _iniciarCampanha,
+                                 initargs = (memoria.name, forma, 
+                                             np.dtype(dtype).str)) as executor:
+            tarefas = {executor.submit(_carregarParte, 
+                                       arquivos[i:i + tamanhoParte], i, 
+                                       canais): i
+                       for i in range(0, total, tamanhoParte)}
+            
+            for tarefa in as_completed(tarefas):
+                i = tarefas[tarefa]
+                lidos = tarefa.result()
+                passos[i:i + len(lidos)] = lidos
+                concluidos += len(lidos)
+                
+                if progresso is not None:
+                    progresso(concluidos, total)
+        
+        resultado = dados.copy()
+        del dados
+        
+    finally:
+        memoria.close()
+        memoria.unlink()
+        
+    return _concluirCampanha(resultado, tempo, casos, passos)
+
+
+def _concluirCampanha(dados, tempo, casos, passos):
+    '''Função auxiliar de carregarCampanha. Acrescenta os passos à tabela e
+    avisa dos casos que não puderam ser lidos.'''
+    import warnings
+    
+    casos['passos'] = passos
+    falhas = casos['caso'][casos['passos'] == 0]
+    
+    if len(falhas):
+        warnings.warn('%d casos não puderam ser lidos e ficaram com NaN: '
+                      % len(falhas) + ', '.join(falhas))
+    
+    return dados, tempo, casos
+
+
+def _iniciarCampanha(nome, forma, tipo):
+    '''Função auxiliar de carregarCampanha, executada no início de cada 
+    processo. Liga o array dos dados à memória compartilhada.'''
+    from multiprocessing import shared_memory
+    
+    _campanha['memoria'] = shared_memory.SharedMemory(name = nome)
+    _campanha['dados'] = np.ndarray(forma, dtype = tipo, 
+                                    buffer = _campanha['memoria'].buf)
+    
+    
+def _carregarParte(arquivos, inicio, canais):
+    '''Função auxiliar de carregarCampanha, executada pelos processos. Lê os
+    casos de uma parte e os escreve no array compartilhado.
+    
+    Retorna:
+    -------
+    o número de passos de cada caso'''
+    dados = _campanha['dados']
+    passos = []
+    
+    for i, arquivo in enumerate(arquivos, inicio):
+        try:
+            valores, colunas = lerLis(arquivo)
+            indices = [colunas.index(c) for c in canais]
+        except (OSError, ValueError):
+            # o caso fica com NaN; carregarCampanha avisa
+            passos.append(0)
+            continue
+        
+        n = min(len(valores), dados.shape[1])
+        
+        dados[i, :n] = valores[:n, indices]
+        passos.append(len(valores))
+        
+    return passos
@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+"""
+Configuração dos testes (pytest). Os módulos de codigosPython são importados
+pelo nome, como nos scripts, e os arquivos do ATP vêm dos .zip da pasta
+arquivosEMTP-ATPdraw.
+
+@author: Pedro Henrique Nascimento Vieira
+"""
+import os
+import shutil
+import sys
+import zipfile
+
+import pytest
+
+pastaCodigos = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+sys.path.insert(0, pastaCodigos)
+
+pastaATP = os.path.join(os.path.dirname(pastaCodigos), 'arquivosEMTP-ATPdraw')
+
+pastaDados = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'dados')
+
+
+def extrairATP(zip, nome, pasta):
+    '''Extrai um arquivo de um dos .zip de arquivosEMTP-ATPdraw.'''
+    with zipfile.ZipFile(os.path.join(pastaATP, zip)) as arquivo:
+        return arquivo.extract(nome, str(pasta))
+
+
+@pytest.fixture
+def cktBase(tmp_path):
+    '''O caso base do TCC, cktBase.atp, em uma pasta temporária.'''
+    return extrairATP('arquivosACPeATP.zip', 'cktBase.atp', tmp_path)
+
+
+def copiarLis(pasta, nome = 'FFTA37Res.lis'):
+    '''Copia o .lis de exemplo de testes/dados (falta na fase A no km 37,
+    com uma suspensão da simulação) para pasta, com o nome dado.'''
+    return shutil.copy(os.path.join(pastaDados, 'FFTA37Res.lis'), 
+                       os.path.join(str(pasta), nome))
@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+"""
+Testes da linha de transmissão monofásica com circuitos pi em cascata.
+
+@author: Pedro Henrique Nascimento Vieira
+"""
+import numpy as np
+import pytest
+
+from classeLinhaDeTransmissaoPiCascata import LinhaDeTransmissaoPiCascata
+
+# parâmetros distribuídos de resolucaoDaLinhaPiCascata.py
+condutanciaDistribuida = 0.556e-6
+capacitanciaDistribuida = 11.11e-9
+resistenciaDistribuida = np.array([0.026, 1.470, 2.354, 20.149, 111.111])
+indutanciaDistribuida = np.array([2.209, 0.740, 0.120, 0.100, 0.050]) * 1e-3
+
+
+def test_secoesDiferentes():
+    '''1/L0 é corrigido pelo comprimento de cada circuito pi, e 1/C pela
+    média dos dois circuitos pi vizinhos ao nó (no receptor, pelo último),
+    como na linha trifásica.'''
+    secoes = np.array([1.0, 2.0, 4.0])
+    C = capacitanciaDistribuida
+    L0 = indutanciaDistribuida[0]
+
+    linha = LinhaDeTransmissaoPiCascata.comSecoes(secoes,
+                                condutanciaDistribuida, C,
+                                resistenciaDistribuida[:1], 
+                                indutanciaDistribuida[:1])
+
+    # variáveis de estado: i e v de cada circuito pi
+    A = linha.espacoEstadosLinha()[0].toarray()
+    nos = np.array([1.5, 3.0, 4.0])
+
+    np.testing.assert_allclose(A[[1, 3, 5], [0, 2, 4]], 2 / (C * nos))
+    np.testing.assert_allclose(A[[1, 3], [2, 4]], -1 / (C * nos[:2]))
+    np.testing.assert_allclose(A[[0, 2, 4], [1, 3, 5]], -1 / (L0 * secoes))
+    np.testing.assert_allclose(A[[2, 4], [1, 3]], 1 / (L0 * secoes[1:]))
+
+
+def test_arnoldiInstavel():
+    '''reduzirModelo não retorna um modelo de Arnoldi instável.'''
+    linha = LinhaDeTransmissaoPiCascata(30, 10, condutanciaDistribuida,
+                                        capacitanciaDistribuida,
+                                        resistenciaDistribuida,
+                                        indutanciaDistribuida)
+
+    with pytest.raises(ValueError):
+        linha.reduzirModelo(12)
+
+    assert linha.reduzirModelo(12, 'balanceado').estavel
+
+
+def linhaCurta():
+    '''Linha de 100 km em 10 circuitos pi, com dois blocos R-L, e os 
+    instantes (2 ms, passo de 1 us) para a energização por um degrau.'''
+    linha = LinhaDeTransmissaoPiCascata(10, 100, condutanciaDistribuida,
+                                        capacitanciaDistribuida,
+                                        resistenciaDistribuida[:2],
+                                        indutanciaDistribuida[:2])
+    return linha, np.linspace(0, 2e-3, 2001)
+
+
+def degrau(t):
+    return 1.0
+
+
+def erroRelativo(X, referencia):
+    return np.abs(X - referencia).max() / np.abs(referencia).max()
+
+
+@pytest.mark.parametrize('metodo, opcoes', 
+                         [('odeint', {}),
+                          ('BDF', dict(rtol = 1e-8, atol = 1e-10)),
+                          ('Radau', dict(rtol = 1e-8, atol = 1e-10)),
+                          ('LSODA', dict(rtol = 1e-8, atol = 1e-10))])
+def test_integradoresComoExpm(metodo, opcoes):
+    '''Os integradores adaptativos concordam com a solução exata (expm) na
+    energização da linha por um degrau.'''
+    linha, t = linhaCurta()
+    referencia = linha.simularLinha(degrau, t, metodo = 'expm')
+
+    X = linha.simularLinha(degrau, t, metodo = metodo, **opcoes)
+
+    assert erroRelativo(X, referencia) < 1e-5
+
+
+def test_trapezioSegundaOrdem():
+    '''A regra trapezoidal se aproxima da solução exata com o passo: o erro
+    cai 4 vezes quando o passo cai à metade.'''
+    linha, t = linhaCurta()
+    erros = []
+
+    for tPasso in (t[::2], t):
+        referencia = linha.simularLinha(degrau, tPasso, metodo = 'expm')
+        X = linha.simularLinha(degrau, tPasso, metodo = 'trapezio')
+        erros.append(erroRelativo(X, referencia))
+
+    assert erros[1] < 2e-3
+    assert 3.5 < erros[0] / erros[1] < 4.5
+
+
+@pytest.mark.parametrize('metodo', ['expm', 'odeint', 'trapezio'])
+def test_saidasEmBlocos(metodo):
+    '''Com saidas, a integração em blocos (inclusive com blocos menores que
+    o número de instantes) dá as mesmas variáveis que a simulação com todos
+    os estados.'''
+    linha, t = linhaCurta()
+    saidas = ['correnteEmissor', 'tensaoReceptor', ('tensao', 4)]
+    C = linha.matrizSaida(saidas)
+
+    X = linha.simularLinha(degrau, t, metodo = metodo)
+    Y = linha.simularLinha(degrau, t, metodo = metodo, saidas = saidas,
+                           pontosPorBloco = 300)
+
+    assert Y.shape == (len(t), 3)
+    assert erroRelativo(Y, (C @ X.T).T) < 1e-6
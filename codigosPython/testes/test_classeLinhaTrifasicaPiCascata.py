@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""
+Testes da linha trifásica com circuitos pi em cascata.
+
+@author: Pedro Henrique Nascimento Vieira
+"""
+import numpy as np
+import pytest
+import scipy as sp
+
+from classeLinhaDeTransmissaoPiCascata import LinhaDeTransmissaoPiCascata
+from classeLinhaTrifasicaPiCascata import LinhaTrifasicaPiCascata
+
+# linha transposta de 100 km: (G, C, R, L) por km, sequências positiva e zero
+matrizes = LinhaTrifasicaPiCascata.matrizesTranspostas(
+                (0.0, 12.7e-9, 0.0365, 0.93e-3), (0.0, 8.4e-9, 0.39, 3.1e-3))
+
+impedanciaEmissor = (1.0, 30e-3)
+
+
+def correntesFalta(linha, km):
+    '''Fasores das correntes medidas no emissor, a 60 Hz, com falta na fase A
+    em km, para uma fonte de 1 V.'''
+    A, B = linha.espacoEstados((linha.indiceNo(km), 'A', 0.5))
+    C, D = linha.matrizesMedicao(60)
+    U = np.append(linha.fasores((1.0, (0, -120, 120))), np.zeros(3))
+
+    I = sp.sparse.identity(linha.ordem, format = 'csc')
+    X = sp.sparse.linalg.spsolve((2j * np.pi * 60 * I - A).tocsc(), B @ U)
+
+    return (C @ X + D @ U)[3:]
+
+
+@pytest.mark.parametrize('km', [12.3, 37.4, 61.7, 88.8])
+def test_refinamentoSuperaMalhaUniforme(km):
+    '''Com o mesmo número de variáveis de estado, a malha refinada em torno
+    da falta (que fica exatamente sobre um nó) erra muito menos que a
+    uniforme, com a falta no nó mais próximo.'''
+    referencia = LinhaTrifasicaPiCascata(1000, 100, *matrizes,
+                                         impedanciaEmissor = impedanciaEmissor)
+    I = correntesFalta(referencia, km)
+
+    secoes = LinhaDeTransmissaoPiCascata.secoesRefinadas(100, km, 0.1, 5)
+    refinada = LinhaTrifasicaPiCascata.comSecoes(secoes, *matrizes,
+                                        impedanciaEmissor = impedanciaEmissor)
+
+    uniforme = LinhaTrifasicaPiCascata(len(secoes), 100, *matrizes,
+                                       impedanciaEmissor = impedanciaEmissor)
+    noMaisProximo = uniforme.posicoesNos()[int(round(km / 100 * len(secoes)))]
+
+    assert refinada.ordem == uniforme.ordem
+
+    erroRefinada = np.abs(correntesFalta(refinada, km) - I).max()
+    erroUniforme = np.abs(correntesFalta(uniforme, noMaisProximo) - I).max()
+
+    assert erroRefinada < 1e-4 * np.abs(I).max()
+    assert erroRefinada < erroUniforme / 100
+
+
+def test_simularFaltasNosDaLinha():
+    '''Os casos padrão de simularFaltas são os nós da linha, mesmo com
+    circuitos pi de comprimentos diferentes.'''
+    linha = LinhaTrifasicaPiCascata.comSecoes([0.4, 0.25, 0.35], *matrizes,
+                                        impedanciaEmissor = impedanciaEmissor)
+    t = np.arange(0, 1e-3, 1e-5)
+
+    dados = linha.simularFaltas(t, (1e3, (0, -120, 120)), processos = 1,
+                                instanteFalta = 5e-4)
+
+    assert list(dados)[:2] == ['FFTABC0.4', 'FFTABC0.65']
+    assert len(dados) == 7 * 2
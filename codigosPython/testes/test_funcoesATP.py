@@ -0,0 +1,245 @@
+# -*- coding: utf-8 -*-
+"""
+Testes das funções de leitura dos resultados do ATP.
+
+@author: Pedro Henrique Nascimento Vieira
+"""
+import numpy as np
+import pytest
+
+import funcoesATP
+from conftest import copiarLis
+
+
+def test_campanhaIgnoraArquivosForaDoPadrao(tmp_path):
+    '''O cktBaseRes.lis também casa com *Res.lis, mas não é um caso: é 
+    ignorado com um aviso. Um caso que não pode ser lido fica com NaN e 0
+    passos.'''
+    copiarLis(tmp_path, 'FFTA37Res.lis')
+    copiarLis(tmp_path, 'FFTA37R10G-30Res.lis')
+    copiarLis(tmp_path, 'cktBaseRes.lis')
+    (tmp_path / 'FFTB50Res.lis').write_text('Arquivo interrompido\n')
+
+    with pytest.warns(UserWarning) as avisos:
+        dados, tempo, casos = funcoesATP.carregarCampanha(tmp_path, 
+                                                          processos = 1)
+
+    mensagens = ' '.join(str(aviso.message) for aviso in avisos)
+    assert 'cktBaseRes.lis' in mensagens
+    assert 'FFTB50' in mensagens
+
+    # sem resistência no nome (NaN), o caso vem depois dos com resistência
+    assert list(casos['caso']) == ['FFTA37R10G-30', 'FFTA37', 'FFTB50']
+    assert casos['resistencia'][0] == 10 and casos['angulo'][0] == -30
+    assert list(casos['passos']) == [25, 25, 0]
+
+    lidos, colunas = funcoesATP.lerLis(str(tmp_path / 'FFTA37Res.lis'))
+    canais = [colunas.index(canal) for canal in 
+              ('VA', 'VB', 'VC', 'IA', 'IB', 'IC')]
+
+    np.testing.assert_array_equal(tempo, lidos[:, 1])
+    np.testing.assert_array_equal(dados[0], lidos[:, canais])
+    np.testing.assert_array_equal(dados[1], lidos[:, canais])
+    assert np.isnan(dados[2]).all()
+
+
+def lisSemSuspensao(arq):
+    '''Tira do .lis de exemplo a suspensão da simulação (a marca e as 7
+    linhas seguintes).'''
+    with open(arq, newline = '') as f:
+        linhas = f.read().split('\r\n')
+    
+    k = [n for n, linha in enumerate(linhas) if 'Suspended' in linha][0]
+    
+    with open(arq, 'w', newline = '') as f:
+        f.write('\r\n'.join(linhas[:k] + linhas[k + 8:]))
+        
+
+@pytest.mark.parametrize('suspensao', [True, False])
+def test_lerLisPassoFinalRepetido(tmp_path, suspensao):
+    '''O último passo, repetido depois de "Final time step", também fica em
+    lerLis. As linhas com SPY:, as mensagens das chaves e a suspensão são 
+    puladas.'''
+    arq = copiarLis(tmp_path)
+    if not suspensao:
+        lisSemSuspensao(arq)
+    
+    dados, colunas = funcoesATP.lerLis(arq)
+    
+    assert colunas == ['Step', 'Time', 'VB', 'VC', 'VA', 'IB', 'IC', 'IA']
+    np.testing.assert_array_equal(dados[:, 0], list(range(24)) + [23])
+    np.testing.assert_allclose(dados[:, 1], dados[:, 0] * 1e-5)
+    np.testing.assert_array_equal(dados[-1], dados[-2])
+
+
+@pytest.mark.parametrize('suspensao', [True, False])
+def test_lerLisComoExtrairResultados(tmp_path, suspensao):
+    '''lerLis dá os mesmos valores que extrairResultados e lerResultados. 
+    Sem suspensão, o caminho antigo perde o passo final repetido (as 7 
+    linhas depois de "Final time step" são puladas como se fossem de uma 
+    suspensão).'''
+    arq = copiarLis(tmp_path)
+    if not suspensao:
+        lisSemSuspensao(arq)
+    
+    dados, colunas = funcoesATP.lerLis(arq)
+    
+    funcoesATP.extrairResultados(arq)
+    df = funcoesATP.lerResultados(arq)
+    
+    assert list(df) == colunas
+    
+    if suspensao:
+        np.testing.assert_allclose(df.values, dados)
+    else:
+        np.testing.assert_allclose(df.values, dados[:-1])
+
+
+@pytest.mark.parametrize('tamanho', [1, 7, 64, 1 << 20])
+@pytest.mark.parametrize('suspensao', [True, False])
+def test_leitorLisEmBlocos(tmp_path, tamanho, suspensao):
+    '''LeitorLis, com o texto chegando em blocos de qualquer tamanho (as 
+    marcas e as linhas cortadas entre dois blocos), dá o mesmo que lerLis.
+    A saída termina no passo final, sem a quebra de linha, como quando o 
+    ATP é interrompido.'''
+    arq = copiarLis(tmp_path)
+    if not suspensao:
+        lisSemSuspensao(arq)
+    
+    with open(arq, 'rb') as f:
+        texto = f.read()
+    
+    # cortar no fim do passo final repetido, duas linhas depois da marca
+    fim = texto.find(b'Final time step')
+    for _ in range(3):
+        fim = texto.find(b'\r\n', fim + 1)
+    texto = texto[:fim]
+    
+    leitor = funcoesATP.LeitorLis()
+    for inicio in range(0, len(texto), tamanho):
+        leitor.alimentar(texto[inicio:inicio + tamanho])
+        
+    dados, colunas = leitor.resultado()
+    
+    esperado, colunasEsperadas = funcoesATP.lerLis(arq)
+    
+    assert colunas == colunasEsperadas
+    np.testing.assert_array_equal(dados, esperado)
+
+
+def linhasFalta(modelo, *argumentos):
+    '''As linhas do arquivo gerado pelo modelo, com as quebras de linha.'''
+    return modelo.gerar(*argumentos).splitlines(True)
+
+
+def test_gerarResistencia(cktBase):
+    '''A resistência de falta vai nas colunas 27 a 32 (o campo de 6 
+    caracteres) dos resistores das fases em falta; o resto do arquivo não
+    muda.'''
+    modelo = funcoesATP.ModeloFalta.doArquivo(cktBase)
+    linhas = linhasFalta(modelo, None, 'CA', 12.5)
+    
+    for fase in 'ABC':
+        n = modelo.resistores[fase]
+        base = modelo.linhas[n]
+        
+        if fase == 'B':
+            assert linhas[n] == base
+        else:
+            assert linhas[n][26:32] == '  12.5'
+            assert linhas[n][:26] + linhas[n][32:] == base[:26] + base[32:]
+        
+    mudadas = [n for n, linha in enumerate(linhas) if linha != modelo.linhas[n]]
+    assert mudadas == sorted([modelo.resistores['A'], modelo.resistores['C']])
+    
+    assert linhasFalta(modelo, None, 'A', 1e6)[modelo.resistores['A']][26:32] \
+           == ' 1E+06'
+
+
+def test_gerarFaltaNoMeioDaSecao(cktBase):
+    '''No km 37, a seção XL004-XL005 é dividida em 7 e 3 km, com as chaves
+    de falta das fases em falta entre as duas partes.'''
+    modelo = funcoesATP.ModeloFalta.doArquivo(cktBase)
+    n = modelo.secoes[3][0]
+    
+    assert funcoesATP.definirBarras(37) == ('XL004', 'XL005')
+    assert funcoesATP.definirSecoes(37) == (7, 3)
+    
+    linhas = linhasFalta(modelo, 37, 'AC')
+    secao = ''.join(linhas[n:n + 4])
+    
+    assert secao == modelo.linhas[n].replace('L10', 'L7').replace(
+        'XL005C', 'XSWT03') + '  , XSWT01, XLINTB\r\n' + \
+        '$INCLUDE, C:\\ATPdraw\\Atp\\lttcc_L3.lib, XSWT03, XSWT01, XLINTB, ' \
+        'XL005C $$\r\n' + modelo.linhas[n + 1]
+    
+    assert linhas[:n] == modelo.linhas[:n]
+    assert linhas[n + 4:] == modelo.linhas[n + 2:]
+    
+
+@pytest.mark.parametrize('km, barra', [(0, 'XL001'), (40, 'XL005'),
+                                       (100, 'XL011')])
+def test_gerarFaltaNaBarra(cktBase, km, barra):
+    '''Com a falta em uma barra (inclusive as das pontas da linha), as 
+    seções não mudam: a chave de falta vai para a barra.'''
+    modelo = funcoesATP.ModeloFalta.doArquivo(cktBase)
+    linhas = linhasFalta(modelo, km, 'AB')
+    
+    assert len(linhas) == len(modelo.linhas)
+    
+    for fase in 'ABC':
+        c = modelo.chaves[fase]
+        no = barra + fase if fase in 'AB' else modelo.linhas[c][2:8]
+        
+        assert linhas[c] == '  ' + no + modelo.linhas[c][8:]
+        
+    mudadas = [n for n, linha in enumerate(linhas) if linha != modelo.linhas[n]]
+    assert mudadas == sorted([modelo.chaves['A'], modelo.chaves['B']])
+
+
+def test_gerarInstante(cktBase):
+    '''O instante de fechamento vai nas colunas 15 a 24 (campo de 10 
+    caracteres) das chaves das fases em falta.'''
+    modelo = funcoesATP.ModeloFalta.doArquivo(cktBase)
+    linhas = linhasFalta(modelo, None, 'B', None, 0.0123)
+    
+    for fase in 'ABC':
+        c = modelo.chaves[fase]
+        base = modelo.linhas[c]
+        
+        if fase == 'B':
+            assert linhas[c][14:24] == '     .0123'
+            assert linhas[c][:14] + linhas[c][24:] == base[:14] + base[24:]
+        else:
+            assert linhas[c] == base
+            
+    assert modelo.instanteFalta() == 0.05
+    assert funcoesATP.ModeloFalta(linhasFalta(modelo, None, 'A', None, 
+                                              0.0123)).instanteFalta() == 0.0123
+
+
+def test_comSecoesFracionarias(cktBase):
+    '''Seções de 2.5 km: a falta no km 37.6 divide a seção XL016-XL017 em
+    0.1 e 2.4 km; no km 37.5, fica na barra XL016. O modelo gerado pode ser
+    lido de novo.'''
+    modelo = funcoesATP.ModeloFalta.doArquivo(cktBase).comSecoes(40, 2.5)
+    
+    assert modelo.barras[-1] == 'XL041'
+    assert modelo.posicoes[-1] == 100
+    assert 'XL011' not in ''.join(modelo.linhas[modelo.chaves['A'] - 20:])
+    
+    assert modelo.localizar(37.6) == (15, 0.1, 2.4)
+    assert modelo.localizar(37.5) == (15, 0, 2.5)
+    
+    linhas = linhasFalta(modelo, 37.6, 'A')
+    n = modelo.secoes[15][0]
+    secao = ''.join(linhas[n:n + 4])
+    
+    assert 'lttcc_L0.1.lib' in secao and 'lttcc_L2.4.lib' in secao
+    assert 'lttcc_L2.5.lib' not in secao
+    
+    dividido = funcoesATP.ModeloFalta(linhas)
+    assert [secao[4] for secao in dividido.secoes[14:17]] == [2.5, 0.1, 2.4]
+    
+    linhas = linhasFalta(modelo, 37.5, 'A')
+    assert linhas[modelo.chaves['A']].startswith('  XL016AXF0001')
@@ -0,0 +1,472 @@
+# -*- coding: utf-8 -*-
+"""
+Código para varrer parâmetros das linhas de transmissão com circuitos pi em
+cascata (classeLinhaDeTransmissaoPiCascata.py e classeLinhaTrifasicaPiCascata.py)
+em vários processos, no lugar de um script editado à mão para cada caso.
+
+A grade é um dicionário {nome do parâmetro: lista de valores}; cada caso é uma
+combinação dos valores (produto cartesiano), somada aos parâmetros fixos. Os
+casos são divididos em partes e distribuídos a um ProcessPoolExecutor. Cada
+caso recebe um gerador de números aleatórios próprio, determinado pela
+semente da varredura e pelo índice do caso, de forma que o resultado não
+depende do número de processos nem da ordem de execução.
+
+Os resultados são escritos pelos processos diretamente em um único array,
+alocado antes em memória compartilhada, de forma (forma da grade) + (forma da
+saída de um caso). As matrizes do espaço de estados das linhas monofásicas
+também são montadas uma única vez e compartilhadas com os processos, que as
+encontram no cacheMatrizes.
+
+Exemplo, estudo de convergência com o número de circuitos pi:
+
+    varredura = VarreduraLinha({'numeroCircuitoPi': [10, 20, 40, 80]},
+                               fixos = {'comprimentoDaLinha': 10, ...})
+    Y = varredura.executar(t, progresso = lambda n, total: print(n, total))
+
+@author: Pedro Henrique Nascimento Vieira
+"""
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import partial
+from multiprocessing import shared_memory
+import itertools
+import os
+
+import numpy as np
+import scipy as sp
+
+from classeLinhaDeTransmissaoPiCascata import (LinhaDeTransmissaoPiCascata,
+                                               cacheMatrizes)
+
+# parâmetros do construtor de LinhaDeTransmissaoPiCascata
+parametrosLinha = ['numeroCircuitoPi', 'comprimentoDaLinha',
+                   'condutanciaDistribuida', 'capacitanciaDistribuida',
+                   'resistenciaDistribuida', 'indutanciaDistribuida']
+
+
+def _degrau(amplitude, t):
+    return amplitude
+
+
+def _senoide(amplitude, frequencia, fase, t):
+    return amplitude * np.cos(2 * np.pi * frequencia * t + np.deg2rad(fase))
+
+
+def fonteDegrau(amplitude):
+    '''
+
+    Tensão constante no emissor, a partir de t = 0; como função que pode ser
+    enviada aos processos (ao contrário de uma função lambda).
+    '''
+    return partial(_degrau, amplitude)
+
+
+def fonteSenoidal(amplitude, frequencia = 60.0, fase = 0.0):
+    '''
+
+    Tensão senoidal no emissor, amplitude*cos(w*t + fase), fase em graus; como
+    função que pode ser enviada aos processos.
+    '''
+    return partial(_senoide, amplitude, frequencia, fase)
+
+
+def linhaDoCaso(parametros):
+    '''
+
+    Cria a LinhaDeTransmissaoPiCascata de um caso, ou com os comprimentosSecoes
+    dados (ver LinhaDeTransmissaoPiCascata.comSecoes).
+    '''
+    if 'comprimentosSecoes' in parametros:
+        return LinhaDeTransmissaoPiCascata.comSecoes(
+                    parametros['comprimentosSecoes'],
+                    *[parametros[p] for p in parametrosLinha[2:]])
+
+    return LinhaDeTransmissaoPiCascata(*[parametros[p] for p in
+                                         parametrosLinha])
+
+
+def simularLinhaCaso(parametros, t, gerador):
+    '''
+
+    Caso padrão de VarreduraLinha: simula a linha monofásica.
+
+    Parâmetros usados, além dos de linhaDoCaso:
+        tensaoEmissor: a função da tensão no emissor (ver fonteDegrau)
+        metodo: o método de solução, 'BDF' por padrão; 'expm' considera
+        a tensão no emissor constante, e só é aceito com fonteDegrau ou
+        informando instantesComutacao (fonte constante por partes)
+        rtol, atol: as tolerâncias de 'BDF', 'Radau' e 'LSODA'; 1e-6 por
+        padrão (as de solve_ivp deixam erros de alguns % no pico)
+        saidas: ver LinhaDeTransmissaoPiCascata.matrizSaida; a tensão no
+        receptor por padrão
+        ruido: desvio padrão de um ruído gaussiano somado às saídas, como o
+        de um medidor; 0 por padrão
+        eventos: critérios de parada (ver resolverSistema); no regime
+        permanente, o restante é completado com o último período, e após os
+        demais eventos com NaN, para manter a forma do resultado
+
+    Retorna:
+    --------
+    um array da forma (len(t), numero de saídas)
+    '''
+    metodo = parametros.get('metodo', 'BDF')
+    opcoes = {}
+
+    if metodo in ('BDF', 'Radau', 'LSODA'):
+        opcoes['rtol'] = parametros.get('rtol', 1e-6)
+        opcoes['atol'] = parametros.get('atol', 1e-6)
+
+    elif metodo == 'expm':
+        if 'instantesComutacao' in parametros:
+            opcoes['instantesComutacao'] = parametros['instantesComutacao']
+
+        elif getattr(parametros['tensaoEmissor'], 'func', None) is not _degrau:
+            raise ValueError("metodo = 'expm' considera a tensão no emissor " +
+                             "constante: use fonteDegrau ou informe " +
+                             "instantesComutacao.")
+
+    linha = linhaDoCaso(parametros)
+
+    Y = linha.simularLinha(parametros['tensaoEmissor'], t, metodo = metodo,
+                           saidas = parametros.get('saidas',
+                                                   ['tensaoReceptor']),
+                           eventos = parametros.get('eventos', ()),
+                           completar = True, **opcoes)
+
+    Y = _completarComNaN(Y, len(t))
+
+    ruido = parametros.get('ruido', 0)
+    if ruido:
+        Y = Y + gerador.normal(0, ruido, Y.shape)
+
+    return Y
+
+
+def simularFaltaCaso(parametros, t, gerador):
+    '''
+
+    Caso de falta na linha trifásica (ver LinhaTrifasicaPiCascata.simularFalta).
+
+    Parâmetros usados:
+        numeroCircuitoPi, comprimentoDaLinha, sequenciaPositiva,
+        sequenciaZero (ver LinhaTrifasicaPiCascata.linhaTransposta);
+        impedanciaEmissor, impedanciaReceptor (opcionais);
+        fonteEmissor, fonteReceptor, fases, km, resistenciaFalta,
+        instanteFalta (ver simularFalta);
+        comprimentoMinimo, comprimentoMaximo: se dados, os circuitos pi são
+        refinados em torno da falta (ver secoesRefinadas), no lugar de
+        numeroCircuitoPi iguais;
+        ruido, eventos: como em simularLinhaCaso; no regime permanente, use
+        instanteMinimo = instanteFalta (ver simularFalta)
+
+    Retorna:
+    --------
+    um array da forma (len(t), 6), com VA, VB, VC, IA, IB, IC
+    '''
+    from classeLinhaTrifasicaPiCascata import LinhaTrifasicaPiCascata
+
+    matrizes = LinhaTrifasicaPiCascata.matrizesTranspostas(
+                    parametros['sequenciaPositiva'], parametros['sequenciaZero'])
+
+    impedancias = {p: parametros[p] for p in ('impedanciaEmissor',
+                                              'impedanciaReceptor')
+                   if p in parametros}
+
+    if 'comprimentoMaximo' in parametros:
+        secoes = LinhaDeTransmissaoPiCascata.secoesRefinadas(
+                    parametros['comprimentoDaLinha'], parametros['km'],
+                    parametros['comprimentoMinimo'],
+                    parametros['comprimentoMaximo'])
+
+        linha = LinhaTrifasicaPiCascata.comSecoes(secoes, *matrizes,
+                                                  **impedancias)
+    else:
+        linha = LinhaTrifasicaPiCascata(parametros['numeroCircuitoPi'],
+                                        parametros['comprimentoDaLinha'],
+                                        *matrizes, **impedancias)
+
+    opcoes = {p: parametros[p] for p in ('resistenciaFalta', 'instanteFalta',
+                                         'frequencia') if p in parametros}
+
+    dados = linha.simularFalta(t, parametros['fonteEmissor'],
+                               parametros.get('fonteReceptor'),
+                               fases = parametros.get('fases', ''),
+                               km = parametros.get('km'),
+                               eventos = parametros.get('eventos', ()),
+                               completar = True, **opcoes)
+
+    Y = _completarComNaN(dados[['VA', 'VB', 'VC', 'IA', 'IB', 'IC']].values,
+                         len(t))
+
+    ruido = parametros.get('ruido', 0)
+    if ruido:
+        Y = Y + gerador.normal(0, ruido, Y.shape)
+
+    return Y
+
+
+def _completarComNaN(Y, numeroPontos):
+    '''
+
+    Completa com NaN um resultado encerrado antes do fim por um evento
+    '''
+    if len(Y) == numeroPontos:
+        return Y
+
+    completo = np.full((numeroPontos,) + Y.shape[1:], np.nan)
+    completo[:len(Y)] = Y
+
+    return completo
+
+
+class VarreduraLinha(object):
+    '''
+
+    Varredura de parâmetros em vários processos. Ver a descrição do módulo.
+    '''
+
+    def __init__(self, grade, fixos = None, simularCaso = simularLinhaCaso):
+        '''
+
+        Argumentos:
+        -------
+        grade: dicionário {nome do parâmetro: lista de valores}; a ordem das
+        chaves é a ordem dos eixos do resultado
+
+        fixos: dicionário com os parâmetros comuns a todos os casos
+
+        simularCaso: função (parametros, t, gerador) que simula um caso e
+        retorna um array, sempre da mesma forma; definida no nível do módulo,
+        para que possa ser enviada aos processos. simularLinhaCaso por padrão
+        '''
+        self.grade = dict(grade)
+        self.fixos = dict(fixos or {})
+        self.simularCaso = simularCaso
+
+        # forma da grade, os primeiros eixos do resultado
+        self.forma = tuple(len(valores) for valores in self.grade.values())
+
+        # parâmetros de cada caso, na ordem do resultado
+        self.casos = [dict(self.fixos, **dict(zip(self.grade, valores)))
+                      for valores in itertools.product(*self.grade.values())]
+
+
+    @staticmethod
+    def gerador(semente, indice):
+        '''
+
+        Gerador de números aleatórios do caso 'indice', independente dos
+        demais casos e do processo que o executa.
+        '''
+        return np.random.default_rng(np.random.SeedSequence(semente,
+                                                         spawn_key = (indice,)))
+
+
+    def executar(self, t, processos = None, tamanhoParte = None, semente = 0,
+                 progresso = None, compartilharMatrizes = True):
+        '''
+
+        Executa todos os casos.
+
+        Argumentos:
+        -------
+        t: os instantes, repassados a simularCaso
+
+        processos: número de processos; None (padrão) usa todos os núcleos,
+        1 executa no processo atual
+
+        tamanhoParte: número de casos enviados de cada vez a um processo; por
+        padrão, cerca de 4 partes por processo
+
+        semente: semente da varredura, ver gerador
+
+        progresso: função (concluidos, total), chamada a cada parte concluída
+
+        compartilharMatrizes: se as matrizes das linhas monofásicas são
+        montadas uma vez e compartilhadas com os processos
+
+        Retorna:
+        --------
+        um array da forma self.forma + (forma da saída de um caso)
+        '''
+        total = len(self.casos)
+
+        # o primeiro caso, no processo atual, dá a forma e o tipo da saída
+        Y0 = np.asarray(self.simularCaso(self.casos[0], t,
+                                         self.gerador(semente, 0)))
+
+        if processos is None:
+            processos = os.cpu_count()
+
+        if processos <= 1 or total == 1:
+            Y = np.empty((total,) + Y0.shape, dtype = Y0.dtype)
+            Y[0] = Y0
+
+            if progresso is not None:
+                progresso(1, total)
+
+            for i in range(1, total):
+                Y[i] = self.simularCaso(self.casos[i], t,
+                                        self.gerador(semente, i))
+
+                if progresso is not None:
+                    progresso(i + 1, total)
+
+            return Y.reshape(self.forma + Y0.shape)
+
+        if tamanhoParte is None:
+            tamanhoParte = max(1, int(np.ceil((total - 1) / (4 * processos))))
+
+        memoria = shared_memory.SharedMemory(create = True,
+                                    size = max(1, total * Y0.nbytes))
+        matrizes = None
+
+        try:
+            Y = np.ndarray((total,) + Y0.shape, dtype = Y0.dtype,
+                           buffer = memoria.buf)
+            Y[0] = Y0
+
+            descricaoMatrizes = []
+            if compartilharMatrizes:
+                matrizes, descricaoMatrizes = self._compartilharMatrizes()
+
+            inicializacao = (memoria.name, Y.shape, Y.dtype.str,
+                             None if matrizes is None else matrizes.name,
+                             descricaoMatrizes)
+
+            partes = [range(i, min(i + tamanhoParte, total))
+                      for i in range(1, total, tamanhoParte)]
+
+            concluidos = 1
+
+            if progresso is not None:
+                progresso(concluidos, total)
+
+            with ProcessPoolExecutor(processos, initializer = _iniciarProcesso,
+                                     initargs = inicializacao) as executor:
+                tarefas = [executor.submit(_executarParte, self.simularCaso,
+                                           [self.casos[i] for i in parte],
+                                           parte.start, t, semente)
+                           for parte in partes]
+
+                for tarefa in as_completed(tarefas):
+                    concluidos += tarefa.result()
+
+                    if progresso is not None:
+                        progresso(concluidos, total)
+
+            resultado = Y.reshape(self.forma + Y0.shape).copy()
+            del Y
+
+            return resultado
+
+        finally:
+            memoria.close()
+            memoria.unlink()
+
+            if matrizes is not None:
+                matrizes.close()
+                matrizes.unlink()
+
+
+    def _compartilharMatrizes(self):
+        '''
+
+        Função auxiliar. Monta as matrizes (A, B) de cada linha monofásica
+        diferente da grade e as copia para um bloco de memória compartilhada.
+
+        Retorna:
+        --------
+        [memoria, descricao]: o bloco (None, se não houver linhas) e, para
+        cada linha, (chave do cache, formas e posições dos arrays no bloco)
+        '''
+        linhas = {}
+        for parametros in self.casos:
+            try:
+                linha = linhaDoCaso(parametros)
+            except (KeyError, TypeError, ValueError):
+                continue
+
+            linhas.setdefault(('espacoEstados',) + linha.chave, linha)
+
+        if not linhas:
+            return None, []
+
+        arrays = []
+        descricao = []
+        posicao = 0
+
+        for chave, linha in linhas.items():
+            formas = []
+            posicoes = []
+
+            for M in linha.espacoEstadosLinha():
+                M = sp.sparse.csr_matrix(M)
+                formas.append(M.shape)
+
+                for a in (M.data, M.indices, M.indptr):
+                    # alinhamento de 8 bytes
+                    posicao = -(-posicao // 8) * 8
+                    posicoes.append((posicao, a.dtype.str, a.size))
+                    arrays.append((posicao, a))
+                    posicao += a.nbytes
+
+            descricao.append((chave, formas, posicoes))
+
+        memoria = shared_memory.SharedMemory(create = True,
+                                             size = max(1, posicao))
+
+        for inicio, a in arrays:
+            np.ndarray(a.shape, dtype = a.dtype, buffer = memoria.buf,
+                       offset = inicio)[:] = a
+
+        return memoria, descricao
+
+
+# memória compartilhada, vista por cada processo da varredura
+_processo = {}
+
+
+def _iniciarProcesso(nomeResultado, forma, tipo, nomeMatrizes, descricao):
+    '''
+
+    Função auxiliar, executada no início de cada processo. Liga o array de
+    resultados à memória compartilhada e guarda as matrizes compartilhadas
+    no cacheMatrizes, sem copiá-las.
+    '''
+    _processo['memoria'] = shared_memory.SharedMemory(name = nomeResultado)
+    _processo['Y'] = np.ndarray(forma, dtype = tipo,
+                                buffer = _processo['memoria'].buf)
+
+    if nomeMatrizes is None:
+        return
+
+    _processo['matrizes'] = memoria = shared_memory.SharedMemory(
+                                                    name = nomeMatrizes)
+
+    for chave, formas, posicoes in descricao:
+        arrays = [np.ndarray((n,), dtype = d, buffer = memoria.buf,
+                             offset = inicio) for inicio, d, n in posicoes]
+
+        matrizes = tuple(sp.sparse.csr_matrix(tuple(arrays[3*k : 3*k + 3]),
+                                              shape = forma, copy = False)
+                         for k, forma in enumerate(formas))
+
+        cacheMatrizes.guardar(chave, matrizes)
+
+
+def _executarParte(simularCaso, casos, inicio, t, semente):
+    '''
+
+    Função auxiliar, executada pelos processos. Simula os casos de uma parte
+    e escreve as saídas no array compartilhado.
+
+    Retorna:
+    --------
+    o número de casos simulados
+    '''
+    Y = _processo['Y']
+
+    for i, parametros in enumerate(casos, inicio):
+        Y[i] = simularCaso(parametros, t, VarreduraLinha.gerador(semente, i))
+
+    return len(casos)